@@ -0,0 +1,234 @@
+# analytics.py - Flow metrics over the status history: throughput, cycle time, aging, per-tag
+#
+# The transition log is loaded as columns (times, task ids, status codes) and
+# every metric is computed with whole-array NumPy operations. Without NumPy
+# the same metrics are computed with plain loops over the columns, so results
+# are identical either way; only the speed differs.
+import json
+from bisect import bisect_right
+from datetime import date, datetime
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from history import STATUS_CODES, _timestamp
+
+DAY = 86400
+WEEK = 7 * DAY
+DEFAULT_WEEKS = 12
+IN_PROGRESS = STATUS_CODES["In Progress"]
+DONE = STATUS_CODES["Done"]
+
+# Upper bounds in days for the age of open work; the last bucket is open-ended
+AGE_EDGES = [7, 28, 91, 365]
+AGE_LABELS = ["< 1 week", "1-4 weeks", "1-3 months", "3-12 months", "> 1 year"]
+
+
+def _percentile(sorted_values, fraction):
+    """Linearly interpolated percentile of an ascending sequence (NumPy's default method)"""
+    if not len(sorted_values):
+        return None
+    pos = (len(sorted_values) - 1) * fraction
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def _days(seconds):
+    return None if seconds is None else round(float(seconds) / DAY, 2)
+
+
+class FlowData:
+    """Columnar snapshot of tasks and their status transitions"""
+
+    def __init__(self, tasks, history):
+        times, ids, codes = history.columns()
+        if HAS_NUMPY:
+            self.times = np.frombuffer(times, dtype=np.int64) if len(times) else np.zeros(0, np.int64)
+            self.ids = np.frombuffer(ids, dtype=np.int32) if len(ids) else np.zeros(0, np.int32)
+            self.codes = np.frombuffer(codes, dtype=np.uint8) if len(codes) else np.zeros(0, np.uint8)
+        else:
+            self.times, self.ids, self.codes = times, ids, codes
+        self.open_ids = [task.id for task in tasks if task.status != "Done"]
+        self.tags = {}  # tag -> ids of tasks carrying it
+        for task in tasks:
+            for tag in task.tags:
+                self.tags.setdefault(tag, []).append(task.id)
+
+    # --------------------------
+    # Column kernels (NumPy and plain-Python versions give the same results)
+    # --------------------------
+
+    def done_counts_by_week(self, lo, hi, weeks):
+        """Done transitions per week starting at lo, up to hi inclusive"""
+        if HAS_NUMPY:
+            mask = (self.codes == DONE) & (self.times >= lo) & (self.times <= hi)
+            buckets = (self.times[mask] - lo) // WEEK
+            return np.bincount(buckets, minlength=weeks)[:weeks].tolist()
+        counts = [0] * weeks
+        for ts, code in zip(self.times, self.codes):
+            if code == DONE and lo <= ts <= hi:
+                week = (ts - lo) // WEEK
+                if week < weeks:
+                    counts[week] += 1
+        return counts
+
+    def cycle_times(self, lo, hi):
+        """(task ids, seconds) from the last move to In Progress to each Done in [lo, hi]"""
+        if HAS_NUMPY:
+            mask = (self.codes == IN_PROGRESS) | (self.codes == DONE)
+            times, ids, codes = self.times[mask], self.ids[mask], self.codes[mask]
+            order = np.lexsort((times, ids))  # Stable: per task, in time order
+            times, ids, codes = times[order], ids[order], codes[order]
+            follows_start = np.zeros(len(ids), dtype=bool)
+            follows_start[1:] = (ids[1:] == ids[:-1]) & (codes[:-1] == IN_PROGRESS)
+            ends = np.flatnonzero((codes == DONE) & follows_start & (times >= lo) & (times <= hi))
+            return ids[ends], times[ends] - times[ends - 1]
+        started = {}
+        cycle_ids = []
+        durations = []
+        for ts, task_id, code in zip(self.times, self.ids, self.codes):
+            if code == IN_PROGRESS:
+                started[task_id] = ts
+            elif code == DONE:
+                start = started.pop(task_id, None)
+                if start is not None and lo <= ts <= hi:
+                    cycle_ids.append(task_id)
+                    durations.append(ts - start)
+        return cycle_ids, durations
+
+    def done_ids(self, lo, hi):
+        """Ids of tasks with a Done transition in [lo, hi]"""
+        if HAS_NUMPY:
+            mask = (self.codes == DONE) & (self.times >= lo) & (self.times <= hi)
+            return set(np.unique(self.ids[mask]).tolist())
+        return {task_id for ts, task_id, code in zip(self.times, self.ids, self.codes)
+                if code == DONE and lo <= ts <= hi}
+
+    def open_ages(self, now):
+        """Age in days of every open task, from its first appearance in the history"""
+        if HAS_NUMPY and len(self.ids):
+            seen_ids, first = np.unique(self.ids, return_index=True)  # Log is in time order
+            open_ids = np.array(self.open_ids, dtype=np.int64)
+            pos = np.minimum(np.searchsorted(seen_ids, open_ids), len(seen_ids) - 1)
+            first_seen = np.where(seen_ids[pos] == open_ids, self.times[first[pos]], now)
+            return ((now - first_seen) / DAY).tolist()
+        first_seen = {}
+        for ts, task_id in zip(self.times, self.ids):
+            first_seen.setdefault(task_id, ts)
+        return [(now - first_seen.get(task_id, now)) / DAY for task_id in self.open_ids]
+
+
+# --------------------------
+# Metrics
+# --------------------------
+
+def compute_metrics(tasks, history, start_date=None, end_date=None, now=None):
+    """Flow metrics for a date range (default: the last 12 weeks) as a JSON-ready dict"""
+    now = int(datetime.now().timestamp()) if now is None else int(now)
+    hi = _timestamp(end_date) if end_date else now
+    lo = _timestamp(start_date, end_of_day=False) if start_date else hi - DEFAULT_WEEKS * WEEK + 1
+    weeks = max(1, -(-(hi - lo + 1) // WEEK))
+    data = FlowData(tasks, history)
+
+    throughput = data.done_counts_by_week(lo, hi, weeks)
+    cycle_ids, durations = data.cycle_times(lo, hi)
+    ordered = np.sort(durations).tolist() if HAS_NUMPY else sorted(durations)
+    done_ids = data.done_ids(lo, hi)
+
+    ages = data.open_ages(now)
+    aging = [0] * len(AGE_LABELS)
+    for age in ages:
+        aging[bisect_right(AGE_EDGES, age)] += 1
+
+    durations_by_task = {}
+    for task_id, seconds in zip(cycle_ids, durations):
+        durations_by_task.setdefault(int(task_id), []).append(int(seconds))
+    open_ids = set(data.open_ids)
+    tags = []
+    for tag, ids in data.tags.items():
+        tag_cycles = sorted(s for task_id in ids for s in durations_by_task.get(task_id, ()))
+        tags.append({
+            "tag": tag,
+            "open": sum(1 for task_id in ids if task_id in open_ids),
+            "done": sum(1 for task_id in ids if task_id in done_ids),
+            "cycle_p50_days": _days(_percentile(tag_cycles, 0.5)),
+        })
+    tags.sort(key=lambda row: (-row["done"], -row["open"], row["tag"]))
+
+    return {
+        "start": date.fromtimestamp(lo).isoformat(),
+        "end": date.fromtimestamp(hi).isoformat(),
+        "throughput": [{"week": date.fromtimestamp(lo + i * WEEK).isoformat(), "done": count}
+                       for i, count in enumerate(throughput)],
+        "cycle_time_days": {
+            "count": len(ordered),
+            "mean": _days(sum(ordered) / len(ordered)) if ordered else None,
+            "p50": _days(_percentile(ordered, 0.5)),
+            "p85": _days(_percentile(ordered, 0.85)),
+            "max": _days(ordered[-1]) if ordered else None,
+        },
+        "aging": [{"bucket": label, "open": count} for label, count in zip(AGE_LABELS, aging)],
+        "tags": tags,
+    }
+
+
+# --------------------------
+# Output
+# --------------------------
+
+def iter_metrics_lines(metrics):
+    """Yield the metrics as a plain-text section matching the standup report"""
+    yield "\n"
+    yield "📈 FLOW METRICS:\n"
+    yield "─" * 60 + "\n"
+    yield f"Period: {metrics['start']} to {metrics['end']}\n"
+    yield "\n"
+    yield "Throughput (tasks done per week):\n"
+    for row in metrics["throughput"]:
+        yield f"  Week of {row['week']}: {row['done']}\n"
+    yield "\n"
+    cycle = metrics["cycle_time_days"]
+    if cycle["count"]:
+        yield (f"Cycle time (In Progress → Done): {cycle['count']} tasks, median {cycle['p50']} days, "
+               f"85th percentile {cycle['p85']} days, max {cycle['max']} days\n")
+    else:
+        yield "Cycle time (In Progress → Done): no tasks finished in this period\n"
+    yield "\n"
+    yield "Age of open work:\n"
+    for row in metrics["aging"]:
+        yield f"  {row['bucket']}: {row['open']}\n"
+    if metrics["tags"]:
+        yield "\n"
+        yield "By tag:\n"
+        for row in metrics["tags"]:
+            line = f"  {row['tag']}: {row['open']} open, {row['done']} done"
+            if row["cycle_p50_days"] is not None:
+                line += f", median cycle {row['cycle_p50_days']} days"
+            yield line + "\n"
+
+
+def export_metrics(f, metrics, fmt="txt"):
+    """Write metrics to an open text file as txt, json or csv"""
+    if fmt == "json":
+        json.dump(metrics, f, indent=2)
+        f.write("\n")
+    elif fmt == "csv":
+        import csv
+        writer = csv.writer(f)
+        writer.writerow(("section", "name", "value"))
+        for row in metrics["throughput"]:
+            writer.writerow(("throughput", row["week"], row["done"]))
+        for name, value in metrics["cycle_time_days"].items():
+            writer.writerow(("cycle_time_days", name, "" if value is None else value))
+        for row in metrics["aging"]:
+            writer.writerow(("aging", row["bucket"], row["open"]))
+        for row in metrics["tags"]:
+            for name in ("open", "done", "cycle_p50_days"):
+                value = row[name]
+                writer.writerow((f"tag:{row['tag']}", name, "" if value is None else value))
+    else:
+        f.writelines(iter_metrics_lines(metrics))
@@ -1,20 +1,39 @@
 # app.py - Main application class
 import os
 import json
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
+from itertools import islice
 
+import perf
 from theme import get_colors, configure_treeview_style, configure_scrollbar_style
-from widgets import create_modern_button
-from dialogs import TaskPopup, ReportPopup, MarkDonePopup
-from task_manager import load_tasks, save_tasks, add_task, delete_task, mark_task_done, edit_task
+from widgets import create_modern_button, show_toast
+from task_manager import (load_tasks, save_tasks, add_task, delete_task, mark_task_done,
+                          edit_task, set_task_status, matches_filter, add_change_listener,
+                          default_sort_key, column_sort_key, count_statuses, Task)
+from indexes import CompletionIndex, SubtaskIndex, DependencyIndex, TagIndex
+from report import ReportCache
+from rows import RowCache
+from background import BackgroundRunner
+from history import TaskHistory
+from scheduler import TaskScheduler
+from reminders import ReminderScheduler
+from dedupe import DuplicateIndex
+from timelog import TimeLog, format_duration
 
 
 class LiteTodoApp:
     """Main Task Manager application"""
     
-    def __init__(self, root):
+    POPULATE_CHUNK_ROWS = 200    # Rows inserted between time checks
+    POPULATE_BUDGET_S = 0.012    # Time spent inserting rows before yielding to the event loop
+    NEXT_UP_COUNT = 50           # Tasks listed by the "Next Up" filter
+    TOAST_MAX_LINES = 5          # Reminders listed in one notification before "... and N more"
+    
+    def __init__(self, root, startup=None):
         self.root = root
+        self.startup = startup or perf.StartupTimer()
         self.root.title("✨ Task Manager Pro")
         self.root.geometry("1000x700")
         self.root.minsize(800, 600)
@@ -23,21 +42,149 @@ class LiteTodoApp:
         self.preferences = self.load_preferences()
         self.dark_mode = self.preferences.get("dark_mode", False)
         
-        self.tasks = load_tasks()
-        self.filtered_tasks = self.tasks.copy()
+        # Tasks are loaded after the first paint (see load_initial_tasks)
+        self.tasks = []
+        self.filtered_tasks = []
+        self.completion_index = CompletionIndex()
+        add_change_listener(self.completion_index.on_change)
+        self.report_cache = ReportCache()
+        add_change_listener(self.report_cache.on_change)
+        self.row_cache = RowCache()
+        add_change_listener(self.row_cache.on_change)
+        perf.register_gauge("row_cache", self.row_cache.stats)
+        self.history = TaskHistory()  # Read on the storage worker before the first task load
+        add_change_listener(self.history.on_change)
+        self.subtasks = SubtaskIndex()
+        add_change_listener(self.subtasks.on_change)
+        self.dependencies = DependencyIndex()
+        add_change_listener(self.dependencies.on_change)
+        self.scheduler = TaskScheduler(first_seen=self.history.first_seen)
+        add_change_listener(self.scheduler.on_change)
+        self.reminders = ReminderScheduler(self.root, self.show_reminders)
+        add_change_listener(self.reminders.on_change)
+        self.tags = TagIndex()
+        add_change_listener(self.tags.on_change)
+        self.tag_filter = None  # Tag picked in the sidebar (None = all tags)
+        self.duplicates = DuplicateIndex()  # Built on a worker after each load
+        add_change_listener(self.duplicates.on_change)
+        self.time_log = TimeLog()  # Read on the storage worker with the history
+        add_change_listener(self.time_log.on_change)
+        self._sidebar_version = None  # TagIndex.version the sidebar list was drawn from
+        self.expanded = set()  # Ids of parent tasks whose subtasks are shown
+        self._tree_mode = True  # Subtasks nest under their parents unless a search/filter is active
+        self._positions = {}    # id(task) -> position in self.tasks (the row iid)
         self.sort_by = None
         self.sort_reverse = False
+        self.perf_panel = None
+        self.dialogs = {}  # Dialog class -> reusable hidden instance
+        self._populate_job = None  # Pending after() callback while the table fills in batches
         
-        # Apply default sorting
-        self.apply_default_sort()
+        # File access runs on background workers; results come back via after()
+        self.background = BackgroundRunner(self.root)
+        self.tasks_loaded = False
+        self.storage_error = None
+        self._save_generation = 0  # Bumped per queued save so superseded snapshots are skipped
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # Setup theme
         self.setup_theme()
         self.create_widgets()
         self.setup_keyboard_shortcuts()
-        self.populate_tasks()
+        self.status_bar.config(text="⏳ Loading tasks...")
+        self.startup.mark("shell")
+        
+        # Let the window shell paint before doing any task work
+        self.root.after_idle(lambda: self.root.after(0, self.load_initial_tasks))
+
+    def load_initial_tasks(self):
+        """Start loading tasks once the window is on screen"""
+        self.startup.mark("first_paint")
+        self.background.submit(self.history.load, name="load_history", ordered=True,
+                               on_error=self._storage_failed)
+        self.background.submit(self.time_log.load, name="load_time_log", ordered=True,
+                               on_error=self._storage_failed)
+        self.reload_in_background(self._initial_tasks_loaded)
+
+    def _initial_tasks_loaded(self, tasks):
+        self.startup.mark("load")
+        self.tasks_loaded = True
+        self.set_tasks(tasks)  # Honours anything typed into search while loading
+        self.startup.mark("populate")
+        self.startup.log()
+
+    def on_close(self):
+        """Let queued saves finish before the window goes away"""
+        self.reminders.stop()
+        self.background.shutdown()
+        self.root.destroy()
+
+    # --------------------------
+    # Background storage
+    # --------------------------
+
+    def reload_in_background(self, on_loaded):
+        """Read tasks.json on the storage worker; on_loaded(tasks) runs on the Tk thread"""
+        generation = self._save_generation
+        
+        def loaded(tasks):
+            if generation != self._save_generation:
+                self.reload_in_background(on_loaded)  # Saved while reading: read again after the save
+            else:
+                on_loaded(tasks)
+        
+        self.background.submit(load_tasks, name="load_tasks", on_done=loaded,
+                               on_error=self._storage_failed, ordered=True)
+
+    def save_in_background(self):
+        """Queue a save of the current task list (and new history and time records) on the storage worker"""
+        self._save_generation += 1
+        self.background.submit(self._write_tasks, list(self.tasks), self._save_generation,
+                               name="save_tasks", on_done=self._tasks_saved,
+                               on_error=self._storage_failed, ordered=True)
+        self.background.submit(self.history.flush, name="save_history", ordered=True,
+                               on_error=self._storage_failed)
+        self.save_time_log()
+
+    def save_time_log(self):
+        """Queue an append of new time tracking records (tasks.json is not rewritten)"""
+        self.background.submit(self.time_log.flush, name="save_time_log", ordered=True,
+                               on_error=self._storage_failed)
+
+    def _write_tasks(self, snapshot, generation):
+        """Storage worker: write a snapshot unless a newer one is queued behind it"""
+        if generation == self._save_generation:
+            save_tasks(snapshot)
+
+    def _tasks_saved(self, result):
+        if self.storage_error:
+            self.storage_error = None
+            self.update_status_bar()
+
+    def _storage_failed(self, error):
+        self.storage_error = str(error)
         self.update_status_bar()
 
+    def set_tasks(self, tasks):
+        """Swap in a freshly loaded task list and rebuild everything derived from it"""
+        self.tasks = tasks
+        self.history.sync(self.tasks)  # Log changes made by other tools since the last look
+        self.background.submit(self.history.flush, name="save_history", ordered=True,
+                               on_error=self._storage_failed)
+        self.completion_index.rebuild(self.tasks)
+        self.subtasks.rebuild(self.tasks)
+        self.dependencies.rebuild(self.tasks)
+        self.scheduler.rebuild(self.tasks)
+        self.reminders.rebuild(self.tasks)
+        self.tags.rebuild(self.tasks)
+        self.duplicates.rebuild(self.tasks)
+        self.background.submit(DuplicateIndex.build_state, self.duplicates.begin_build(),
+                               name="build_duplicates", on_done=self.duplicates.finish_build)
+        self.time_log.rebuild(self.tasks)
+        self.report_cache.clear()
+        self.row_cache.clear()
+        self.apply_default_sort()
+        self.filter_tasks()
+
     def load_preferences(self):
         """Load user preferences from config file"""
         try:
@@ -49,10 +196,15 @@ class LiteTodoApp:
         return {"dark_mode": False}
     
     def save_preferences(self):
-        """Save user preferences to config file"""
+        """Save user preferences to config file (on the storage worker)"""
+        self.background.submit(self._write_preferences, dict(self.preferences),
+                               name="save_preferences", ordered=True)
+
+    @staticmethod
+    def _write_preferences(preferences):
         try:
             with open("config.json", "w") as f:
-                json.dump(self.preferences, f)
+                json.dump(preferences, f)
         except:
             pass
 
@@ -147,7 +299,8 @@ class LiteTodoApp:
         self.filter_var = tk.StringVar(value="All")
         self.filter_buttons = {}
         
-        for option in ["All", "Pending", "In Progress", "Done", "Overdue", "High Priority"]:
+        for option in ["All", "Pending", "In Progress", "Done", "Overdue", "High Priority", "Ready",
+                       "Next Up", "Recurring"]:
             is_selected = option == "All"
             btn = tk.Button(filter_inner, text=option,
                           command=lambda o=option: self.set_filter(o),
@@ -158,9 +311,27 @@ class LiteTodoApp:
             btn.pack(side=tk.LEFT, padx=2)
             self.filter_buttons[option] = btn
         
+        body = tk.Frame(self.root, bg=self.colors['bg'])
+        body.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 10))
+        
+        # Tag sidebar: every tag with its task count; picking one filters the table
+        sidebar = tk.Frame(body, bg=self.colors['border'], padx=1, pady=1)
+        sidebar.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 10))
+        sidebar_inner = tk.Frame(sidebar, bg=self.colors['card_bg'])
+        sidebar_inner.pack(fill=tk.BOTH, expand=True)
+        tk.Label(sidebar_inner, text="🏷️ Tags", bg=self.colors['card_bg'], fg=self.colors['fg'],
+                font=('Segoe UI', 10, 'bold'), anchor='w').pack(fill=tk.X, padx=10, pady=(8, 4))
+        self.tag_list = tk.Listbox(sidebar_inner, width=18, exportselection=False, activestyle='none',
+                                   bg=self.colors['card_bg'], fg=self.colors['fg'],
+                                   selectbackground=self.colors['accent2'], selectforeground='white',
+                                   font=('Segoe UI', 10), relief=tk.FLAT, bd=0, highlightthickness=0)
+        self.tag_list.pack(fill=tk.BOTH, expand=True, padx=(6, 0), pady=(0, 6))
+        self.tag_list.bind("<<ListboxSelect>>", self.on_tag_selected)
+        self._sidebar_tags = []  # Tag shown on each listbox line (None for "All tags")
+        
         # Task Table with modern styling
-        table_container = tk.Frame(self.root, bg=self.colors['border'], padx=1, pady=1)
-        table_container.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 10))
+        table_container = tk.Frame(body, bg=self.colors['border'], padx=1, pady=1)
+        table_container.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         table_frame = tk.Frame(table_container, bg=self.colors['card_bg'])
         table_frame.pack(fill=tk.BOTH, expand=True)
@@ -169,7 +340,7 @@ class LiteTodoApp:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         columns = ("status", "priority", "title", "deadline", "tags")
-        self.tree = ttk.Treeview(table_frame, columns=columns, show="headings",
+        self.tree = ttk.Treeview(table_frame, columns=columns, show=("tree", "headings"),
                                 yscrollcommand=scrollbar.set)
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.config(command=self.tree.yview)
@@ -183,6 +354,8 @@ class LiteTodoApp:
             "tags": (200, "🏷️ Tags")
         }
         
+        self.tree.column("#0", width=40, minwidth=40, stretch=False)  # Expand arrows for subtasks
+        
         for col, (width, heading) in column_config.items():
             self.tree.heading(col, text=heading, command=lambda c=col: self.sort_tasks(c))
             self.tree.column(col, width=width, anchor=tk.CENTER)
@@ -217,6 +390,13 @@ class LiteTodoApp:
                                bd=0, relief=tk.FLAT, padx=16, pady=8, cursor="hand2")
         pending_btn.pack(side=tk.LEFT, padx=(0, 8))
         
+        timer_btn = tk.Button(action_frame, text="⏱  Start/Stop",
+                             command=self.toggle_timer,
+                             bg=self.colors.get('accent_purple', '#8b5cf6'), fg='white',
+                             font=('Segoe UI', 10, 'bold'),
+                             bd=0, relief=tk.FLAT, padx=16, pady=8, cursor="hand2")
+        timer_btn.pack(side=tk.LEFT, padx=(0, 8))
+        
         edit_btn = tk.Button(action_frame, text="✏️  Edit",
                             command=self.edit_task_popup,
                             bg=self.colors['accent2'], fg='white',
@@ -239,6 +419,8 @@ class LiteTodoApp:
         self.tree.bind("<Delete>", lambda e: self.delete_task())
         self.tree.bind("<Control-c>", self.copy_selected_row)
         self.tree.bind("<Control-C>", self.copy_selected_row)
+        self.tree.bind("<<TreeviewOpen>>", self.on_row_open)
+        self.tree.bind("<<TreeviewClose>>", self.on_row_close)
         
         # Track clicked cell for context menu
         self.clicked_column = None
@@ -252,7 +434,10 @@ class LiteTodoApp:
         self.menu.add_command(label="  ✅  Mark as Done  ", command=self.mark_done)
         self.menu.add_command(label="  🔄  Mark In Progress  ", command=self.mark_in_progress)
         self.menu.add_command(label="  ↩️  Mark as Pending  ", command=self.mark_pending)
+        self.menu.add_command(label="  ⏱  Start/Stop Timer  ", command=self.toggle_timer)
         self.menu.add_command(label="  ✏️  Edit Task  ", command=self.edit_task_popup)
+        self.menu.add_command(label="  ➕  Add Subtask  ", command=self.add_subtask_popup)
+        self.menu.add_command(label="  ⛓  Blocked By...  ", command=self.blocked_by_popup)
         self.menu.add_command(label="  🗑  Delete Task  ", command=self.delete_task)
         self.menu.add_separator()
         self.menu.add_command(label="  📋  Copy Cell  ", command=self.copy_clicked_cell)
@@ -288,7 +473,10 @@ class LiteTodoApp:
         self.root.bind('<Control-R>', lambda e: self.generate_report_popup())
         self.root.bind('<Control-f>', lambda e: self.search_var.get() or self.focus_search())
         self.root.bind('<Control-F>', lambda e: self.search_var.get() or self.focus_search())
+        self.root.bind('<Control-t>', lambda e: self.toggle_timer())
+        self.root.bind('<Control-T>', lambda e: self.toggle_timer())
         self.root.bind('<F5>', lambda e: self.refresh_tasks())
+        self.root.bind('<F12>', lambda e: self.toggle_perf_panel())
     
     def focus_search(self):
         """Focus on search entry"""
@@ -301,44 +489,81 @@ class LiteTodoApp:
                                 entry.focus_set()
                                 return
 
+    @perf.timed("filter_tasks")
     def filter_tasks(self):
         """Filter tasks based on search and filter criteria"""
         search_text = self.search_var.get().lower()
         filter_option = self.filter_var.get()
         
-        self.filtered_tasks = []
-        for task in self.tasks:
-            # Apply search filter
-            if search_text:
-                if not (search_text in task.title.lower() or
-                       search_text in ' '.join(task.tags).lower() or
-                       search_text in task.priority.lower()):
-                    continue
-            
-            # Apply status filter
-            if filter_option == "Pending" and task.status != "Pending":
-                continue
-            elif filter_option == "In Progress" and task.status != "In Progress":
-                continue
-            elif filter_option == "Done" and task.status != "Done":
-                continue
-            elif filter_option == "Overdue" and not task.is_overdue():
-                continue
-            elif filter_option == "High Priority" and task.priority != "High":
-                continue
-            
-            self.filtered_tasks.append(task)
+        if self.tag_filter is not None and self.tag_filter not in self.tags.counts:
+            self.tag_filter = None  # Its last task is gone
+        tag = self.tag_filter
+        
+        # Without a search or filter subtasks are listed under their (lazily expanded) parents
+        self._tree_mode = not search_text and filter_option == "All" and tag is None
+        if self._tree_mode:
+            is_root = self.subtasks.is_root
+            self.filtered_tasks = [task for task in self.tasks if is_root(task)]
+        elif filter_option == "Ready":
+            # Straight from the dependency index, in the current sort order
+            self.filtered_tasks = [task for task in self.dependencies.ready()
+                                   if matches_filter(task, search_text) and (tag is None or tag in task.tags)]
+            if self.sort_by:
+                self.filtered_tasks.sort(key=column_sort_key(self.sort_by), reverse=self.sort_reverse)
+            else:
+                self.filtered_tasks.sort(key=default_sort_key)
+        elif filter_option == "Next Up":
+            # Most urgent first, skipping tasks that are waiting on a blocker
+            self.scheduler.check_day()
+            ranked = (task for task in self.scheduler.ranked(self.dependencies.open_blockers)
+                      if matches_filter(task, search_text) and (tag is None or tag in task.tags))
+            self.filtered_tasks = list(islice(ranked, self.NEXT_UP_COUNT))
+        else:
+            self.filtered_tasks = [task for task in self.tasks
+                                   if matches_filter(task, search_text, filter_option)
+                                   and (tag is None or tag in task.tags)]
         
         self.populate_tasks()
         self.update_status_bar()
+        self.update_tag_sidebar()
+
+    def update_tag_sidebar(self):
+        """Redraw the tag list if any tag count changed since it was drawn"""
+        if self._sidebar_version == self.tags.version:
+            return
+        self._sidebar_version = self.tags.version
+        self._sidebar_tags = [None] + [tag for tag, _ in self.tags.most_used()]
+        self.tag_list.delete(0, tk.END)
+        self.tag_list.insert(tk.END, f"All tags  ({len(self.tags)})",
+                             *(f"{tag}  ({self.tags.counts[tag]})" for tag in self._sidebar_tags[1:]))
+        self.tag_list.selection_set(self._sidebar_tags.index(self.tag_filter))
+
+    def on_tag_selected(self, event):
+        selection = self.tag_list.curselection()
+        if selection:
+            tag = self._sidebar_tags[selection[0]]
+            if tag != self.tag_filter:
+                self.tag_filter = tag
+                self.filter_tasks()
 
     def refresh_tasks(self):
         """Reload tasks from file"""
-        self.tasks = load_tasks()
-        self.apply_default_sort()
-        self.filter_tasks()
+        self.status_bar.config(text="⏳ Reloading tasks...")
+        self.reload_in_background(self._tasks_reloaded)
+
+    def _tasks_reloaded(self, tasks):
+        self.set_tasks(tasks)
         messagebox.showinfo("Refreshed", "Tasks reloaded from file")
 
+    def toggle_perf_panel(self):
+        """Show or hide the hidden performance panel (F12)"""
+        from dialogs import PerfPanel
+        if self.perf_panel is not None and self.perf_panel.top.winfo_exists():
+            self.perf_panel.close()
+            self.perf_panel = None
+        else:
+            self.perf_panel = PerfPanel(self.root, dark_mode=self.dark_mode)
+
     def toggle_theme(self):
         """Toggle between light and dark mode"""
         self.dark_mode = not self.dark_mode
@@ -348,47 +573,43 @@ class LiteTodoApp:
         # Restart app for theme change
         messagebox.showinfo("Theme Changed", "Please restart the app to apply the new theme")
 
+    @perf.timed("update_status_bar")
     def update_status_bar(self):
         """Update status bar with task statistics"""
+        if self._populate_job is not None:
+            return  # Progress is shown until the table is filled
         total = len(self.tasks)
-        pending = sum(1 for t in self.tasks if t.status == "Pending")
-        in_progress = sum(1 for t in self.tasks if t.status == "In Progress")
-        done = sum(1 for t in self.tasks if t.status == "Done")
-        overdue = sum(1 for t in self.tasks if t.is_overdue())
+        counts = count_statuses(self.tasks)
+        pending = counts["Pending"]
+        in_progress = counts["In Progress"]
+        done = counts["Done"]
+        overdue = counts["Overdue"]
         
         filtered_count = len(self.filtered_tasks)
         status_text = f"📋 Total: {total}   •   ⏳ Pending: {pending}   •   🔄 In Progress: {in_progress}   •   ✅ Done: {done}   •   ⚠️ Overdue: {overdue}"
         
-        if filtered_count < total:
+        if filtered_count < total and not self._tree_mode:
             status_text += f"   •   🔍 Showing: {filtered_count}"
         
+        running = len(self.time_log.running())
+        if running:
+            status_text += f"   •   ⏱ Timers running: {running}"
+        
+        if self.storage_error:
+            status_text = f"⚠️ Not saved: {self.storage_error}   •   " + status_text
+        
         self.status_bar.config(text=status_text)
 
     def apply_default_sort(self):
         """Apply default sorting: by deadline first, then by priority"""
-        priority_order = {"High": 0, "Medium": 1, "Low": 2}
-        self.tasks.sort(key=lambda t: (
-            t.deadline is None,  # Tasks without deadline go last
-            t.deadline or "",
-            priority_order.get(t.priority, 3)
-        ))
+        self.tasks.sort(key=default_sort_key)
         self.filtered_tasks = self.tasks.copy()
 
     def apply_current_sort(self):
         """Reapply the current sort (or default if none selected)"""
         if self.sort_by:
             # Reapply the current column sort
-            if self.sort_by == "priority":
-                priority_order = {"High": 0, "Medium": 1, "Low": 2}
-                self.tasks.sort(key=lambda t: priority_order.get(t.priority, 3), reverse=self.sort_reverse)
-            elif self.sort_by == "deadline":
-                self.tasks.sort(key=lambda t: (t.deadline is None, t.deadline or ""), reverse=self.sort_reverse)
-            elif self.sort_by == "status":
-                self.tasks.sort(key=lambda t: t.status, reverse=self.sort_reverse)
-            elif self.sort_by == "title":
-                self.tasks.sort(key=lambda t: t.title.lower(), reverse=self.sort_reverse)
-            elif self.sort_by == "tags":
-                self.tasks.sort(key=lambda t: ', '.join(t.tags).lower(), reverse=self.sort_reverse)
+            self.tasks.sort(key=column_sort_key(self.sort_by), reverse=self.sort_reverse)
         else:
             # Apply default sort
             self.apply_default_sort()
@@ -401,70 +622,146 @@ class LiteTodoApp:
             self.sort_by = column
             self.sort_reverse = False
         
-        if column == "priority":
-            priority_order = {"High": 0, "Medium": 1, "Low": 2}
-            self.tasks.sort(key=lambda t: priority_order.get(t.priority, 3), reverse=self.sort_reverse)
-        elif column == "deadline":
-            self.tasks.sort(key=lambda t: (t.deadline is None, t.deadline or ""), reverse=self.sort_reverse)
-        elif column == "status":
-            self.tasks.sort(key=lambda t: t.status, reverse=self.sort_reverse)
-        elif column == "title":
-            self.tasks.sort(key=lambda t: t.title.lower(), reverse=self.sort_reverse)
-        elif column == "tags":
-            self.tasks.sort(key=lambda t: ', '.join(t.tags).lower(), reverse=self.sort_reverse)
-        
-        save_tasks(self.tasks)
+        key = column_sort_key(column)
+        if key is not None:
+            self.tasks.sort(key=key, reverse=self.sort_reverse)
+        
+        self.save_in_background()
         self.filter_tasks()
 
+    @perf.timed("populate_tasks")
     def populate_tasks(self):
-        """Populate the task table"""
+        """Populate the task table, in time-boxed batches when there are many rows"""
+        self.cancel_populate()
+        
         # Clear existing rows
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        
-        for idx, task in enumerate(self.filtered_tasks):
-            # Find original index in self.tasks
-            original_idx = self.tasks.index(task)
-            
-            tags_str = ", ".join(task.tags) if task.tags else "—"
-            
-            # Format priority with icons
-            priority_icons = {"High": "🔴 High", "Medium": "🟡 Medium", "Low": "🟢 Low"}
-            priority_display = priority_icons.get(task.priority, task.priority)
-            
-            # Format deadline
-            deadline_display = task.deadline if task.deadline else "—"
-            
-            # Status icons: Done=✅, In Progress=🔄, Pending=⬜
-            if task.status == "Done":
-                status_icon = "✅"
-            elif task.status == "In Progress":
-                status_icon = "🔄"
+        self.tree.delete(*self.tree.get_children())
+        
+        # Position of each task in self.tasks (the row iid), without a list.index() per row
+        self._positions = positions = {id(task): idx for idx, task in enumerate(self.tasks)}
+        self.row_cache.check_day()
+        rows = iter(self.filtered_tasks)
+        total = len(self.filtered_tasks)
+        
+        # The first batch goes in right away; the rest yield to the event loop in between
+        self._populate_batch(rows, positions, 0, total)
+
+    def _populate_batch(self, rows, positions, shown, total):
+        start = time.perf_counter()
+        insert_row = self._insert_row
+        with perf.span("populate_tasks.batch"):
+            while True:
+                chunk = list(islice(rows, self.POPULATE_CHUNK_ROWS))
+                for task in chunk:
+                    insert_row("", task, positions)
+                shown += len(chunk)
+                if len(chunk) < self.POPULATE_CHUNK_ROWS or time.perf_counter() - start > self.POPULATE_BUDGET_S:
+                    break
+        
+        if shown < total:
+            self.status_bar.config(text=f"⏳ Showing {shown:,} of {total:,} tasks...")
+            self._populate_job = self.root.after(1, lambda: self._populate_batch(rows, positions, shown, total))
+        elif self._populate_job is not None:
+            # Last of several batches: replace the progress text with the counts
+            self._populate_job = None
+            self.update_status_bar()
+
+    def _insert_row(self, parent_iid, task, positions):
+        """Insert one task row; parents get a placeholder child until they are opened"""
+        iid = positions[id(task)]
+        values, item_tags = self._row_values(task)
+        self.tree.insert(parent_iid, tk.END, iid=iid, values=values, tags=item_tags)
+        if self._tree_mode and self.subtasks.has_children(task.id):
+            self.tree.insert(iid, tk.END, iid=f"more-{iid}")
+            if task.id in self.expanded:
+                self.tree.item(iid, open=True)
+                self._insert_children(iid, task)
+
+    def _row_values(self, task):
+        """Cached row for a task, with its subtask rollup, open blockers and tracked time in the title"""
+        values, item_tags = self.row_cache.row(task)
+        rollup = self.subtasks.rollup(task.id)
+        blockers = self.dependencies.open_blockers(task.id)
+        tracked = self.time_log.task_seconds(task.id)
+        running = self.time_log.is_running(task.id)
+        if rollup is not None or blockers or tracked or running:
+            title = values[2]
+            if rollup is not None:
+                title += f"   ({rollup[0]}/{rollup[1]} done)"
+            if blockers:
+                title += f"   ⛓ {blockers}"
+            if running:
+                title += f"   ⏱ {format_duration(tracked)} ▶"
+            elif tracked:
+                title += f"   ⏱ {format_duration(tracked)}"
+            values = values[:2] + (title,) + values[3:]
+        return values, item_tags
+
+    def _insert_children(self, iid, task):
+        """Replace a parent's placeholder with its subtask rows (once per populate)"""
+        placeholder = f"more-{iid}"
+        if not self.tree.exists(placeholder):
+            return
+        self.tree.delete(placeholder)
+        positions = self._positions
+        for child in sorted(self.subtasks.children(task.id), key=lambda t: positions[id(t)]):
+            self._insert_row(iid, child, positions)
+
+    def on_row_open(self, event):
+        """Materialise subtask rows the first time a parent is expanded"""
+        iid = self.tree.focus()
+        if iid.isdigit():
+            task = self.tasks[int(iid)]
+            self.expanded.add(task.id)
+            self._insert_children(iid, task)
+
+    def on_row_close(self, event):
+        iid = self.tree.focus()
+        if iid.isdigit():
+            self.expanded.discard(self.tasks[int(iid)].id)
+
+    # --------------------------
+    # Reminders
+    # --------------------------
+
+    def show_reminders(self, due):
+        """Reminder timer fired: notify about the due events and repaint rows that just went overdue"""
+        lines = []
+        for when, task, kind in due:
+            if kind == "overdue":
+                lines.append(f"⚠️ Overdue: {task.title}")
+                self.refresh_row(task)
+            elif kind == "due":
+                lines.append(f"📅 Due today: {task.title}")
             else:
-                status_icon = "⬜"
-            
-            values = (
-                status_icon,
-                priority_display,
-                task.title,
-                deadline_display,
-                tags_str
-            )
-            
-            item_tags = []
-            if task.is_overdue():
-                item_tags.append("overdue")
-            elif task.status == "Done":
-                item_tags.append("done")
-            elif task.status == "In Progress":
-                item_tags.append("in_progress")
-            
-            self.tree.insert("", tk.END, iid=original_idx, values=values, tags=item_tags)
+                lines.append(f"⏰ {task.title}")
+        if len(lines) > self.TOAST_MAX_LINES:
+            more = len(lines) - self.TOAST_MAX_LINES + 1
+            lines = lines[:self.TOAST_MAX_LINES - 1] + [f"... and {more} more"]
+        self.root.bell()
+        show_toast(self.root, "⏰ Reminders" if len(due) > 1 else "⏰ Reminder", lines, self.colors)
+        if any(kind == "overdue" for _, _, kind in due):
+            self.update_status_bar()
+
+    def refresh_row(self, task):
+        """Reformat one task's row in place if it is on screen"""
+        self.row_cache.on_change("edit", task)
+        iid = self._positions.get(id(task))
+        if iid is None or not self.tree.exists(iid):
+            return
+        values, item_tags = self._row_values(task)
+        self.tree.item(iid, values=values, tags=item_tags)
+
+    def cancel_populate(self):
+        """Stop filling the table (a newer filter or sort supersedes it)"""
+        if self._populate_job is not None:
+            self.root.after_cancel(self._populate_job)
+            self._populate_job = None
 
     def on_cell_click(self, event):
         """Track which cell was clicked for copy operations"""
         col = self.tree.identify_column(event.x)
-        if col:
+        if col and col != "#0":
             # Convert #1, #2, etc. to column index
             self.clicked_column = int(col.replace('#', '')) - 1
         else:
@@ -477,7 +774,7 @@ class LiteTodoApp:
             self.tree.selection_set(selected)
             # Track which column was right-clicked
             col = self.tree.identify_column(event.x)
-            if col:
+            if col and col != "#0":
                 self.clicked_column = int(col.replace('#', '')) - 1
             self.menu.post(event.x_root, event.y_root)
     
@@ -511,105 +808,189 @@ class LiteTodoApp:
         self.status_bar.config(text="Row copied to clipboard")
         return 'break'  # Prevent default behavior
 
+    def _selected_index(self, warn=True):
+        """List index of the selected task (None if no task row, e.g. a "Loading…" row, is selected)"""
+        selected = self.tree.selection()
+        if selected and selected[0].isdigit() and int(selected[0]) < len(self.tasks):
+            return int(selected[0])
+        if warn:
+            messagebox.showwarning("No Selection", "Please select a task first.")
+        return None
+
     def copy_task_title(self):
         """Copy selected task title to clipboard"""
-        selected = self.tree.selection()
-        if not selected:
+        idx = self._selected_index(warn=False)
+        if idx is None:
             return
-        idx = int(selected[0])
         self.root.clipboard_clear()
         self.root.clipboard_append(self.tasks[idx].title)
         self.status_bar.config(text=f"Title copied: {self.tasks[idx].title[:50]}{'...' if len(self.tasks[idx].title) > 50 else ''}")
 
+    def get_dialog(self, dialog_class, **kwargs):
+        """Shared instance of a dialog, built on first use and reused afterwards"""
+        dialog = self.dialogs.get(dialog_class)
+        if dialog is None or not dialog.top.winfo_exists():
+            dialog = self.dialogs[dialog_class] = dialog_class(self.root, dark_mode=self.dark_mode, **kwargs)
+        return dialog
+
+    def _task_popup(self):
+        """The shared add/edit dialog, wired to the tag and duplicate indexes"""
+        from dialogs import TaskPopup
+        return self.get_dialog(TaskPopup, tag_index=self.tags, duplicate_index=self.duplicates)
+
     def add_task_popup(self):
         """Show add task dialog"""
-        popup = TaskPopup(self.root, "Add Task", dark_mode=self.dark_mode)
-        self.root.wait_window(popup.top)
-        if popup.task:
-            add_task(self.tasks, popup.task)
+        if not self.tasks_loaded:
+            self.status_bar.config(text="⏳ Still loading tasks, try again in a moment")
+            return
+        task = self._task_popup().open("Add Task")
+        if task:
+            add_task(self.tasks, task, save=False)
+            self.save_in_background()
+            self.apply_current_sort()
+            self.filter_tasks()
+
+    def add_subtask_popup(self):
+        """Show add task dialog for a subtask of the selected task"""
+        idx = self._selected_index()
+        if idx is None:
+            return
+        parent = self.tasks[idx]
+        task = self._task_popup().open(f"Add Subtask to {parent.title[:40]}")
+        if task:
+            task.parent_id = parent.id
+            add_task(self.tasks, task, save=False)
+            self.expanded.add(parent.id)
+            self.save_in_background()
             self.apply_current_sort()
             self.filter_tasks()
 
+    def blocked_by_popup(self):
+        """Choose the tasks the selected task is blocked by"""
+        from dialogs import BlockersPopup
+        idx = self._selected_index()
+        if idx is None:
+            return
+        task = self.tasks[idx]
+        blocker_ids = self.get_dialog(BlockersPopup).open(task, self.tasks)
+        if blocker_ids is None or blocker_ids == task.blocked_by:
+            return
+        cycle = self.dependencies.would_cycle(task.id, blocker_ids)
+        if cycle:
+            titles = {t.id: t.title for t in self.tasks}
+            chain = " → ".join(titles.get(task_id, f"#{task_id}") for task_id in cycle + [task.id])
+            messagebox.showerror("Dependency Cycle", f"That would make the task wait on itself:\n\n{chain}")
+            return
+        edited = Task.from_dict(task.to_dict())
+        edited.blocked_by = blocker_ids
+        edit_task(self.tasks, idx, edited, save=False)
+        self.save_in_background()
+        self.filter_tasks()
+
     def edit_task_popup(self):
         """Show edit task dialog"""
-        selected = self.tree.selection()
-        if not selected:
+        idx = self._selected_index(warn=False)
+        if idx is None:
             return
-        idx = int(selected[0])
         task = self.tasks[idx]
-        popup = TaskPopup(self.root, "Edit Task", task, dark_mode=self.dark_mode)
-        self.root.wait_window(popup.top)
-        if popup.task:
-            edit_task(self.tasks, idx, popup.task)
+        edited = self._task_popup().open("Edit Task", task)
+        if edited:
+            edit_task(self.tasks, idx, edited, save=False)
+            self.save_in_background()
             self.apply_current_sort()
             self.filter_tasks()
 
     def delete_task(self):
         """Delete selected task"""
-        selected = self.tree.selection()
-        if not selected:
-            messagebox.showwarning("No Selection", "Please select a task first.")
+        idx = self._selected_index()
+        if idx is None:
             return
         try:
-            idx = int(selected[0])
             if 0 <= idx < len(self.tasks):
-                if messagebox.askyesno("Confirm Delete", f"Delete task: {self.tasks[idx].title}?"):
-                    delete_task(self.tasks, idx)
+                task = self.tasks[idx]
+                doomed = set(self.subtasks.descendant_ids(task.id))
+                prompt = f"Delete task: {task.title}?"
+                if doomed:
+                    prompt = f"Delete task: {task.title} and its {len(doomed)} subtasks?"
+                if messagebox.askyesno("Confirm Delete", prompt):
+                    doomed.add(task.id)
+                    # Highest positions first so the remaining ones stay valid
+                    positions = [i for i, t in enumerate(self.tasks) if t.id in doomed]
+                    for i in reversed(positions):
+                        delete_task(self.tasks, i, save=False)
+                    self.save_in_background()
                     self.filter_tasks()
         except (ValueError, IndexError) as e:
             messagebox.showerror("Error", f"Could not delete task: {e}")
 
     def mark_done(self):
         """Mark selected task as done with optional remarks"""
-        selected = self.tree.selection()
-        if not selected:
-            messagebox.showwarning("No Selection", "Please select a task first.")
+        from dialogs import MarkDonePopup
+        idx = self._selected_index()
+        if idx is None:
             return
         try:
-            idx = int(selected[0])
             if 0 <= idx < len(self.tasks):
                 task = self.tasks[idx]
-                popup = MarkDonePopup(self.root, task.title, dark_mode=self.dark_mode)
-                self.root.wait_window(popup.top)
-                if popup.confirmed:
-                    mark_task_done(self.tasks, idx, popup.remarks)
+                popup = self.get_dialog(MarkDonePopup)
+                if popup.open(task.title):
+                    if mark_task_done(self.tasks, idx, popup.remarks, save=False):
+                        self.apply_current_sort()  # Sort in the next occurrence it spawned
+                    self.save_in_background()
                     self.filter_tasks()
         except (ValueError, IndexError) as e:
             messagebox.showerror("Error", f"Could not update task: {e}")
     
     def mark_pending(self):
         """Mark selected task as pending"""
-        selected = self.tree.selection()
-        if not selected:
-            messagebox.showwarning("No Selection", "Please select a task first.")
+        idx = self._selected_index()
+        if idx is None:
             return
         try:
-            idx = int(selected[0])
             if 0 <= idx < len(self.tasks):
-                self.tasks[idx].status = "Pending"
-                self.tasks[idx].completion_date = None
-                self.tasks[idx].remarks = None
-                save_tasks(self.tasks)
+                set_task_status(self.tasks, idx, "Pending", save=False)
+                self.save_in_background()
                 self.filter_tasks()
         except (ValueError, IndexError) as e:
             messagebox.showerror("Error", f"Could not update task: {e}")
     
     def mark_in_progress(self):
         """Mark selected task as in progress"""
-        selected = self.tree.selection()
-        if not selected:
-            messagebox.showwarning("No Selection", "Please select a task first.")
+        idx = self._selected_index()
+        if idx is None:
             return
         try:
-            idx = int(selected[0])
             if 0 <= idx < len(self.tasks):
-                self.tasks[idx].status = "In Progress"
-                self.tasks[idx].completion_date = None
-                save_tasks(self.tasks)
+                set_task_status(self.tasks, idx, "In Progress", save=False)
+                self.save_in_background()
                 self.filter_tasks()
         except (ValueError, IndexError) as e:
             messagebox.showerror("Error", f"Could not update task: {e}")
 
+    def toggle_timer(self):
+        """Start or stop time tracking on the selected task"""
+        idx = self._selected_index()
+        if idx is None:
+            return
+        try:
+            if 0 <= idx < len(self.tasks):
+                task = self.tasks[idx]
+                if task.status == "Done" and not self.time_log.is_running(task.id):
+                    messagebox.showinfo("Task Done", "Time can only be tracked on open tasks.")
+                    return
+                self.time_log.toggle(task.id)
+                self.save_time_log()
+                self.report_cache.clear()  # Cached reports don't include the new interval
+                self.refresh_row(task)
+                self.update_status_bar()
+        except (ValueError, IndexError) as e:
+            messagebox.showerror("Error", f"Could not update timer: {e}")
+
     def generate_report_popup(self):
         """Show report generation dialog"""
-        popup = ReportPopup(self.root, self.tasks, dark_mode=self.dark_mode)
+        from dialogs import ReportPopup
+        popup = self.get_dialog(ReportPopup, background=self.background,
+                                completion_index=self.completion_index,
+                                report_cache=self.report_cache, history=self.history,
+                                time_log=self.time_log)
+        popup.open(self.tasks)
@@ -0,0 +1,119 @@
+# background.py - Worker threads for blocking work, with results delivered on the Tk thread
+#
+# Workers never touch Tk. Each finished job (or progress update) is put on a
+# thread-safe queue, and the Tk thread drains that queue from an after()
+# callback that only runs while jobs are outstanding. Storage writes go
+# through a single "ordered" worker so saves land on disk in the order they
+# were submitted; everything else shares a small pool.
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import perf
+
+
+class Job:
+    """Handle for submitted work: cancellation flag and progress reporting"""
+
+    def __init__(self, name, on_done=None, on_error=None, on_progress=None):
+        self.name = name
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.cancel_event = threading.Event()
+        self.finished = False
+        self._runner = None
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        """Ask the worker to stop; no callbacks run for a cancelled job"""
+        self.cancel_event.set()
+
+    def progress(self, value):
+        """Report progress from the worker; on_progress(value) runs on the Tk thread"""
+        if self.on_progress is not None and not self.cancelled:
+            self._runner._results.put(("progress", self, value))
+
+
+class BackgroundRunner:
+    """Runs functions off the Tk thread and calls back on it"""
+
+    POLL_INTERVAL_MS = 15
+
+    def __init__(self, root, max_workers=2):
+        self.root = root
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="background")
+        self._ordered = ThreadPoolExecutor(max_workers=1, thread_name_prefix="background-io")
+        self._results = queue.Queue()
+        self._outstanding = 0
+        self._poll_job = None
+
+    def submit(self, fn, *args, name=None, on_done=None, on_error=None, on_progress=None,
+               with_job=False, ordered=False):
+        """Run fn(*args) on a worker (fn(job, *args) if with_job) and return its Job.
+
+        on_done(result), on_error(exception) and on_progress(value) are called
+        on the Tk thread. ordered=True runs the job on the single storage
+        worker, after every ordered job submitted before it.
+        """
+        job = Job(name or getattr(fn, "__name__", "job"), on_done, on_error, on_progress)
+        job._runner = self
+        call_args = (job,) + args if with_job else args
+        executor = self._ordered if ordered else self._pool
+        self._outstanding += 1
+        executor.submit(self._run, job, fn, call_args)
+        self._schedule_poll()
+        return job
+
+    def _run(self, job, fn, args):
+        """Worker thread: run the job and queue its outcome (never touches Tk)"""
+        if job.cancelled:
+            self._results.put(("done", job, None))
+            return
+        try:
+            with perf.span(f"background.{job.name}"):
+                result = fn(*args)
+        except Exception as e:
+            self._results.put(("error", job, e))
+        else:
+            self._results.put(("done", job, result))
+
+    def _schedule_poll(self):
+        if self._poll_job is None:
+            self._poll_job = self.root.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        """Tk thread: dispatch queued results, keep polling while jobs are outstanding"""
+        self._poll_job = None
+        while True:
+            try:
+                kind, job, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if kind != "progress":
+                self._outstanding -= 1
+                job.finished = True
+            if job.cancelled:
+                continue
+            if kind == "progress":
+                job.on_progress(value)
+            elif kind == "error":
+                if job.on_error is not None:
+                    job.on_error(value)
+                else:
+                    print(f"Background job {job.name} failed: {value}")
+            elif job.on_done is not None:
+                job.on_done(value)
+        if self._outstanding > 0:
+            self._schedule_poll()
+
+    def shutdown(self):
+        """Wait for queued work (pending saves included) and stop the workers"""
+        if self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
+            self._poll_job = None
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._ordered.shutdown(wait=True)
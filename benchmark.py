@@ -0,0 +1,350 @@
+"""
+Synthetic-load benchmark suite for TaskManager
+Times storage, mutations, search/filter, sorting, status counting and
+report formatting and flow metrics headlessly on deterministic generated task sets.
+
+Usage:
+    python benchmark.py                                  # 1k, 10k, 100k tasks
+    python benchmark.py --sizes 1k,10k,1m --output bench.json
+    python benchmark.py --save-baseline bench_baseline.json
+    python benchmark.py --baseline bench_baseline.json   # exit 1 on regression
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import task_manager
+from task_manager import (Task, load_tasks, save_tasks, add_task, delete_task, mark_task_done,
+                          edit_task, set_task_status, matches_filter, default_sort_key,
+                          column_sort_key, count_statuses, assign_task_ids, add_change_listener,
+                          remove_change_listener)
+from indexes import CompletionIndex, SubtaskIndex, DependencyIndex, TagIndex
+from report import group_report_tasks, format_report
+from rows import format_task_row, RowCache
+from history import TaskHistory
+from analytics import compute_metrics
+from scheduler import TaskScheduler
+from dedupe import DuplicateIndex
+from timelog import TimeLog
+
+SIZES = {"1k": 1000, "10k": 10000, "100k": 100000, "1m": 1000000}
+DEFAULT_SIZES = "1k,10k,100k"
+REFERENCE_DATE = date(2026, 1, 1)
+
+VERBS = ["Fix", "Review", "Write", "Update", "Deploy", "Investigate", "Refactor", "Test",
+         "Document", "Plan", "Migrate", "Benchmark", "Triage", "Prepare", "Clean up"]
+NOUNS = ["login flow", "release notes", "dashboard", "API docs", "billing job", "search index",
+         "onboarding guide", "CI pipeline", "backup script", "sprint board", "metrics export",
+         "error handling", "cache layer", "user survey", "design review", "database schema"]
+TAGS = ["work", "backend", "frontend", "ops", "urgent", "docs", "meeting", "personal", "bug",
+        "feature", "infra", "review", "q1", "q2", "customer", "research", "admin", "security"]
+
+
+# --------------------------
+# Synthetic data
+# --------------------------
+
+def generate_tasks(count, seed=42, today=REFERENCE_DATE):
+    """Deterministic task set with realistic status, deadline and tag distributions"""
+    rng = random.Random(seed)
+    tag_weights = [1.0 / (rank + 1) for rank in range(len(TAGS))]  # Zipf-like popularity
+    tasks = []
+    for i in range(count):
+        roll = rng.random()
+        status = "Done" if roll < 0.60 else ("In Progress" if roll < 0.75 else "Pending")
+        roll = rng.random()
+        priority = "High" if roll < 0.2 else ("Medium" if roll < 0.75 else "Low")
+
+        deadline = None
+        if rng.random() < 0.7:
+            offset = rng.randint(-90, 180) if status != "Done" else rng.randint(-1000, 30)
+            deadline = (today + timedelta(days=offset)).strftime("%Y-%m-%d")
+
+        completion_date = None
+        remarks = None
+        if status == "Done":
+            completion_date = (today - timedelta(days=rng.randint(0, 3 * 365))).strftime("%Y-%m-%d")
+            if rng.random() < 0.3:
+                remarks = f"Closed after {rng.choice(NOUNS)} check"
+
+        tag_count = min(int(rng.expovariate(1.0)), 4)
+        tags = sorted(set(rng.choices(TAGS, weights=tag_weights, k=tag_count)))
+        title = f"{rng.choice(VERBS)} {rng.choice(NOUNS)} #{i}"
+        tasks.append(Task(title, deadline, priority, status, tags, completion_date, remarks))
+    return assign_task_ids(tasks)
+
+
+def generate_history(tasks, seed=42, today=REFERENCE_DATE):
+    """Status history for a task set: created, usually started, done on the completion date"""
+    rng = random.Random(seed)
+    events = []
+    for task in tasks:
+        if task.completion_date:
+            done = datetime.strptime(task.completion_date, "%Y-%m-%d") + timedelta(hours=rng.randint(9, 18))
+        else:
+            done = datetime.combine(today, datetime.min.time())
+        started = done - timedelta(hours=rng.randint(1, 24 * 30))
+        created = started - timedelta(hours=rng.randint(1, 24 * 60))
+        events.append((created, task.id, "Pending"))
+        if task.status != "Pending":
+            events.append((started, task.id, "In Progress"))
+        if task.status == "Done":
+            events.append((done, task.id, "Done"))
+    events.sort(key=lambda event: event[0])
+    history = TaskHistory(path=os.devnull)
+    for when, task_id, status in events:
+        history.record(task_id, status, when)
+    return history
+
+
+# --------------------------
+# Benchmarks
+# --------------------------
+
+def _best_of(fn, repeat):
+    """Fastest of several runs of fn(), in seconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _per_op(fn, tasks, ops, seed):
+    """Average seconds per call of fn(tasks, index) over ops random positions"""
+    rng = random.Random(seed)
+    positions = [rng.randrange(len(tasks) - ops) for _ in range(ops)]
+    start = time.perf_counter()
+    for idx in positions:
+        fn(tasks, idx)
+    return (time.perf_counter() - start) / ops
+
+
+def run_size(count, repeat=3, seed=42):
+    """Run every benchmark for one task-set size, returning {name: seconds}"""
+    results = {}
+    tasks = generate_tasks(count, seed)
+
+    # Storage (in a scratch directory so the real tasks.json is untouched)
+    with tempfile.TemporaryDirectory() as tmp:
+        saved_paths = (task_manager.TASKS_FILE, task_manager.BACKUP_FILE)
+        task_manager.TASKS_FILE = os.path.join(tmp, "tasks.json")
+        task_manager.BACKUP_FILE = os.path.join(tmp, "tasks_backup.json")
+        try:
+            results["save_tasks"] = _best_of(lambda: save_tasks(tasks), repeat)
+            results["load_tasks"] = _best_of(load_tasks, repeat)
+        finally:
+            task_manager.TASKS_FILE, task_manager.BACKUP_FILE = saved_paths
+
+    # Mutation helpers (in memory; the save they trigger is measured above)
+    ops = min(1000, count // 2)
+    work = list(tasks)
+    # No id, like the app's add dialog: add_task assigns one
+    results["add_task"] = _per_op(
+        lambda ts, i: add_task(ts, Task(f"new {i}"), save=False), work, ops, seed)
+    results["edit_task"] = _per_op(
+        lambda ts, i: edit_task(ts, i, Task.from_dict(ts[i].to_dict()), save=False), work, ops, seed)
+    results["mark_task_done"] = _per_op(
+        lambda ts, i: mark_task_done(ts, i, "bench", save=False), work, ops, seed)
+    results["set_task_status"] = _per_op(
+        lambda ts, i: set_task_status(ts, i, "Pending", save=False), work, ops, seed)
+    results["delete_task"] = _per_op(lambda ts, i: delete_task(ts, i, save=False), work, ops, seed)
+
+    # Search / filter
+    for label, search, option in (("filter.all", "", "All"), ("filter.search", "review", "All"),
+                                  ("filter.overdue", "", "Overdue"), ("filter.high", "", "High Priority")):
+        results[label] = _best_of(lambda: [t for t in tasks if matches_filter(t, search, option)], repeat)
+
+    # Sorting and status bar counts
+    results["sort.default"] = _best_of(lambda: sorted(tasks, key=default_sort_key), repeat)
+    for column in ("priority", "title", "tags"):
+        key = column_sort_key(column)
+        results[f"sort.{column}"] = _best_of(lambda: sorted(tasks, key=key), repeat)
+    results["count_statuses"] = _best_of(lambda: count_statuses(tasks), repeat)
+
+    # Table rows: formatting every row vs. a warm row cache
+    results["rows.format"] = _best_of(lambda: [format_task_row(t) for t in tasks], repeat)
+    row_cache = RowCache(max_entries=count)
+    for task in tasks:
+        row_cache.row(task)
+    results["rows.cached"] = _best_of(lambda: [row_cache.row(t) for t in tasks], repeat)
+
+    # Reports
+    week_start = REFERENCE_DATE - timedelta(days=7)
+    results["report.group_scan"] = _best_of(
+        lambda: group_report_tasks(tasks, week_start, REFERENCE_DATE), repeat)
+    index = CompletionIndex(tasks)
+    results["report.group_indexed"] = _best_of(
+        lambda: group_report_tasks(tasks, week_start, REFERENCE_DATE, index), repeat)
+    groups = group_report_tasks(tasks)
+    results["report.format_all"] = _best_of(lambda: format_report(*groups, "", ""), repeat)
+
+    # Flow metrics over the status history (NumPy when installed)
+    history = generate_history(tasks, seed)
+    metrics_end = REFERENCE_DATE
+    results["analytics.metrics"] = _best_of(
+        lambda: compute_metrics(tasks, history, end_date=metrics_end), repeat)
+
+    # Subtasks: building the parent index vs. the incremental rollup update per status change
+    nested = [Task.from_dict(t.to_dict()) for t in tasks]
+    for i, task in enumerate(nested):
+        task.parent_id = nested[i - i % 10].id if i % 10 else None  # Parents with 9 subtasks each
+    results["subtasks.rebuild"] = _best_of(lambda: SubtaskIndex(nested), repeat)
+    subtasks = SubtaskIndex(nested)
+    add_change_listener(subtasks.on_change)
+    try:
+        results["subtasks.status_change"] = _per_op(
+            lambda ts, i: set_task_status(ts, i, "In Progress", save=False), nested, ops, seed)
+    finally:
+        remove_change_listener(subtasks.on_change)
+
+    # Dependencies: each subtask blocked by the one before it; ready list vs. index rebuild
+    for i, task in enumerate(nested):
+        task.blocked_by = [nested[i - 1].id] if i % 10 > 1 else []
+    results["deps.rebuild"] = _best_of(lambda: DependencyIndex(nested), repeat)
+    dependencies = DependencyIndex(nested)
+    results["deps.ready"] = _best_of(dependencies.ready, repeat)
+
+    # "Next up" scheduler: heapify all open tasks, top 50, and the per-change heap update
+    results["scheduler.rebuild"] = _best_of(lambda: TaskScheduler(tasks), repeat)
+    scheduler = TaskScheduler(tasks)
+    results["scheduler.top50"] = _best_of(lambda: scheduler.top(50), repeat)
+    add_change_listener(scheduler.on_change)
+    try:
+        results["scheduler.change"] = _per_op(
+            lambda ts, i: set_task_status(ts, i, "In Progress", save=False), list(tasks), ops, seed)
+    finally:
+        remove_change_listener(scheduler.on_change)
+
+    # Tags: counting every tag vs. a prefix suggestion and the per-edit trie update
+    results["tags.rebuild"] = _best_of(lambda: TagIndex(tasks), repeat)
+    tag_index = TagIndex(tasks)
+    results["tags.suggest"] = _best_of(lambda: tag_index.suggest("b"), repeat)
+    add_change_listener(tag_index.on_change)
+
+    def retag(ts, i):
+        edited = Task.from_dict(ts[i].to_dict())
+        edited.tags = [TAGS[i % len(TAGS)]]
+        edit_task(ts, i, edited, save=False)
+        tag_index.suggest("b")
+
+    try:
+        results["tags.edit_suggest"] = _per_op(retag, list(tasks), ops, seed)
+    finally:
+        remove_change_listener(tag_index.on_change)
+
+    # Near-duplicate titles: MinHash/LSH index build, one save-time check and the full sweep
+    results["dupes.build"] = _best_of(lambda: len(DuplicateIndex(tasks)), repeat)
+    duplicates = DuplicateIndex(tasks)
+    len(duplicates)
+    results["dupes.find"] = _per_op(
+        lambda ts, i: duplicates.find_similar(ts[i].title, exclude_id=ts[i].id), tasks, ops, seed)
+    results["dupes.sweep"] = _best_of(duplicates.duplicate_groups, repeat)
+
+    # Time tracking: one interval per task over the last 90 days, read back from the packed log
+    rng = random.Random(seed)
+    day_zero = int(datetime.combine(REFERENCE_DATE, datetime.min.time()).timestamp())
+    time_log = TimeLog()
+    time_log.rebuild(tasks)
+    for task in tasks:
+        start = day_zero - rng.randrange(90 * 86400)
+        time_log.start(task.id, start)
+        time_log.stop(task.id, start + rng.randrange(300, 4 * 3600))
+    with tempfile.TemporaryDirectory() as tmp:
+        time_log.path = os.path.join(tmp, "time_log.bin")
+        time_log.flush()
+        results["time.load"] = _best_of(lambda: TimeLog(time_log.path).load(), repeat)
+    results["time.start_stop"] = _per_op(
+        lambda ts, i: (time_log.start(ts[i].id), time_log.stop(ts[i].id)), tasks, ops, seed)
+    results["time.totals"] = _best_of(time_log.totals, repeat)
+    results["time.totals_week"] = _best_of(lambda: time_log.totals(week_start, REFERENCE_DATE), repeat)
+    return results
+
+
+# --------------------------
+# Baseline comparison
+# --------------------------
+
+def compare(results, baseline, tolerance, floor):
+    """Return regressions as (size, name, baseline_s, current_s) tuples"""
+    regressions = []
+    for size, timings in results.items():
+        for name, current in timings.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            if current > previous * (1 + tolerance) and current - previous > floor:
+                regressions.append((size, name, previous, current))
+    return regressions
+
+
+def _format_seconds(seconds):
+    if seconds >= 1:
+        return f"{seconds:8.2f} s "
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds * 1e6:8.2f} us"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TaskManager synthetic-load benchmarks")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Comma separated sizes from {', '.join(SIZES)}")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark, fastest is kept")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the synthetic task generator")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a stored baseline; exit 1 on regression")
+    parser.add_argument("--save-baseline", help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown vs. baseline as a fraction (default: 0.25)")
+    parser.add_argument("--floor-ms", type=float, default=0.5,
+                        help="Ignore slowdowns smaller than this many ms (default: 0.5)")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip().lower() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+
+    results = {}
+    for size in sizes:
+        print(f"== {size} tasks ==")
+        results[size] = run_size(SIZES[size], args.repeat, args.seed)
+        for name, seconds in results[size].items():
+            print(f"  {name:<22}{_format_seconds(seconds)}")
+
+    document = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "seed": args.seed, "repeat": args.repeat},
+        "results": results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(document, f, indent=2)
+            print(f"Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f).get("results", {})
+        regressions = compare(results, baseline, args.tolerance, args.floor_ms / 1000)
+        if regressions:
+            print(f"\n✗ {len(regressions)} regression(s) vs. {args.baseline}:")
+            for size, name, previous, current in regressions:
+                print(f"  {size:>5} {name:<22}{_format_seconds(previous)} -> {_format_seconds(current)} "
+                      f"(+{(current / previous - 1) * 100:.0f}%)")
+            return 1
+        print(f"\n✓ No regressions vs. {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+# cli.py - Command line entry point for headless task operations
+import argparse
+import sys
+
+
+def cmd_serve(args):
+    from server import run_server
+    run_server(args.host, args.port)
+    return 0
+
+
+def _print_similar(found, total):
+    for task, similarity, existing in found:
+        print(f"  possible duplicate: #{task.id} \"{task.title}\" ~ #{existing.id} "
+              f"\"{existing.title}\" ({similarity:.0%})")
+    if total > len(found):
+        print(f"  ... and {total - len(found)} more possible duplicates")
+
+
+def cmd_ingest(args):
+    from ingest import ingest_file
+    stats = ingest_file(args.file, args.chunk_size)
+    print(stats.summary())
+    for line_no, reason in stats.rejects:
+        print(f"  line {line_no}: {reason}")
+    if stats.rejected > len(stats.rejects):
+        print(f"  ... and {stats.rejected - len(stats.rejects)} more rejects")
+    _print_similar(stats.similar_titles, stats.similar)
+    return 1 if args.strict and stats.rejected else 0
+
+
+def cmd_import(args):
+    from importer import import_file, parse_column_mapping
+    try:
+        mapping = parse_column_mapping(args.map)
+    except ValueError as e:
+        print(e)
+        return 2
+    result = import_file(args.file, mapping, args.format, args.workers, args.chunk_size, args.dry_run)
+    print(result.summary())
+    for row_no, message in result.errors:
+        print(f"  row {row_no}: {message}")
+    if result.error_count > len(result.errors):
+        print(f"  ... and {result.error_count - len(result.errors)} more errors")
+    _print_similar(result.duplicates, result.duplicate_count)
+    return 0
+
+
+def cmd_import_bench(args):
+    from importer import benchmark_import
+    workers = [int(w) for w in args.workers.split(",")] if args.workers else None
+    benchmark_import(args.rows, workers, args.chunk_size)
+    return 0
+
+
+def cmd_report(args):
+    from task_manager import load_tasks
+    from report import parse_report_date, group_report_tasks, apply_history, report_extras
+    from history import TaskHistory
+    from timelog import TimeLog
+    from renderers import RENDERERS, renderer_for_path
+    try:
+        start_date = parse_report_date(args.start)
+        end_date = parse_report_date(args.end)
+    except ValueError:
+        print("Invalid date format. Use YYYY-MM-DD")
+        return 2
+    tasks = load_tasks()
+    history = TaskHistory().load()
+    groups = apply_history(group_report_tasks(tasks, start_date, end_date), tasks,
+                           history, start_date, end_date)
+    time_log = TimeLog().load()
+    time_log.rebuild(tasks)
+    metrics = None
+    if len(history):
+        from analytics import compute_metrics
+        metrics = compute_metrics(tasks, history, start_date, end_date)
+    extras = report_extras(tasks, groups[0], start_date, end_date, time_log.totals(start_date, end_date), metrics)
+    report_args = groups + (args.start or "", args.end or "", extras)
+    if args.output:
+        renderer = renderer_for_path(args.output)
+        if args.format:
+            renderer = next(r for r in RENDERERS if r.extension == "." + args.format)
+        renderer.export(args.output, report_args)
+    else:
+        renderer = next(r for r in RENDERERS if r.extension == "." + (args.format or "txt"))
+        renderer.write(sys.stdout, report_args)
+    return 0
+
+
+def cmd_board(args):
+    from task_manager import load_tasks
+    from report import parse_report_date
+    from history import TaskHistory
+    try:
+        when = parse_report_date(args.at)
+    except ValueError:
+        print("Invalid date format. Use YYYY-MM-DD")
+        return 2
+    board = TaskHistory().load().board_at(when)
+    titles = {task.id: task.title for task in load_tasks()}
+    for status in ("Pending", "In Progress", "Done"):
+        ids = sorted(task_id for task_id, s in board.items() if s == status)
+        print(f"{status}: {len(ids)}")
+        if not args.counts:
+            for task_id in ids:
+                print(f"  #{task_id} {titles.get(task_id, '(deleted)')}")
+    return 0
+
+
+def cmd_deps(args):
+    from task_manager import load_tasks, default_sort_key
+    from indexes import DependencyIndex
+    from report import iter_dependency_risk_lines
+    tasks = load_tasks()
+    dependencies = DependencyIndex(tasks)
+    if args.critical:
+        risks = dependencies.schedule_risks()
+        if not risks:
+            print("No deadlines at risk")
+        sys.stdout.writelines(iter_dependency_risk_lines(risks, tasks))
+        return 0
+    ready = sorted(dependencies.ready(), key=default_sort_key)
+    blocked = sum(1 for task in tasks if task.status != "Done" and dependencies.open_blockers(task.id))
+    print(f"Ready: {len(ready)}   Blocked: {blocked}")
+    for task in ready:
+        deadline = f" (deadline: {task.deadline})" if task.deadline else ""
+        print(f"  #{task.id} {task.title}{deadline}")
+    return 0
+
+
+def cmd_next(args):
+    from task_manager import load_tasks
+    from history import TaskHistory
+    from indexes import DependencyIndex
+    from scheduler import TaskScheduler
+    tasks = load_tasks()
+    dependencies = DependencyIndex(tasks)
+    scheduler = TaskScheduler(tasks, first_seen=TaskHistory().load().first_seen)
+    blocked = None if args.include_blocked else dependencies.open_blockers
+    for rank, task in enumerate(scheduler.top(args.count, blocked), 1):
+        deadline = f" (deadline: {task.deadline})" if task.deadline else ""
+        print(f"{rank:>3}. [{scheduler.score(task.id):6.1f}] #{task.id} {task.title}{deadline}")
+        if args.explain:
+            parts = scheduler.explain(task)
+            print("       " + ", ".join(f"{name} {points:.1f}" for name, points in parts.items()))
+    return 0
+
+
+def cmd_metrics(args):
+    from task_manager import load_tasks
+    from report import parse_report_date
+    from history import TaskHistory
+    from analytics import compute_metrics, export_metrics
+    try:
+        start_date = parse_report_date(args.start)
+        end_date = parse_report_date(args.end)
+    except ValueError:
+        print("Invalid date format. Use YYYY-MM-DD")
+        return 2
+    metrics = compute_metrics(load_tasks(), TaskHistory().load(), start_date, end_date)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            export_metrics(f, metrics, args.format)
+    else:
+        export_metrics(sys.stdout, metrics, args.format)
+    return 0
+
+
+def cmd_dupes(args):
+    from task_manager import load_tasks
+    from dedupe import DuplicateIndex
+    groups = DuplicateIndex(load_tasks()).duplicate_groups(args.threshold)
+    if not groups:
+        print("No near-duplicate open tasks")
+    for group in groups:
+        print(f"{len(group)} similar tasks:")
+        for task in group:
+            print(f"  #{task.id} {task.title}")
+    return 0
+
+
+def cmd_time(args):
+    from task_manager import load_tasks
+    from report import parse_report_date, iter_time_lines
+    from timelog import TimeLog, format_duration
+    try:
+        start_date = parse_report_date(args.start)
+        end_date = parse_report_date(args.end)
+    except ValueError:
+        print("Invalid date format. Use YYYY-MM-DD")
+        return 2
+    tasks = load_tasks()
+    time_log = TimeLog().load()
+    time_log.rebuild(tasks)
+    totals = time_log.totals(start_date, end_date)
+    if not args.by:
+        lines = list(iter_time_lines(totals, tasks))
+        sys.stdout.writelines(lines[1:] if lines else ["No time tracked\n"])
+        return 0
+    by_task, by_tag, by_day = totals
+    if args.by == "task":
+        titles = {task.id: task.title for task in tasks}
+        running = time_log.running()
+        rows = [(f"#{task_id} {titles.get(task_id, '(deleted)')}" + (" ▶" if task_id in running else ""), seconds)
+                for task_id, seconds in sorted(by_task.items(), key=lambda item: -item[1])]
+    elif args.by == "tag":
+        rows = sorted(by_tag.items(), key=lambda item: (-item[1], item[0]))
+    else:
+        rows = sorted(by_day.items())
+    for label, seconds in rows:
+        print(f"{format_duration(seconds):>9}  {label}")
+    print(f"{format_duration(sum(by_task.values())):>9}  total")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Task Manager Pro command line tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="Run the local HTTP/JSON API server")
+    serve.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    serve.set_defaults(func=cmd_serve)
+
+    ingest = subparsers.add_parser("ingest", help="Apply a JSONL command feed to the task store")
+    ingest.add_argument("file", help="JSONL file to read, or - for stdin")
+    ingest.add_argument("--chunk-size", type=int, default=1000,
+                        help="Commands applied per commit (default: 1000)")
+    ingest.add_argument("--strict", action="store_true", help="Exit with status 1 if any command is rejected")
+    ingest.set_defaults(func=cmd_ingest)
+
+    imp = subparsers.add_parser("import", help="Bulk import a CSV / JSON / JSONL task dump")
+    imp.add_argument("file", help="File to import")
+    imp.add_argument("--format", choices=("csv", "json", "jsonl"), help="Input format (default: from extension)")
+    imp.add_argument("--map", action="append", metavar="FIELD=COLUMN",
+                     help="Map a task field to a source column, e.g. --map deadline=\"Due Date\"")
+    imp.add_argument("--workers", type=int, help="Parser processes (default: CPU count)")
+    imp.add_argument("--chunk-size", type=int, default=5000, help="Rows per worker chunk (default: 5000)")
+    imp.add_argument("--dry-run", action="store_true", help="Parse and validate without saving")
+    imp.set_defaults(func=cmd_import)
+
+    bench = subparsers.add_parser("import-bench", help="Benchmark the importer across worker counts")
+    bench.add_argument("--rows", type=int, default=200000, help="Synthetic rows to parse (default: 200000)")
+    bench.add_argument("--workers", help="Comma separated worker counts (default: 1,2,4,.. up to CPU count)")
+    bench.add_argument("--chunk-size", type=int, default=5000, help="Rows per worker chunk (default: 5000)")
+    bench.set_defaults(func=cmd_import_bench)
+
+    report = subparsers.add_parser("report", help="Render the standup report without the GUI")
+    report.add_argument("--start", help="First completion date to include (YYYY-MM-DD)")
+    report.add_argument("--end", help="Last completion date to include (YYYY-MM-DD)")
+    report.add_argument("--format", choices=("txt", "md", "html", "json", "csv"),
+                        help="Output format (default: from --output extension, else txt)")
+    report.add_argument("-o", "--output", help="File to write (default: stdout)")
+    report.set_defaults(func=cmd_report)
+
+    board = subparsers.add_parser("board", help="Show every task's status as of a past date")
+    board.add_argument("--at", required=True, help="Date to replay the status history to (YYYY-MM-DD)")
+    board.add_argument("--counts", action="store_true", help="Only print the number of tasks per status")
+    board.set_defaults(func=cmd_board)
+
+    deps = subparsers.add_parser("deps", help="List tasks ready to start (all blockers done)")
+    deps.add_argument("--critical", action="store_true",
+                      help="Instead list deadlines whose chain of open blockers is longer than the days left")
+    deps.set_defaults(func=cmd_deps)
+
+    nxt = subparsers.add_parser("next", help="List the most urgent open tasks, best first")
+    nxt.add_argument("-n", "--count", type=int, default=10, help="Number of tasks to list (default: 10)")
+    nxt.add_argument("--explain", action="store_true", help="Show the score components of each task")
+    nxt.add_argument("--include-blocked", action="store_true",
+                     help="Also list tasks that are waiting on an open blocker")
+    nxt.set_defaults(func=cmd_next)
+
+    metrics = subparsers.add_parser("metrics", help="Throughput, cycle time and aging from the status history")
+    metrics.add_argument("--start", help="First day of the period (default: 12 weeks before --end)")
+    metrics.add_argument("--end", help="Last day of the period (default: now)")
+    metrics.add_argument("--format", choices=("txt", "json", "csv"), default="txt",
+                         help="Output format (default: txt)")
+    metrics.add_argument("-o", "--output", help="File to write (default: stdout)")
+    metrics.set_defaults(func=cmd_metrics)
+
+    dupes = subparsers.add_parser("dupes", help="List groups of open tasks with near-identical titles")
+    dupes.add_argument("--threshold", type=float, default=0.5,
+                       help="Minimum title similarity, 0-1 (default: 0.5)")
+    dupes.set_defaults(func=cmd_dupes)
+
+    tracked = subparsers.add_parser("time", help="Show time tracked per task, tag and day")
+    tracked.add_argument("--start", help="First day to include (YYYY-MM-DD)")
+    tracked.add_argument("--end", help="Last day to include (YYYY-MM-DD)")
+    tracked.add_argument("--by", choices=("task", "tag", "day"),
+                         help="List every total for one grouping instead of the summary")
+    tracked.set_defaults(func=cmd_time)
+
+    return parser
+
+
+def main(argv=None):
+    """Parse arguments and dispatch to the selected command"""
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,382 @@
+# dedupe.py - Near-duplicate task titles via MinHash signatures and LSH banding
+#
+# A title is normalised and cut into character 3-grams. Its MinHash signature
+# (the minimum of NUM_PERM hash functions over those 3-grams) agrees with
+# another title's in about as many places as their 3-gram sets overlap
+# (Jaccard similarity). Signatures are split into BANDS bands of ROWS values
+# and each band is filed in a hash table, so titles sharing any band become
+# candidates in O(BANDS) dictionary lookups. Candidates are then confirmed
+# with their exact Jaccard similarity. With 10 bands of 3, pairs at 0.6
+# similarity are found ~94% of the time and pairs below 0.3 rarely surface.
+# Numbers in a title ("ticket 123", "Q3") must match exactly: they are mixed
+# into every band key, so "Migrated ticket 1" and "... 2" never even collide.
+import random
+import re
+import zlib
+from collections import Counter
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+NUM_PERM = 30
+BANDS = 10
+ROWS = NUM_PERM // BANDS
+DUPLICATE_THRESHOLD = 0.5  # Jaccard similarity of 3-gram sets reported as a likely duplicate
+MAX_CANDIDATES = 200       # Candidates verified per lookup, in order of bands shared
+MASK64 = (1 << 64) - 1
+
+_rng = random.Random(0x5EED)
+_A = [_rng.getrandbits(64) | 1 for _ in range(NUM_PERM)]  # Multiply-shift hash parameters
+_B = [_rng.getrandbits(64) for _ in range(NUM_PERM)]
+_BAND_MIX = [_rng.getrandbits(64) | 1 for _ in range(ROWS)]
+_NON_WORD = re.compile(r"[\W_]+")
+_NUMBER = re.compile(r"\d+")
+
+
+def normalize_title(title):
+    """Lowercased words separated by single spaces (punctuation dropped)"""
+    return " ".join(_NON_WORD.sub(" ", title.lower()).split())
+
+
+def shingles(normalized):
+    """Character 3-grams of a normalised title, padded so short words still count"""
+    padded = f" {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def _number_key(normalized):
+    """Hash of the numbers in a title (0 if it has none), mixed into every band key"""
+    numbers = _NUMBER.findall(normalized)
+    return (zlib.crc32(" ".join(numbers).encode()) * _BAND_MIX[0]) & MASK64 if numbers else 0
+
+
+def _keys(normalized):
+    """3-grams packed into integers (three 21-bit code points)"""
+    padded = f" {normalized} "
+    codes = [ord(ch) for ch in padded]
+    return [(codes[i] << 42) | (codes[i + 1] << 21) | codes[i + 2] for i in range(len(codes) - 2)]
+
+
+def signature(normalized):
+    """MinHash signature of a normalised title"""
+    keys = _keys(normalized)
+    return [min(((a * k + b) & MASK64) >> 32 for k in keys) for a, b in zip(_A, _B)]
+
+
+def band_keys(sig, number_key=0):
+    """One hash per band of a signature"""
+    result = []
+    for band in range(BANDS):
+        h = number_key
+        for mix, value in zip(_BAND_MIX, sig[band * ROWS:(band + 1) * ROWS]):
+            h = (h + mix * value) & MASK64
+        result.append(h)
+    return result
+
+
+def title_keys(normalized):
+    """LSH band keys of a normalised title"""
+    return band_keys(signature(normalized), _number_key(normalized))
+
+
+def _title_keys_bulk(normalized_titles):
+    """title_keys(t) for many titles at once as a (titles, BANDS) array, with NumPy"""
+    padded = [f" {t} " for t in normalized_titles]
+    lengths = np.fromiter((len(p) for p in padded), dtype=np.int64, count=len(padded))
+    codes = np.frombuffer("".join(padded).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    keys = (codes[:-2] << np.uint64(42)) | (codes[1:-1] << np.uint64(21)) | codes[2:]
+    # Drop the 3-grams that straddle two titles (the last two start positions of each)
+    ends = np.cumsum(lengths)
+    valid = np.ones(len(keys), dtype=bool)
+    straddling = np.concatenate((ends - 2, ends - 1))
+    valid[straddling[straddling < len(keys)]] = False
+    keys = keys[valid]
+    offsets = np.concatenate(([0], np.cumsum(lengths - 2)[:-1]))
+    shift = np.uint64(32)
+    sig = np.empty((len(padded), NUM_PERM), dtype=np.uint64)
+    for i, (a, b) in enumerate(zip(_A, _B)):
+        sig[:, i] = np.minimum.reduceat((np.uint64(a) * keys + np.uint64(b)) >> shift, offsets)
+    numbers = np.fromiter((_number_key(t) for t in normalized_titles), dtype=np.uint64,
+                          count=len(normalized_titles))
+    bands = np.repeat(numbers[:, None], BANDS, axis=1)
+    for band in range(BANDS):
+        for row, mix in enumerate(_BAND_MIX):
+            bands[:, band] += np.uint64(mix) * sig[:, band * ROWS + row]
+    return bands
+
+
+def _index_tasks(tasks):
+    """(titles, tasks, buckets) indexing the open tasks of a list; touches no shared state"""
+    titles = {}   # task id -> normalised title
+    by_id = {}    # task id -> task
+    buckets = [{} for _ in range(BANDS)]  # band hash -> task id, or list of ids
+    entries = [(task, normalize_title(task.title)) for task in tasks
+               if task.id is not None and task.status != "Done"]
+    entries = [(task, title) for task, title in entries if title]
+    if not (HAS_NUMPY and entries):
+        for task, title in entries:
+            _file(titles, by_id, buckets, task, title, title_keys(title))
+        return titles, by_id, buckets
+    bands = _title_keys_bulk([title for _, title in entries])
+    ids = np.fromiter((task.id for task, _ in entries), dtype=np.int64, count=len(entries))
+    for task, title in entries:
+        titles[task.id] = title
+        by_id[task.id] = task
+    for band, bucket in enumerate(buckets):
+        # Keys seen once go straight into the dict; shared keys get id lists
+        keys = bands[:, band]
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        single = counts[inverse] == 1
+        bucket.update(zip(keys[single].tolist(), ids[single].tolist()))
+        for key, task_id in zip(keys[~single].tolist(), ids[~single].tolist()):
+            bucket.setdefault(key, []).append(task_id)
+    return titles, by_id, buckets
+
+
+def _file(titles, by_id, buckets, task, title, keys):
+    titles[task.id] = title
+    by_id[task.id] = task
+    for bucket, key in zip(buckets, keys):
+        current = bucket.get(key)
+        if current is None:
+            bucket[key] = task.id
+        elif isinstance(current, list):
+            current.append(task.id)
+        else:
+            bucket[key] = [current, task.id]
+
+
+class DuplicateIndex:
+    """LSH index over the titles of open tasks, kept current through change listeners.
+
+    rebuild() only remembers the task list; the index is built on the first
+    query (with NumPy when installed), so loading the app pays nothing for
+    it. After that each change costs one signature. The app builds it on a
+    worker instead (begin_build / build_state / finish_build) and skips the
+    check until it is ready.
+    """
+
+    def __init__(self, tasks=()):
+        self._generation = 0
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        """Re-index a whole task list (after load or refresh), lazily"""
+        self._source = tasks
+        self._built = False
+        self._generation += 1  # Discards the result of a background build already running
+        self._pending = None   # (action, task) seen while a background build runs
+        self._titles = {}   # task id -> normalised title
+        self._tasks = {}    # task id -> task
+        self._buckets = [{} for _ in range(BANDS)]  # band hash -> task id, or list of ids
+
+    @property
+    def ready(self):
+        """Whether queries are answered without building the index first"""
+        return self._built
+
+    def _build(self):
+        self._built = True
+        self._pending = None
+        self._titles, self._tasks, self._buckets = _index_tasks(self._source)
+
+    def _ensure_built(self):
+        if not self._built:
+            self._build()
+
+    def begin_build(self):
+        """Snapshot the task list for build_state(), to be run on a worker.
+
+        Changes notified until finish_build() are queued and replayed on the
+        built index.
+        """
+        self._generation += 1  # Only the latest build is installed
+        self._pending = []
+        return self._generation, list(self._source)
+
+    @staticmethod
+    def build_state(snapshot):
+        """Worker: index a begin_build() snapshot"""
+        generation, tasks = snapshot
+        return generation, _index_tasks(tasks)
+
+    def finish_build(self, built):
+        """Install a build_state() result, unless the index was rebuilt or built since"""
+        generation, state = built
+        if generation != self._generation or self._built:
+            return
+        self._titles, self._tasks, self._buckets = state
+        self._built = True
+        pending, self._pending = self._pending or [], None
+        for action, task in pending:
+            self.on_change(action, task)
+
+    def __len__(self):
+        self._ensure_built()
+        return len(self._tasks)
+
+    def _file(self, task, title, keys):
+        _file(self._titles, self._tasks, self._buckets, task, title, keys)
+
+    def _unfile(self, task_id):
+        title = self._titles.pop(task_id, None)
+        if title is None:
+            return
+        del self._tasks[task_id]
+        for bucket, key in zip(self._buckets, title_keys(title)):
+            current = bucket.get(key)
+            if isinstance(current, list):
+                current.remove(task_id)
+                if len(current) == 1:
+                    bucket[key] = current[0]
+            elif current == task_id:
+                del bucket[key]
+
+    def add(self, task):
+        """Index (or re-index) one task's title if it is open"""
+        if not self._built or task.id is None:
+            return
+        self._unfile(task.id)
+        title = normalize_title(task.title)
+        if title and task.status != "Done":
+            self._file(task, title, title_keys(title))
+
+    def on_change(self, action, task, previous=None):
+        """Change listener for task_manager.add_change_listener"""
+        if task.id is None:
+            return
+        if not self._built:
+            if self._pending is not None:
+                self._pending.append((action, task))
+            return  # The first query indexes the list as it is then
+        if action == "delete":
+            self._unfile(task.id)
+        elif (action == "edit" or task.id not in self._titles or task.status == "Done"
+              or self._tasks[task.id] is not task):
+            self.add(task)
+
+    def _candidates(self, keys):
+        """Ids sharing a band with keys, those sharing the most bands first (at most MAX_CANDIDATES)"""
+        shared = Counter()
+        for bucket, key in zip(self._buckets, keys):
+            current = bucket.get(key)
+            if current is None:
+                continue
+            if isinstance(current, list):
+                shared.update(current)
+            else:
+                shared[current] += 1
+        if len(shared) <= MAX_CANDIDATES:
+            return list(shared)
+        return [task_id for task_id, _ in shared.most_common(MAX_CANDIDATES)]
+
+    def _matches(self, normalized, keys, threshold, exclude_id=None):
+        """[(similarity, task)] among the candidates for keys, confirmed exactly"""
+        grams = shingles(normalized)
+        numbers = _NUMBER.findall(normalized)
+        matches = []
+        for task_id in self._candidates(keys):
+            if task_id == exclude_id:
+                continue
+            other = self._titles[task_id]
+            if _NUMBER.findall(other) != numbers:
+                continue
+            similarity = jaccard(grams, shingles(other))
+            if similarity >= threshold:
+                matches.append((similarity, self._tasks[task_id]))
+        matches.sort(key=lambda match: (-match[0], match[1].id))
+        return matches
+
+    def find_similar(self, title, threshold=DUPLICATE_THRESHOLD, exclude_id=None, limit=5):
+        """[(similarity, task)] for open tasks whose titles look like title, most similar first"""
+        self._ensure_built()
+        normalized = normalize_title(title)
+        if not normalized:
+            return []
+        return self._matches(normalized, title_keys(normalized), threshold, exclude_id)[:limit]
+
+    def check_batch(self, tasks, threshold=DUPLICATE_THRESHOLD):
+        """[(task, similarity, existing task)] for new tasks that look like an indexed or earlier one.
+
+        Each open task in the batch is checked and then indexed itself, so
+        repeats within the batch are caught too. Titles are hashed together
+        (with NumPy when installed).
+        """
+        self._ensure_built()
+        entries = [(task, normalize_title(task.title)) for task in tasks
+                   if task.id is not None and task.status != "Done"]
+        entries = [(task, title) for task, title in entries if title]
+        if HAS_NUMPY and entries:
+            all_keys = _title_keys_bulk([title for _, title in entries]).tolist()
+        else:
+            all_keys = [title_keys(title) for _, title in entries]
+        found = []
+        for (task, title), keys in zip(entries, all_keys):
+            matches = self._matches(title, keys, threshold, exclude_id=task.id)
+            if matches:
+                found.append((task, matches[0][0], matches[0][1]))
+            self._unfile(task.id)
+            self._file(task, title, keys)
+        return found
+
+    def duplicate_groups(self, threshold=DUPLICATE_THRESHOLD):
+        """Groups of open tasks with near-identical titles, largest first.
+
+        Only tasks sharing an LSH bucket are compared, and within a bucket
+        each task is compared with one member of each group found there so
+        far, so the sweep stays close to linear when a bucket holds many
+        copies of the same title.
+        """
+        self._ensure_built()
+        parent = {}
+
+        def find(x):
+            root = x
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while x != root:
+                parent[x], x = root, parent.get(x, x)
+            return root
+
+        grams = {}
+
+        def numbers_of(task_id):
+            return _NUMBER.findall(self._titles[task_id])
+
+        def grams_of(task_id):
+            result = grams.get(task_id)
+            if result is None:
+                result = grams[task_id] = shingles(self._titles[task_id])
+            return result
+
+        for bucket in self._buckets:
+            for ids in bucket.values():
+                if not isinstance(ids, list):
+                    continue
+                leaders = []  # One task per group met in this bucket
+                for task_id in ids:
+                    root = find(task_id)
+                    for leader in leaders:
+                        leader_root = find(leader)
+                        if leader_root == root or (
+                                numbers_of(task_id) == numbers_of(leader)
+                                and jaccard(grams_of(task_id), grams_of(leader)) >= threshold):
+                            if leader_root != root:
+                                parent.setdefault(leader_root, leader_root)
+                                parent[root] = leader_root
+                            break
+                    else:
+                        leaders.append(task_id)
+        groups = {}
+        for task_id in parent:
+            groups.setdefault(find(task_id), []).append(self._tasks[task_id])
+        result = [sorted(group, key=lambda task: task.id) for group in groups.values() if len(group) > 1]
+        result.sort(key=lambda group: (-len(group), group[0].id))
+        return result
@@ -1,46 +1,109 @@
 # dialogs.py - Dialog popups for Task Manager
 import tkinter as tk
-from tkinter import messagebox, filedialog
-from datetime import datetime
-
-try:
-    from tkcalendar import DateEntry
-    HAS_CALENDAR = True
-except ImportError:
-    HAS_CALENDAR = False
+from tkinter import ttk, messagebox, filedialog
+from datetime import date, datetime
+from itertools import islice
 
+import perf
 from theme import get_dialog_colors
 from task_manager import Task
+from recurrence import parse_rule, describe
+from rows import STATUS_ICONS
+from report import group_report_tasks, split_open_tasks, apply_history, iter_report_args_lines, report_extras
+from renderers import renderer_for_path, export_filetypes
+
+# tkcalendar is slow to import, so it is loaded when the first date picker is built
+DateEntry = None
+HAS_CALENDAR = None  # Unknown until load_calendar() runs
+
+
+def load_calendar():
+    """Import tkcalendar on first use; returns whether DateEntry is available"""
+    global DateEntry, HAS_CALENDAR
+    if HAS_CALENDAR is None:
+        with perf.span("import.tkcalendar"):
+            try:
+                from tkcalendar import DateEntry
+                HAS_CALENDAR = True
+            except ImportError:
+                HAS_CALENDAR = False
+    return HAS_CALENDAR
 
 
-class TaskPopup:
+class ReusableDialog:
+    """Modal Toplevel built once, kept hidden and re-bound to new data on each open"""
+    
+    def _build_window(self, master, title, geometry, resizable=False):
+        self.top = tk.Toplevel(master)
+        self.top.withdraw()  # Hidden until open() binds data and positions it
+        self.top.title(title)
+        self.top.configure(bg=self.colors['bg'])
+        self.top.geometry(geometry)
+        self.top.resizable(resizable, resizable)
+        self.top.transient(master)
+        self.top.protocol("WM_DELETE_WINDOW", self.cancel)
+        self.top.bind('<Escape>', lambda e: self.cancel())
+        self._placed = False
+        self._done = tk.BooleanVar(self.top, value=False)
+    
+    def _present(self):
+        """Show the dialog modally, centring it the first time"""
+        if not self._placed:
+            self.top.update_idletasks()
+            width = self.top.winfo_width()
+            height = self.top.winfo_height()
+            x = (self.top.winfo_screenwidth() // 2) - (width // 2)
+            y = (self.top.winfo_screenheight() // 2) - (height // 2)
+            self.top.geometry(f'{width}x{height}+{x}+{y}')
+            self._placed = True
+        self._done.set(False)
+        self.top.deiconify()
+        self.top.lift()
+        self.top.grab_set()
+    
+    def _wait(self):
+        """Run the event loop until the dialog is closed"""
+        if not self._done.get():
+            self.top.wait_variable(self._done)
+    
+    def _close(self):
+        self.top.grab_release()
+        self.top.withdraw()
+        self._done.set(True)
+    
+    def cancel(self):
+        self._close()
+
+
+class TaskPopup(ReusableDialog):
     """Dialog for adding/editing tasks"""
     
-    def __init__(self, master, title, task=None, dark_mode=False):
+    def __init__(self, master, dark_mode=False, tag_index=None, duplicate_index=None):
         self.task = None
-        self.original_task = task  # Store original task to preserve status, completion_date, remarks
+        self.original_task = None  # Task being edited; its status, completion_date and remarks are kept
         self.dark_mode = dark_mode
-        self.top = tk.Toplevel(master)
-        self.top.withdraw()  # Hide window during setup to prevent flickering
-        self.top.title(title)
+        self.tag_index = tag_index  # TagIndex used to autocomplete the tags field
+        self.duplicate_index = duplicate_index  # DuplicateIndex checked before saving a new title
         
         # Get colors based on mode
         self.colors = get_dialog_colors(dark_mode)
         
+        with perf.span("dialog.build.TaskPopup"):
+            self._build_widgets(master)
+    
+    def _build_widgets(self, master):
         # Configure popup window
-        self.top.configure(bg=self.colors['bg'])
-        self.top.geometry("520x580")
-        self.top.resizable(False, False)
+        self._build_window(master, "Add Task", "520x860")
         
         # Modern header
         header = tk.Frame(self.top, bg=self.colors['accent'], height=60)
         header.pack(fill=tk.X)
         header.pack_propagate(False)
         
-        header_icon = "📝" if "Add" in title else "✏️"
-        tk.Label(header, text=f"{header_icon}  {title}",
-                bg=self.colors['accent'], fg='white',
-                font=('Segoe UI', 16, 'bold')).pack(expand=True)
+        self.header_label = tk.Label(header, text="📝  Add Task",
+                                    bg=self.colors['accent'], fg='white',
+                                    font=('Segoe UI', 16, 'bold'))
+        self.header_label.pack(expand=True)
         
         # Main content area
         main_container = tk.Frame(self.top, bg=self.colors['bg'], padx=30, pady=25)
@@ -48,8 +111,6 @@ class TaskPopup:
         
         # Task Title Section
         self._create_input_section(main_container, "📌 Task Title *", "title")
-        if task:
-            self.entry_title.insert(0, task.title)
         
         # Deadline Section with Date Picker
         deadline_frame = tk.Frame(main_container, bg=self.colors['bg'])
@@ -62,9 +123,9 @@ class TaskPopup:
         date_container = tk.Frame(deadline_frame, bg=self.colors['bg'])
         date_container.pack(fill=tk.X)
         
-        if HAS_CALENDAR:
+        if load_calendar():
             # Checkbox to enable/disable deadline
-            self.has_deadline = tk.BooleanVar(value=bool(task and task.deadline))
+            self.has_deadline = tk.BooleanVar(value=False)
             
             deadline_check = tk.Checkbutton(date_container, text="Set deadline",
                                            variable=self.has_deadline,
@@ -84,15 +145,8 @@ class TaskPopup:
                                         borderwidth=0,
                                         font=('Segoe UI', 11),
                                         date_pattern='yyyy-mm-dd',
-                                        state='normal' if self.has_deadline.get() else 'disabled')
+                                        state='disabled')
             self.date_picker.pack(side=tk.LEFT)
-            
-            if task and task.deadline:
-                try:
-                    d = datetime.strptime(task.deadline, "%Y-%m-%d").date()
-                    self.date_picker.set_date(d)
-                except:
-                    pass
         else:
             # Fallback to text entry
             entry_border = tk.Frame(date_container, bg=self.colors['border'], padx=1, pady=1)
@@ -102,8 +156,6 @@ class TaskPopup:
                                           insertbackground=self.colors['accent'],
                                           relief=tk.FLAT, bd=0)
             self.entry_deadline.pack(fill=tk.X, ipady=10, padx=10)
-            if task and task.deadline:
-                self.entry_deadline.insert(0, task.deadline)
         
         # Priority Section
         priority_frame = tk.Frame(main_container, bg=self.colors['bg'])
@@ -113,7 +165,7 @@ class TaskPopup:
                 bg=self.colors['bg'], fg=self.colors['fg'],
                 font=('Segoe UI', 11, 'bold')).pack(anchor='w', pady=(0, 10))
         
-        self.priority_var = tk.StringVar(value=task.priority if task else "Medium")
+        self.priority_var = tk.StringVar(value="Medium")
         priority_btn_frame = tk.Frame(priority_frame, bg=self.colors['bg'])
         priority_btn_frame.pack(fill=tk.X)
         
@@ -125,12 +177,10 @@ class TaskPopup:
         ]
         
         for p_val, p_icon, p_color in priority_configs:
-            is_selected = (self.priority_var.get() == p_val)
             btn = tk.Button(priority_btn_frame,
                           text=f"{p_icon}  {p_val}",
                           command=lambda v=p_val: self._set_priority(v),
-                          bg=p_color if is_selected else self.colors['bg_secondary'],
-                          fg='white' if is_selected else self.colors['fg'],
+                          bg=self.colors['bg_secondary'], fg=self.colors['fg'],
                           font=('Segoe UI', 10),
                           bd=0, relief=tk.FLAT, padx=16, pady=6, cursor="hand2")
             btn.pack(side=tk.LEFT, padx=(0, 8))
@@ -138,8 +188,17 @@ class TaskPopup:
         
         # Tags Section
         self._create_input_section(main_container, "🏷️ Tags (comma separated)", "tags")
-        if task and task.tags:
-            self.entry_tags.insert(0, ", ".join(task.tags))
+        self._build_tag_autocomplete()
+        
+        # Effort Section
+        self._create_input_section(main_container, "⏱️ Effort (hours, optional)", "effort")
+        
+        # Reminder Section
+        self._create_input_section(main_container, "⏰ Reminder (YYYY-MM-DD HH:MM, optional)", "remind_at")
+        
+        # Repeat Section
+        self._create_input_section(main_container, "🔁 Repeat (e.g. weekly, every 2 weeks, monthly for 6)",
+                                   "repeat")
         
         # Action Buttons - well separated
         btn_container = tk.Frame(main_container, bg=self.colors['bg'])
@@ -155,7 +214,7 @@ class TaskPopup:
         save_btn.pack(side=tk.LEFT)
         
         # Cancel button on the right
-        cancel_btn = tk.Button(btn_container, text="✕  Cancel", command=self.top.destroy,
+        cancel_btn = tk.Button(btn_container, text="✕  Cancel", command=self.cancel,
                               font=('Segoe UI', 11, 'bold'),
                               bg=self.colors['danger'], fg='white',
                               activebackground='#dc2626', activeforeground='white',
@@ -163,22 +222,134 @@ class TaskPopup:
                               padx=30, pady=12)
         cancel_btn.pack(side=tk.RIGHT)
         
-        # Center window
-        self.top.transient(master)
-        self.top.grab_set()
-        self.top.update_idletasks()
-        width = self.top.winfo_width()
-        height = self.top.winfo_height()
-        x = (self.top.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.top.winfo_screenheight() // 2) - (height // 2)
-        self.top.geometry(f'{width}x{height}+{x}+{y}')
-        
-        # Show window after positioning (prevents flickering)
-        self.top.deiconify()
-        
-        self.top.after(100, lambda: self.entry_title.focus() if self.top.winfo_exists() else None)
         self.top.bind('<Return>', lambda e: self.save())
-        self.top.bind('<Escape>', lambda e: self.top.destroy())
+    
+    def open(self, title, task=None):
+        """Reset the form for a new task (or the one being edited) and wait; returns the saved Task or None"""
+        with perf.span("dialog.open.TaskPopup"):
+            self.task = None
+            self.original_task = task
+            self.top.title(title)
+            header_icon = "📝" if "Add" in title else "✏️"
+            self.header_label.config(text=f"{header_icon}  {title}")
+            
+            self.entry_title.delete(0, tk.END)
+            if task:
+                self.entry_title.insert(0, task.title)
+            
+            if HAS_CALENDAR:
+                self.has_deadline.set(bool(task and task.deadline))
+                self.date_picker.config(state='normal')  # set_date is ignored while disabled
+                picked = date.today()
+                if task and task.deadline:
+                    try:
+                        picked = datetime.strptime(task.deadline, "%Y-%m-%d").date()
+                    except:
+                        pass
+                self.date_picker.set_date(picked)
+                self._toggle_deadline()
+            else:
+                self.entry_deadline.delete(0, tk.END)
+                if task and task.deadline:
+                    self.entry_deadline.insert(0, task.deadline)
+            
+            self._set_priority(task.priority if task else "Medium")
+            
+            self._hide_tag_suggestions()
+            self.entry_tags.delete(0, tk.END)
+            if task and task.tags:
+                self.entry_tags.insert(0, ", ".join(task.tags))
+            
+            self.entry_effort.delete(0, tk.END)
+            if task and task.effort:
+                self.entry_effort.insert(0, f"{task.effort:g}")
+            
+            self.entry_remind_at.delete(0, tk.END)
+            if task and task.remind_at:
+                self.entry_remind_at.insert(0, task.remind_at)
+            
+            self.entry_repeat.delete(0, tk.END)
+            if task and task.recurrence:
+                self.entry_repeat.insert(0, describe(task.recurrence, task.occurrence))
+            
+            self._present()
+            self.top.after(100, lambda: self.entry_title.focus() if self.top.winfo_viewable() else None)
+        self._wait()
+        return self.task
+    
+    # --------------------------
+    # Tag autocomplete
+    # --------------------------
+    
+    def _build_tag_autocomplete(self):
+        """Suggestion list shown under the tags field while a tag is being typed"""
+        self.tag_suggestions = tk.Listbox(self.top, height=6, activestyle='none', exportselection=False,
+                                          bg=self.colors['entry_bg'], fg=self.colors['entry_fg'],
+                                          selectbackground=self.colors['accent'], selectforeground='white',
+                                          font=('Segoe UI', 11), relief=tk.FLAT, bd=1,
+                                          highlightthickness=1, highlightbackground=self.colors['border'])
+        self.tag_suggestions.bind('<ButtonRelease-1>', lambda e: self._accept_tag_suggestion())
+        entry = self.entry_tags
+        entry.bind('<KeyRelease>', self._update_tag_suggestions)
+        entry.bind('<Down>', lambda e: self._move_tag_suggestion(1))
+        entry.bind('<Up>', lambda e: self._move_tag_suggestion(-1))
+        entry.bind('<Tab>', lambda e: self._accept_tag_suggestion())
+        entry.bind('<Return>', lambda e: self._accept_tag_suggestion())
+        entry.bind('<Escape>', lambda e: self._hide_tag_suggestions())
+        entry.bind('<FocusOut>', lambda e: self.top.after(150, self._hide_tag_suggestions))
+    
+    def _update_tag_suggestions(self, event=None):
+        if event is not None and event.keysym in ('Up', 'Down', 'Tab', 'Return', 'Escape'):
+            return
+        if self.tag_index is None:
+            return
+        typed = self.entry_tags.get().split(",")
+        prefix = typed[-1].strip()
+        entered = {t.strip() for t in typed[:-1]}
+        suggestions = self.tag_index.suggest(prefix, exclude=entered) if prefix else []
+        if not suggestions or suggestions == [prefix]:
+            self._hide_tag_suggestions()
+            return
+        self.tag_suggestions.delete(0, tk.END)
+        self.tag_suggestions.insert(tk.END, *suggestions)
+        self.tag_suggestions.config(height=len(suggestions))
+        self.tag_suggestions.selection_set(0)
+        entry = self.entry_tags.master  # The bordered frame around the entry
+        self.tag_suggestions.place(x=entry.winfo_rootx() - self.top.winfo_rootx(),
+                                   y=entry.winfo_rooty() - self.top.winfo_rooty() + entry.winfo_height(),
+                                   width=entry.winfo_width())
+        self.tag_suggestions.lift()
+    
+    def _move_tag_suggestion(self, step):
+        if not self.tag_suggestions.winfo_ismapped():
+            return None
+        current = self.tag_suggestions.curselection()
+        index = min(max((current[0] if current else -1) + step, 0), self.tag_suggestions.size() - 1)
+        self.tag_suggestions.selection_clear(0, tk.END)
+        self.tag_suggestions.selection_set(index)
+        self.tag_suggestions.see(index)
+        return "break"
+    
+    def _accept_tag_suggestion(self):
+        """Replace the tag being typed with the highlighted suggestion"""
+        if not self.tag_suggestions.winfo_ismapped():
+            return None  # Tab and Return keep their usual meaning
+        current = self.tag_suggestions.curselection()
+        if current:
+            typed = self.entry_tags.get().split(",")[:-1]
+            tags = [t.strip() for t in typed if t.strip()] + [self.tag_suggestions.get(current[0])]
+            self.entry_tags.delete(0, tk.END)
+            self.entry_tags.insert(0, ", ".join(tags) + ", ")
+            self.entry_tags.icursor(tk.END)
+        self._hide_tag_suggestions()
+        self.entry_tags.focus_set()
+        return "break"
+    
+    def _hide_tag_suggestions(self):
+        if self.tag_suggestions.winfo_ismapped():
+            self.tag_suggestions.place_forget()
+            return "break"  # Escape closes the list, not the dialog
+        return None
     
     def _toggle_deadline(self):
         """Enable/disable the date picker based on checkbox"""
@@ -246,35 +417,104 @@ class TaskPopup:
         priority = self.priority_var.get()
         tags = [t.strip() for t in self.entry_tags.get().split(",") if t.strip()]
         
-        # Preserve status, completion_date, and remarks from original task when editing
+        effort = None
+        effort_str = self.entry_effort.get().strip()
+        if effort_str:
+            try:
+                effort = float(effort_str)
+            except ValueError:
+                effort = 0
+            if not effort > 0:
+                messagebox.showerror("Error", "Effort must be a positive number of hours")
+                return
+        
+        remind_at = self.entry_remind_at.get().strip() or None
+        if remind_at:
+            try:
+                remind_at = datetime.strptime(remind_at, "%Y-%m-%d %H:%M").strftime("%Y-%m-%d %H:%M")
+            except ValueError:
+                messagebox.showerror("Error", "Invalid reminder format. Use YYYY-MM-DD HH:MM")
+                return
+        
+        # An unchanged rule keeps the series position; a new one starts from the deadline
+        original = self.original_task
+        recurrence = original.recurrence if original else None
+        occurrence = original.occurrence if original else None
+        series_id = original.series_id if original else None
+        repeat = self.entry_repeat.get().strip()
+        if not (recurrence and repeat == describe(recurrence, occurrence) and deadline == original.deadline):
+            start = datetime.strptime(deadline, "%Y-%m-%d").date() if deadline else date.today()
+            try:
+                recurrence = parse_rule(repeat, start)
+            except ValueError:
+                messagebox.showerror("Error", "Invalid repeat. Use e.g. daily, weekly, monthly, "
+                                     "every 3 days, weekly until YYYY-MM-DD or monthly for 6")
+                return
+            occurrence = 1 if recurrence else None
+            if recurrence and original and original.recurrence:
+                series_id = original.series_id or original.id
+            elif not recurrence:
+                series_id = None
+            if recurrence and not deadline:
+                deadline = start.isoformat()  # A series is anchored on its deadlines
+        
+        # Preserve status, completion info, parent, blockers and feed id from original task when editing
         status = self.original_task.status if self.original_task else "Pending"
         completion_date = self.original_task.completion_date if self.original_task else None
         remarks = self.original_task.remarks if self.original_task else None
+        parent_id = self.original_task.parent_id if self.original_task else None
+        blocked_by = list(self.original_task.blocked_by) if self.original_task else []
+        external_id = self.original_task.external_id if self.original_task else None
+        
+        if not self._confirm_not_duplicate(title):
+            return
         
         self.task = Task(title=title, deadline=deadline, priority=priority, status=status,
-                        tags=tags, completion_date=completion_date, remarks=remarks)
-        self.top.destroy()
+                        tags=tags, completion_date=completion_date, remarks=remarks,
+                        parent_id=parent_id, blocked_by=blocked_by, effort=effort,
+                        remind_at=remind_at, recurrence=recurrence, occurrence=occurrence,
+                        series_id=series_id, external_id=external_id)
+        self._close()
 
 
-class MarkDonePopup:
+    def _confirm_not_duplicate(self, title):
+        """Warn when a new (or renamed) task looks like an open one; returns whether to save"""
+        original = self.original_task
+        if self.duplicate_index is None or (original and original.title == title):
+            return True
+        if not self.duplicate_index.ready:
+            return True  # Still being built on a worker; never block the Tk thread on it
+        matches = self.duplicate_index.find_similar(title, exclude_id=original.id if original else None,
+                                                    limit=3)
+        if not matches:
+            return True
+        lines = []
+        for _, task in matches:
+            line = f"• {task.title}"
+            if task.deadline:
+                line += f" (deadline: {task.deadline})"
+            lines.append(line)
+        return messagebox.askyesno("Possible Duplicate",
+                                   "This looks like an open task:\n\n" + "\n".join(lines) +
+                                   "\n\nSave it anyway?", parent=self.top)
+
+
+class MarkDonePopup(ReusableDialog):
     """Dialog for marking task as done with optional remarks"""
     
-    def __init__(self, master, task_title, dark_mode=False):
+    def __init__(self, master, dark_mode=False):
         self.confirmed = False
         self.remarks = None
-        self.task_title = task_title
-        
-        self.top = tk.Toplevel(master)
-        self.top.withdraw()
-        self.top.title("Mark Task Done")
         
         # Get colors based on mode
         self.colors = get_dialog_colors(dark_mode)
         
+        with perf.span("dialog.build.MarkDonePopup"):
+            self._build_widgets(master)
+    
+    def _build_widgets(self, master):
         # Configure popup window
-        self.top.configure(bg=self.colors['bg'])
-        self.top.geometry("450x420")
-        self.top.resizable(False, False)
+        self._build_window(master, "Mark Task Done", "450x420")
         
         # Modern header
         header = tk.Frame(self.top, bg=self.colors['success'], height=50)
@@ -294,9 +534,10 @@ class MarkDonePopup:
                 bg=self.colors['bg'], fg=self.colors['fg_secondary'],
                 font=('Segoe UI', 10)).pack(anchor='w')
         
-        tk.Label(main_container, text=task_title,
-                bg=self.colors['bg'], fg=self.colors['fg'],
-                font=('Segoe UI', 12, 'bold'), wraplength=380).pack(anchor='w', pady=(2, 15))
+        self.title_label = tk.Label(main_container, text="",
+                                   bg=self.colors['bg'], fg=self.colors['fg'],
+                                   font=('Segoe UI', 12, 'bold'), wraplength=380)
+        self.title_label.pack(anchor='w', pady=(2, 15))
         
         # Remarks Section
         tk.Label(main_container, text="📝 Remarks (optional)",
@@ -329,47 +570,168 @@ class MarkDonePopup:
                               bg=self.colors['bg_secondary'], fg=self.colors['fg'],
                               bd=1, relief=tk.SOLID, padx=25, pady=12, cursor="hand2")
         cancel_btn.pack(side=tk.RIGHT)
-        
-        # Center the popup
-        self.top.update_idletasks()
-        width = self.top.winfo_width()
-        height = self.top.winfo_height()
-        x = (self.top.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.top.winfo_screenheight() // 2) - (height // 2)
-        self.top.geometry(f"{width}x{height}+{x}+{y}")
-        
-        self.top.transient(master)
-        self.top.grab_set()
-        self.top.deiconify()
-        self.remarks_text.focus_set()
+    
+    def open(self, task_title):
+        """Show the dialog for a task and wait; returns True if confirmed (remarks in self.remarks)"""
+        with perf.span("dialog.open.MarkDonePopup"):
+            self.confirmed = False
+            self.remarks = None
+            self.title_label.config(text=task_title)
+            self.remarks_text.delete("1.0", tk.END)
+            self._present()
+            self.remarks_text.focus_set()
+        self._wait()
+        return self.confirmed
     
     def confirm(self):
         self.confirmed = True
         remarks = self.remarks_text.get("1.0", tk.END).strip()
         self.remarks = remarks if remarks else None
-        self.top.destroy()
+        self._close()
     
     def cancel(self):
         self.confirmed = False
-        self.top.destroy()
+        self._close()
 
 
-class ReportPopup:
+class BlockersPopup(ReusableDialog):
+    """Dialog for choosing the tasks a task is blocked by"""
+    
+    def __init__(self, master, dark_mode=False):
+        self.result = None
+        self.original = []
+        self.selected = set()
+        self.candidates = []
+        self.visible = []
+        self.colors = get_dialog_colors(dark_mode)
+        
+        with perf.span("dialog.build.BlockersPopup"):
+            self._build_widgets(master)
+    
+    def _build_widgets(self, master):
+        self._build_window(master, "Blocked By", "520x560", resizable=True)
+        
+        header = tk.Frame(self.top, bg=self.colors['warning'], height=50)
+        header.pack(fill=tk.X)
+        header.pack_propagate(False)
+        
+        tk.Label(header, text="⛓  Blocked By",
+                bg=self.colors['warning'], fg='white',
+                font=('Segoe UI', 14, 'bold')).pack(expand=True)
+        
+        main_container = tk.Frame(self.top, bg=self.colors['bg'], padx=25, pady=15)
+        main_container.pack(fill=tk.BOTH, expand=True)
+        
+        self.title_label = tk.Label(main_container, text="",
+                                   bg=self.colors['bg'], fg=self.colors['fg'],
+                                   font=('Segoe UI', 12, 'bold'), wraplength=450, justify=tk.LEFT)
+        self.title_label.pack(anchor='w', pady=(0, 10))
+        
+        tk.Label(main_container, text="Can only start once these are done (click to select):",
+                bg=self.colors['bg'], fg=self.colors['fg_secondary'],
+                font=('Segoe UI', 10)).pack(anchor='w')
+        
+        search_border = tk.Frame(main_container, bg=self.colors['border'], padx=1, pady=1)
+        search_border.pack(fill=tk.X, pady=(8, 8))
+        self.search_var = tk.StringVar()
+        self.search_var.trace('w', lambda *args: self._fill_list())
+        tk.Entry(search_border, textvariable=self.search_var, font=('Segoe UI', 11),
+                 bg=self.colors['entry_bg'], fg=self.colors['entry_fg'],
+                 insertbackground=self.colors['fg'], relief=tk.FLAT, bd=0).pack(fill=tk.X, ipady=6, padx=8)
+        
+        list_frame = tk.Frame(main_container, bg=self.colors['border'], padx=1, pady=1)
+        list_frame.pack(fill=tk.BOTH, expand=True)
+        scrollbar = ttk.Scrollbar(list_frame)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox = tk.Listbox(list_frame, selectmode=tk.MULTIPLE, activestyle='none',
+                                  font=('Segoe UI', 10), bg=self.colors['entry_bg'],
+                                  fg=self.colors['entry_fg'], selectbackground=self.colors['accent'],
+                                  relief=tk.FLAT, bd=0, exportselection=False,
+                                  yscrollcommand=scrollbar.set)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.config(command=self.listbox.yview)
+        self.listbox.bind('<<ListboxSelect>>', self._selection_changed)
+        
+        btn_container = tk.Frame(self.top, bg=self.colors['bg'], padx=25, pady=15)
+        btn_container.pack(fill=tk.X, side=tk.BOTTOM)
+        
+        tk.Button(btn_container, text="✓  Save", command=self.confirm,
+                  font=('Segoe UI', 11, 'bold'),
+                  bg=self.colors['success'], fg='white',
+                  bd=0, relief=tk.FLAT, padx=25, pady=10, cursor="hand2").pack(side=tk.LEFT)
+        tk.Button(btn_container, text="Cancel", command=self.cancel,
+                  font=('Segoe UI', 11),
+                  bg=self.colors['bg_secondary'], fg=self.colors['fg'],
+                  bd=1, relief=tk.SOLID, padx=25, pady=10, cursor="hand2").pack(side=tk.RIGHT)
+    
+    def open(self, task, tasks):
+        """Show the candidates for a task and wait; returns the chosen blocker ids or None"""
+        with perf.span("dialog.open.BlockersPopup"):
+            self.result = None
+            self.title_label.config(text=task.title)
+            self.original = list(task.blocked_by)
+            self.selected = set(task.blocked_by)
+            # Open tasks are candidates; Done ones only while they are already blockers
+            self.candidates = [t for t in tasks
+                               if t.id != task.id and (t.status != "Done" or t.id in self.selected)]
+            self.search_var.set("")  # Fills the list through the trace
+            self._present()
+        self._wait()
+        return self.result
+    
+    def _fill_list(self):
+        search = self.search_var.get().strip().lower()
+        self.visible = [t for t in self.candidates if not search or search in t.title.lower()]
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *(f"{STATUS_ICONS.get(t.status, '⬜')}  {t.title}" for t in self.visible))
+        for row, t in enumerate(self.visible):
+            if t.id in self.selected:
+                self.listbox.selection_set(row)
+    
+    def _selection_changed(self, event=None):
+        chosen = set(self.listbox.curselection())
+        for row, t in enumerate(self.visible):
+            if row in chosen:
+                self.selected.add(t.id)
+            else:
+                self.selected.discard(t.id)
+    
+    def confirm(self):
+        # Existing blockers keep their order (ids of deleted tasks are dropped), new ones follow
+        candidate_ids = {t.id for t in self.candidates}
+        kept = [b for b in self.original if b in self.selected and b in candidate_ids]
+        added = [t.id for t in self.candidates if t.id in self.selected and t.id not in kept]
+        self.result = kept + added
+        self._close()
+
+
+class ReportPopup(ReusableDialog):
     """Dialog for generating standup reports"""
     
-    def __init__(self, master, tasks, dark_mode=False):
-        self.tasks = tasks
-        self.top = tk.Toplevel(master)
-        self.top.withdraw()  # Hide window during setup to prevent flickering
-        self.top.title("Standup Report")
-        self.top.geometry("650x650")
+    FILL_CHUNK_LINES = 500  # Report lines inserted into the text area per event-loop tick
+    EXPORT_PROGRESS_EVERY = 2000  # Chunks written between export progress updates
+    
+    def __init__(self, master, background, dark_mode=False, completion_index=None, report_cache=None,
+                 history=None, time_log=None):
+        self.tasks = []
+        self.background = background
+        self.completion_index = completion_index
+        self.history = history  # TaskHistory: past ranges show the board as it was back then
+        self.time_log = time_log  # TimeLog: adds the time tracked in the range
+        self.report_cache = report_cache
+        self.report_args = ([], [], [], "", "")
+        self._fill_job = None
+        self._build = None   # background.Job building the report being waited for
+        self._export = None  # background.Job writing an export
         
         # Get colors based on mode
         self.colors = get_dialog_colors(dark_mode)
         
-        self.top.configure(bg=self.colors['bg'])
-        self.top.transient(master)
-        self.top.grab_set()
+        with perf.span("dialog.build.ReportPopup"):
+            self._build_widgets(master)
+    
+    def _build_widgets(self, master):
+        self._build_window(master, "Standup Report", "650x650", resizable=True)
         
         # Modern header
         header = tk.Frame(self.top, bg=self.colors['accent'], height=60)
@@ -399,7 +761,7 @@ class ReportPopup:
         tk.Label(date_inputs, text="From:", bg=self.colors['bg_secondary'],
                 fg=self.colors['fg_secondary'], font=('Segoe UI', 10)).pack(side=tk.LEFT)
         
-        if HAS_CALENDAR:
+        if load_calendar():
             self.start_date_picker = DateEntry(date_inputs, 
                                               width=12,
                                               background=self.colors['accent'],
@@ -490,19 +852,38 @@ class ReportPopup:
                               padx=20, pady=10)
         export_btn.pack(side=tk.LEFT)
         
-        # Center window
-        self.top.update_idletasks()
-        width = self.top.winfo_width()
-        height = self.top.winfo_height()
-        x = (self.top.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.top.winfo_screenheight() // 2) - (height // 2)
-        self.top.geometry(f'{width}x{height}+{x}+{y}')
-        
-        # Show window after positioning (prevents flickering)
-        self.top.deiconify()
-        
+        # Changing a date cancels a report still being built for the old range
+        if HAS_CALENDAR:
+            for picker in (self.start_date_picker, self.end_date_picker):
+                picker.bind('<<DateEntrySelected>>', lambda e: self.generate_report())
+                picker.bind('<KeyRelease>', lambda e: self._cancel_build())
+        else:
+            for entry in (self.start_date_entry, self.end_date_entry):
+                entry.bind('<KeyRelease>', lambda e: self._cancel_build())
+                entry.bind('<Return>', lambda e: self.generate_report())
+        self.top.bind('<Destroy>', lambda e: self._cancel_build() if e.widget is self.top else None)
+    
+    def open(self, tasks):
+        """Show the dialog for the current task list with the date range cleared"""
+        with perf.span("dialog.open.ReportPopup"):
+            self.tasks = tasks
+            if HAS_CALENDAR:
+                self.start_date_picker.delete(0, tk.END)
+                self.end_date_picker.delete(0, tk.END)
+            else:
+                self.start_date_entry.delete(0, tk.END)
+                self.end_date_entry.delete(0, tk.END)
+            self._present()
         self.generate_report()
+    
+    def cancel(self):
+        """Hide the dialog and drop the current report"""
+        self._cancel_build()
+        self._clear_text_area()
+        self.report_args = ([], [], [], "", "")
+        self._close()
 
+    @perf.timed("generate_report.dispatch")  # The build itself is timed on the worker
     def generate_report(self):
         start_date = None
         end_date = None
@@ -536,88 +917,93 @@ class ReportPopup:
                 messagebox.showerror("Error", "Invalid date format. Use YYYY-MM-DD")
                 return
 
-        done_tasks = []
-        in_progress_tasks = []
-        pending_tasks = []
+        self._cancel_build()
+        self._clear_text_area()
+        key = (start_date_str, end_date_str)
+        
+        cached = self.report_cache.get(key) if self.report_cache is not None else None
+        if cached is not None and self.time_log is not None and self.time_log.running():
+            cached = None  # A running timer keeps adding to the time tracked section
+        if cached is not None:
+            self._show_report(cached)
+            return
+        
+        # Take the snapshot on the Tk thread; grouping and formatting run on a worker
+        if self.completion_index is not None:
+            done_tasks = self.completion_index.range(start_date, end_date)
+        else:
+            done_tasks = None
+        time_totals = self.time_log.totals(start_date, end_date) if self.time_log is not None else None
+        token = self.report_cache.begin(key) if self.report_cache is not None else None
+        self.text_area.config(state=tk.NORMAL)
+        self.text_area.insert(tk.END, "Generating report…")
+        self.text_area.config(state=tk.DISABLED)
+        self._build = self.background.submit(
+            self._build_report, list(self.tasks), done_tasks, self.history, time_totals, start_date,
+            end_date, start_date_str, end_date_str, name="generate_report.build", with_job=True,
+            on_done=lambda result: self._report_built(key, token, result))
 
-        for task in self.tasks:
-            if task.status == "Done":
-                if task.completion_date:
-                    try:
-                        comp_date = datetime.strptime(task.completion_date, "%Y-%m-%d").date()
-                        if (not start_date or comp_date >= start_date) and (not end_date or comp_date <= end_date):
-                            done_tasks.append(task)
-                    except ValueError:
-                        pass
-                elif not start_date and not end_date:
-                    done_tasks.append(task)
-            elif task.status == "In Progress":
-                in_progress_tasks.append(task)
-            else:
-                if not start_date and not end_date:
-                    pending_tasks.append(task)
-                else:
-                    pending_tasks.append(task)
+    @staticmethod
+    @perf.timed("generate_report")
+    def _build_report(job, tasks, done_tasks, history, time_totals, start_date, end_date,
+                      start_date_str, end_date_str):
+        """Worker thread: group and format the report (never touches Tk)"""
+        if done_tasks is None:
+            groups = group_report_tasks(tasks, start_date, end_date)
+        else:
+            groups = (done_tasks,) + split_open_tasks(tasks)
+        groups = apply_history(groups, tasks, history, start_date, end_date)
+        metrics = None
+        if history is not None and len(history) and not job.cancelled:
+            from analytics import compute_metrics  # NumPy is slow to import
+            metrics = compute_metrics(tasks, history, start_date, end_date)
+        if job.cancelled:
+            return None
+        extras = report_extras(tasks, groups[0], start_date, end_date, time_totals, metrics)
+        return groups + (start_date_str, end_date_str, extras)
+
+    def _report_built(self, key, token, report_args):
+        self._build = None
+        if report_args is None:
+            return
+        if self.report_cache is not None:
+            self.report_cache.put(key, token, report_args)
+        self._clear_text_area()
+        self._show_report(report_args)
 
-        self.report_text = self._format_report(done_tasks, in_progress_tasks, pending_tasks, start_date_str, end_date_str)
+    def _cancel_build(self):
+        """Stop waiting for (and abort) a report still being built"""
+        if self._build is not None:
+            self._build.cancel()
+            self._build = None
 
+    def _clear_text_area(self):
+        if self._fill_job is not None:
+            self.top.after_cancel(self._fill_job)
+            self._fill_job = None
         self.text_area.config(state=tk.NORMAL)
         self.text_area.delete(1.0, tk.END)
-        self.text_area.insert(tk.END, self.report_text)
         self.text_area.config(state=tk.DISABLED)
 
-    def _format_report(self, done_tasks, in_progress_tasks, pending_tasks, start_date, end_date):
-        header = "═" * 60 + "\n"
-        header += "STANDUP REPORT\n"
-        if start_date or end_date:
-            period = f"Period: {start_date or 'Beginning'} to {end_date or 'Now'}\n"
-        else:
-            period = "Period: All Time\n"
-        header += period + "═" * 60 + "\n\n"
-
-        done_section = "✅ DONE:\n" + "─" * 60 + "\n"
-        if done_tasks:
-            for i, task in enumerate(done_tasks, 1):
-                done_section += f"{i}. {task.title}"
-                if task.completion_date:
-                    done_section += f" (completed: {task.completion_date})"
-                if task.tags:
-                    done_section += f" [{', '.join(task.tags)}]"
-                done_section += "\n"
-                if task.remarks:
-                    done_section += f"   └─ Remarks: {task.remarks}\n"
-        else:
-            done_section += "No completed tasks\n"
-
-        in_progress_section = "\n🔄 IN PROGRESS:\n" + "─" * 60 + "\n"
-        if in_progress_tasks:
-            for i, task in enumerate(in_progress_tasks, 1):
-                in_progress_section += f"{i}. {task.title}"
-                if task.deadline:
-                    in_progress_section += f" (deadline: {task.deadline})"
-                if task.priority != "Medium":
-                    in_progress_section += f" [Priority: {task.priority}]"
-                if task.tags:
-                    in_progress_section += f" [{', '.join(task.tags)}]"
-                in_progress_section += "\n"
-        else:
-            in_progress_section += "No tasks in progress\n"
-
-        pending_section = "\n☐ PENDING:\n" + "─" * 60 + "\n"
-        if pending_tasks:
-            for i, task in enumerate(pending_tasks, 1):
-                pending_section += f"{i}. {task.title}"
-                if task.deadline:
-                    pending_section += f" (deadline: {task.deadline})"
-                if task.priority != "Medium":
-                    pending_section += f" [Priority: {task.priority}]"
-                if task.tags:
-                    pending_section += f" [{', '.join(task.tags)}]"
-                pending_section += "\n"
-        else:
-            pending_section += "No pending tasks\n"
+    def _show_report(self, report_args):
+        self.report_args = report_args
+        # Format and fill the text area a chunk at a time so large reports don't block the UI
+        self._fill_text_area(iter_report_args_lines(report_args))
 
-        return header + done_section + in_progress_section + pending_section
+    def _fill_text_area(self, lines):
+        chunk = "".join(islice(lines, self.FILL_CHUNK_LINES))
+        if not chunk:
+            self._fill_job = None
+            return
+        self.text_area.config(state=tk.NORMAL)
+        self.text_area.insert(tk.END, chunk)
+        self.text_area.config(state=tk.DISABLED)
+        self._fill_job = self.top.after(1, lambda: self._fill_text_area(lines))
+
+    @property
+    def report_text(self):
+        """Full report as a single string (built on demand for the clipboard)"""
+        return "".join(iter_report_args_lines(self.report_args))
 
     def copy_to_clipboard(self):
         self.top.clipboard_clear()
@@ -627,13 +1013,121 @@ class ReportPopup:
     def export_to_file(self):
         file_path = filedialog.asksaveasfilename(
             defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+            filetypes=export_filetypes(),
             title="Export Report"
         )
+        if file_path:
+            # Written on a worker; the title shows progress for large reports
+            self.top.title("Standup Report - exporting...")
+            self._export = self.background.submit(
+                self._write_export, file_path, renderer_for_path(file_path), self.report_args,
+                name="export_report", with_job=True,
+                on_progress=lambda count: self.top.title(f"Standup Report - exporting ({count:,} written)"),
+                on_done=lambda result: self._export_finished(file_path, None),
+                on_error=lambda error: self._export_finished(file_path, error))
+
+    @classmethod
+    def _write_export(cls, job, file_path, renderer, report_args):
+        """Worker thread: stream the report into the file chunk by chunk"""
+        chunks = renderer.iter_chunks(report_args)
+        with open(file_path, "w", encoding="utf-8", newline=renderer.newline) as f:
+            for count, chunk in enumerate(chunks, 1):
+                f.write(chunk)
+                if count % cls.EXPORT_PROGRESS_EVERY == 0:
+                    job.progress(count)
+
+    def _export_finished(self, file_path, error):
+        self._export = None
+        self.top.title("Standup Report")
+        if error is None:
+            messagebox.showinfo("Success", f"Report exported to {file_path}", parent=self.top)
+        else:
+            messagebox.showerror("Error", f"Failed to export: {str(error)}", parent=self.top)
+
+
+class PerfPanel:
+    """Hidden debug panel (F12) showing latency percentiles per instrumented operation"""
+    
+    REFRESH_MS = 1000
+    COLUMNS = (("op", "Operation", 200), ("count", "Calls", 70), ("p50", "p50 ms", 80),
+               ("p95", "p95 ms", 80), ("p99", "p99 ms", 80), ("max", "max ms", 80))
+    
+    def __init__(self, master, dark_mode=False):
+        self.was_enabled = perf.is_enabled()
+        perf.enable(True)
+        
+        self.colors = get_dialog_colors(dark_mode)
+        self.top = tk.Toplevel(master)
+        self.top.title("Performance")
+        self.top.geometry("640x360")
+        self.top.configure(bg=self.colors['bg'])
+        self.top.transient(master)
+        
+        header = tk.Frame(self.top, bg=self.colors['accent'], height=44)
+        header.pack(fill=tk.X)
+        header.pack_propagate(False)
+        tk.Label(header, text="⏱  Performance",
+                bg=self.colors['accent'], fg='white',
+                font=('Segoe UI', 13, 'bold')).pack(expand=True)
+        
+        body = tk.Frame(self.top, bg=self.colors['bg'], padx=15, pady=12)
+        body.pack(fill=tk.BOTH, expand=True)
+        
+        self.table = ttk.Treeview(body, columns=[c[0] for c in self.COLUMNS], show="headings", height=8)
+        for col, heading, width in self.COLUMNS:
+            self.table.heading(col, text=heading)
+            self.table.column(col, width=width, anchor=tk.E if col != "op" else tk.W)
+        self.table.pack(fill=tk.BOTH, expand=True)
+        
+        self.gauge_label = tk.Label(body, text="", justify=tk.LEFT, anchor='w',
+                                   bg=self.colors['bg'], fg=self.colors['fg_secondary'],
+                                   font=('Consolas', 9))
+        self.gauge_label.pack(fill=tk.X, pady=(8, 0))
+        
+        button_frame = tk.Frame(body, bg=self.colors['bg'])
+        button_frame.pack(fill=tk.X, pady=(10, 0))
+        for text, command in (("Reset", self.reset), ("Export Trace", self.export_trace), ("Close", self.close)):
+            tk.Button(button_frame, text=text, command=command,
+                     bg=self.colors['bg_secondary'], fg=self.colors['fg'],
+                     font=('Segoe UI', 10), bd=1, relief=tk.SOLID,
+                     padx=14, pady=4, cursor="hand2").pack(side=tk.LEFT, padx=(0, 8))
+        
+        self.top.protocol("WM_DELETE_WINDOW", self.close)
+        self.top.bind('<F12>', lambda e: self.close())
+        self._refresh_job = None
+        self.refresh()
+    
+    def refresh(self):
+        self.table.delete(*self.table.get_children())
+        for name, count, p50, p95, p99, peak in perf.stats():
+            self.table.insert("", tk.END, values=(name, count, f"{p50:.2f}", f"{p95:.2f}",
+                                                  f"{p99:.2f}", f"{peak:.2f}"))
+        self.gauge_label.config(text="\n".join(
+            f"{name}: " + ", ".join(f"{key} {value}" for key, value in counters.items())
+            for name, counters in perf.gauges()))
+        self._refresh_job = self.top.after(self.REFRESH_MS, self.refresh)
+    
+    def reset(self):
+        perf.reset()
+    
+    def export_trace(self):
+        file_path = filedialog.asksaveasfilename(
+            parent=self.top,
+            defaultextension=".json",
+            filetypes=[("Chrome trace", "*.json"), ("All files", "*.*")],
+            title="Export Trace"
+        )
         if file_path:
             try:
-                with open(file_path, "w") as f:
-                    f.write(self.report_text)
-                messagebox.showinfo("Success", f"Report exported to {file_path}")
+                count = perf.export_chrome_trace(file_path)
+                messagebox.showinfo("Trace Exported", f"Wrote {count} spans to {file_path}\n"
+                                    "Open it in chrome://tracing or ui.perfetto.dev", parent=self.top)
             except Exception as e:
-                messagebox.showerror("Error", f"Failed to export: {str(e)}")
+                messagebox.showerror("Error", f"Failed to export: {str(e)}", parent=self.top)
+    
+    def close(self):
+        if self._refresh_job is not None:
+            self.top.after_cancel(self._refresh_job)
+            self._refresh_job = None
+        perf.enable(self.was_enabled)
+        self.top.destroy()
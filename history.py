@@ -0,0 +1,191 @@
+# history.py - Append-only log of task status transitions with time-travel queries
+#
+# Each transition is (epoch seconds, task id, status code), kept in packed
+# arrays in memory and appended to task_history.bin as 13-byte records.
+# board_at() answers "what was every task's status at time X" by copying the
+# nearest checkpoint before X and replaying the events after it. A checkpoint
+# is taken once the events since the previous one outnumber the live tasks,
+# so checkpoints never use more memory than the log itself.
+import os
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from datetime import date, datetime, time as dtime
+
+HISTORY_FILE = "task_history.bin"
+RECORD = struct.Struct("<qiB")  # epoch seconds, task id, status code
+
+STATUS_CODES = {"Pending": 0, "In Progress": 1, "Done": 2}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+DELETED = 255
+CHECKPOINT_MIN_EVENTS = 1000
+
+
+def _timestamp(when, end_of_day=True):
+    """Epoch seconds for a date (its last second, or first), datetime or number"""
+    if isinstance(when, datetime):
+        return int(when.timestamp())
+    if isinstance(when, date):
+        return int(datetime.combine(when, dtime.max if end_of_day else dtime.min).timestamp())
+    return int(when)
+
+
+class TaskHistory:
+    """Status transitions for every task, replayable to any point in time"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._times = array("q")
+        self._ids = array("i")
+        self._codes = array("B")
+        self._state = {}          # task id -> current status code
+        self._first_seen = {}     # task id -> time of its first event
+        self._cp_positions = []   # event index each checkpoint was taken at
+        self._cp_states = []      # state dict at that index
+        self._pending = bytearray()  # Records not yet appended to the file
+
+    def __len__(self):
+        return len(self._times)
+
+    # --------------------------
+    # Recording
+    # --------------------------
+
+    def _append(self, ts, task_id, code):
+        if self._times and ts < self._times[-1]:
+            ts = self._times[-1]  # Keep the log sorted even if the clock steps back
+        self._times.append(ts)
+        self._ids.append(task_id)
+        self._codes.append(code)
+        self._first_seen.setdefault(task_id, ts)
+        if code == DELETED:
+            self._state.pop(task_id, None)
+        else:
+            self._state[task_id] = code
+        since_checkpoint = len(self._times) - (self._cp_positions[-1] if self._cp_positions else 0)
+        if since_checkpoint >= max(CHECKPOINT_MIN_EVENTS, len(self._state)):
+            self._cp_positions.append(len(self._times))
+            self._cp_states.append(dict(self._state))
+        return ts
+
+    def record(self, task_id, status, when=None):
+        """Log a transition unless the task is already in that status"""
+        code = DELETED if status is None else STATUS_CODES.get(status, 0)
+        with self._lock:
+            if self._state.get(task_id, DELETED) == code:
+                return
+            ts = self._append(int(time.time()) if when is None else _timestamp(when), task_id, code)
+            self._pending += RECORD.pack(ts, task_id, code)
+
+    def on_change(self, action, task, previous=None):
+        """Change listener for task_manager.add_change_listener"""
+        if task.id is None:
+            return
+        self.record(task.id, None if action == "delete" else task.status)
+
+    def sync(self, tasks):
+        """Catch up with a task list changed outside this process (or seed an empty log)"""
+        if not self._times:
+            # Seed: done tasks as of their completion date, everything else from now
+            seeds = []
+            now = int(time.time())
+            for task in tasks:
+                ts = now
+                if task.status == "Done" and task.completion_date:
+                    try:
+                        ts = min(now, _timestamp(datetime.strptime(task.completion_date, "%Y-%m-%d").date(),
+                                                 end_of_day=False))
+                    except ValueError:
+                        pass
+                seeds.append((ts, task.id, task.status))
+            seeds.sort(key=lambda seed: seed[0])
+            for ts, task_id, status in seeds:
+                self.record(task_id, status, ts)
+            return
+        alive = set()
+        for task in tasks:
+            alive.add(task.id)
+            self.record(task.id, task.status)
+        for task_id in [task_id for task_id in self._state if task_id not in alive]:
+            self.record(task_id, None)
+
+    # --------------------------
+    # Storage
+    # --------------------------
+
+    def load(self):
+        """Read the history file (missing file = empty history); a torn last record is ignored"""
+        try:
+            with open(self.path or HISTORY_FILE, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return self
+        usable = len(data) - len(data) % RECORD.size
+        with self._lock:
+            for ts, task_id, code in RECORD.iter_unpack(memoryview(data)[:usable]):
+                self._append(ts, task_id, code)
+        return self
+
+    def flush(self):
+        """Append records logged since the last flush to the history file"""
+        with self._lock:
+            pending, self._pending = self._pending, bytearray()
+        if pending:
+            with open(self.path or HISTORY_FILE, "ab") as f:
+                f.write(pending)
+                f.flush()
+                os.fsync(f.fileno())
+
+    # --------------------------
+    # Queries
+    # --------------------------
+
+    def board_at(self, when):
+        """{task id: status} as it stood at `when` (a date means the end of that day)"""
+        ts = _timestamp(when)
+        with self._lock:
+            pos = bisect_right(self._times, ts)
+            cp = bisect_right(self._cp_positions, pos) - 1
+            if cp >= 0:
+                state = dict(self._cp_states[cp])
+                start = self._cp_positions[cp]
+            else:
+                state = {}
+                start = 0
+            ids = self._ids
+            codes = self._codes
+            for i in range(start, pos):
+                if codes[i] == DELETED:
+                    state.pop(ids[i], None)
+                else:
+                    state[ids[i]] = codes[i]
+        return {task_id: STATUS_NAMES[code] for task_id, code in state.items()}
+
+    def completed_between(self, start=None, end=None):
+        """Ids of tasks moved to Done between two dates (inclusive)"""
+        lo_ts = _timestamp(start, end_of_day=False) if start is not None else None
+        hi_ts = _timestamp(end) if end is not None else None
+        done = STATUS_CODES["Done"]
+        with self._lock:
+            lo = bisect_right(self._times, lo_ts - 1) if lo_ts is not None else 0
+            hi = bisect_right(self._times, hi_ts) if hi_ts is not None else len(self._times)
+            return {self._ids[i] for i in range(lo, hi) if self._codes[i] == done}
+
+    def columns(self):
+        """Copies of the (times, ids, codes) arrays, safe to read on another thread"""
+        with self._lock:
+            return self._times[:], self._ids[:], self._codes[:]
+
+    def first_seen(self, task_id):
+        """Epoch seconds of the task's first logged event, or None"""
+        with self._lock:
+            return self._first_seen.get(task_id)
+
+    def transitions(self, task_id):
+        """[(datetime, status)] for one task, oldest first (None status = deleted)"""
+        with self._lock:
+            return [(datetime.fromtimestamp(self._times[i]), STATUS_NAMES.get(self._codes[i]))
+                    for i in range(len(self._ids)) if self._ids[i] == task_id]
@@ -0,0 +1,298 @@
+# importer.py - Parallel bulk import of CSV / JSON / JSONL task dumps
+#
+# The input is split into chunks in the main process; parsing, normalising
+# and validating rows happens in a ProcessPoolExecutor. Parsed rows are merged
+# in input order and written to tasks.json with a single save_tasks call.
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+from dedupe import DuplicateIndex
+from task_manager import Task, load_tasks, next_task_id, save_tasks, validate_task_dict
+
+DEFAULT_CHUNK_SIZE = 5000
+MAX_ERRORS_KEPT = 1000
+
+# Task field -> column name in the source file
+DEFAULT_COLUMNS = {
+    "title": "title",
+    "deadline": "deadline",
+    "priority": "priority",
+    "status": "status",
+    "tags": "tags",
+    "completion_date": "completion_date",
+    "remarks": "remarks",
+    "external_id": "external_id",
+    "effort": "effort",
+}
+
+DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%m/%d/%Y", "%d.%m.%Y", "%Y-%m-%dT%H:%M:%S")
+
+STATUS_ALIASES = {
+    "pending": "Pending", "open": "Pending", "todo": "Pending", "to do": "Pending", "new": "Pending",
+    "in progress": "In Progress", "in-progress": "In Progress", "doing": "In Progress",
+    "started": "In Progress", "active": "In Progress",
+    "done": "Done", "closed": "Done", "completed": "Done", "resolved": "Done",
+}
+
+PRIORITY_ALIASES = {
+    "high": "High", "urgent": "High", "critical": "High", "p1": "High",
+    "medium": "Medium", "normal": "Medium", "p2": "Medium",
+    "low": "Low", "minor": "Low", "p3": "Low",
+}
+
+
+class ImportResult:
+    """Outcome of an import run"""
+
+    def __init__(self):
+        self.tasks = []
+        self.rows = 0
+        self.skipped = 0        # rows whose external_id is already in the store
+        self.error_count = 0
+        self.errors = []        # (row number, message), capped at MAX_ERRORS_KEPT
+        self.duplicate_count = 0
+        self.duplicates = []    # (imported task, similarity, existing task), capped at MAX_ERRORS_KEPT
+        self.parse_seconds = 0.0
+        self.total_seconds = 0.0
+
+    def summary(self) -> str:
+        return (f"{self.rows} rows: {len(self.tasks)} imported, {self.skipped} already present, "
+                f"{self.error_count} errors, {self.duplicate_count} possible duplicates "
+                f"(parse {self.parse_seconds:.2f}s, "
+                f"total {self.total_seconds:.2f}s)")
+
+
+def parse_column_mapping(pairs):
+    """Build a field -> column mapping from "field=column" strings"""
+    mapping = dict(DEFAULT_COLUMNS)
+    for pair in pairs or []:
+        field, sep, column = pair.partition("=")
+        field = field.strip()
+        if not sep or field not in DEFAULT_COLUMNS:
+            raise ValueError(f"invalid column mapping '{pair}' (fields: {', '.join(DEFAULT_COLUMNS)})")
+        mapping[field] = column.strip()
+    return mapping
+
+
+def _normalize_date(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            pass
+    raise ValueError(f"unrecognised date '{value}'")
+
+
+def _normalize_row(record, mapping):
+    """Map one source record onto a validated task dict"""
+    data = {}
+    for field, column in mapping.items():
+        value = record.get(column)
+        if isinstance(value, str):
+            value = value.strip()
+        if value in (None, ""):
+            continue
+        data[field] = value
+
+    if "deadline" in data:
+        data["deadline"] = _normalize_date(data["deadline"])
+    if "completion_date" in data:
+        data["completion_date"] = _normalize_date(data["completion_date"])
+    if "priority" in data:
+        data["priority"] = PRIORITY_ALIASES.get(str(data["priority"]).lower(), data["priority"])
+    if "status" in data:
+        data["status"] = STATUS_ALIASES.get(str(data["status"]).lower(), data["status"])
+    if isinstance(data.get("tags"), str):
+        data["tags"] = [t.strip() for t in data["tags"].replace(";", ",").split(",") if t.strip()]
+    if "external_id" in data:
+        data["external_id"] = str(data["external_id"])
+    if "remarks" in data:
+        data["remarks"] = str(data["remarks"])
+    if isinstance(data.get("effort"), str):
+        try:
+            data["effort"] = float(data["effort"].lower().rstrip("h").strip())
+        except ValueError:
+            raise ValueError(f"unrecognised effort '{data['effort']}'")
+
+    validate_task_dict(data)
+    return data
+
+
+def _parse_chunk(job):
+    """Worker: parse and validate one chunk, returning (task dicts, errors)"""
+    kind, first_row, payload, mapping, header = job
+    parsed = []
+    errors = []
+    for offset, item in enumerate(payload):
+        row_no = first_row + offset
+        try:
+            if kind == "jsonl":
+                if not item.strip():
+                    continue
+                item = json.loads(item)
+            elif kind == "csv":
+                item = dict(zip(header, item))
+            if not isinstance(item, dict):
+                raise ValueError("row must be an object")
+            parsed.append(_normalize_row(item, mapping))
+        except ValueError as e:
+            errors.append((row_no, str(e)))
+    return parsed, errors
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".csv", ".tsv"):
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    return "json"
+
+
+def _iter_jobs(path, fmt, mapping, chunk_size):
+    """Yield chunk jobs for the worker pool without loading more than one chunk at a time"""
+    if fmt == "csv":
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            dialect = "excel-tab" if path.lower().endswith(".tsv") else "excel"
+            reader = csv.reader(f, dialect)
+            header = [h.strip() for h in next(reader, [])]
+            row_no = 2  # 1-based, after the header line
+            while True:
+                rows = list(islice(reader, chunk_size))
+                if not rows:
+                    break
+                yield ("csv", row_no, rows, mapping, header)
+                row_no += len(rows)
+    elif fmt == "jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            row_no = 1
+            while True:
+                lines = list(islice(f, chunk_size))
+                if not lines:
+                    break
+                yield ("jsonl", row_no, lines, mapping, None)
+                row_no += len(lines)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        if isinstance(records, dict):
+            records = records.get("tasks", [])
+        for start in range(0, len(records), chunk_size):
+            yield ("json", start + 1, records[start:start + chunk_size], mapping, None)
+
+
+def _run_jobs(jobs, workers):
+    """Run chunk jobs in order, keeping at most 2 chunks per worker in flight"""
+    if workers <= 1:
+        for job in jobs:
+            yield _parse_chunk(job)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        for job in jobs:
+            pending.append(executor.submit(_parse_chunk, job))
+            if len(pending) >= workers * 2:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def parse_file(path, mapping=None, fmt=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE) -> ImportResult:
+    """Parse and validate a dump into Task objects without touching the store"""
+    result = ImportResult()
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    jobs = _iter_jobs(path, fmt or detect_format(path), mapping or DEFAULT_COLUMNS, chunk_size)
+    for parsed, errors in _run_jobs(jobs, workers):
+        result.rows += len(parsed) + len(errors)
+        result.tasks.extend(Task.from_dict(data) for data in parsed)
+        result.error_count += len(errors)
+        room = MAX_ERRORS_KEPT - len(result.errors)
+        if room > 0:
+            result.errors.extend(errors[:room])
+    result.parse_seconds = time.perf_counter() - started
+    return result
+
+
+def import_file(path, mapping=None, fmt=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                dry_run=False) -> ImportResult:
+    """Import a dump into tasks.json with one bulk write"""
+    started = time.perf_counter()
+    result = parse_file(path, mapping, fmt, workers, chunk_size)
+
+    tasks = load_tasks()
+    known = {t.external_id for t in tasks if t.external_id}
+    imported = []
+    for task in result.tasks:
+        if task.external_id and task.external_id in known:
+            result.skipped += 1
+            continue
+        if task.external_id:
+            known.add(task.external_id)
+        task.id = next_task_id()
+        imported.append(task)
+    result.tasks = imported
+
+    # Warn about titles that look like an open task (or an earlier row); they are still imported
+    duplicates = DuplicateIndex(tasks).check_batch(imported)
+    result.duplicate_count = len(duplicates)
+    result.duplicates = duplicates[:MAX_ERRORS_KEPT]
+
+    if imported and not dry_run:
+        tasks.extend(imported)
+        save_tasks(tasks)
+    result.total_seconds = time.perf_counter() - started
+    return result
+
+
+# --------------------------
+# Benchmark
+# --------------------------
+
+def _write_sample_csv(path, rows):
+    priorities = ("High", "Medium", "Low")
+    statuses = ("Pending", "In Progress", "Done")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["external_id", "title", "deadline", "priority", "status", "tags",
+                         "completion_date", "remarks"])
+        for i in range(rows):
+            status = statuses[i % 3]
+            writer.writerow([
+                f"OLD-{i}", f"Migrated ticket {i}", f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                priorities[i % 3], status, "legacy;import" if i % 2 else "legacy",
+                "2025-06-01" if status == "Done" else "", "",
+            ])
+
+
+def benchmark_import(rows=200000, worker_counts=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Time parsing a synthetic CSV dump with different worker counts"""
+    import tempfile
+
+    cpus = os.cpu_count() or 1
+    if not worker_counts:
+        worker_counts = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1))) or [1]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dump.csv")
+        _write_sample_csv(path, rows)
+        print(f"Parsing {rows:,} CSV rows (chunk size {chunk_size}, {cpus} CPUs)")
+        baseline = None
+        for workers in worker_counts:
+            result = parse_file(path, workers=workers, chunk_size=chunk_size)
+            seconds = result.parse_seconds
+            baseline = baseline or seconds
+            results.append((workers, seconds))
+            print(f"  {workers:>3} workers: {seconds:7.2f}s  {rows / seconds:>10,.0f} rows/s  "
+                  f"x{baseline / seconds:.2f}")
+    return results
@@ -0,0 +1,475 @@
+# indexes.py - In-memory indexes over the task list, kept current via change listeners
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+
+
+def _date_key(value):
+    """Normalise a date / YYYY-MM-DD string to the sortable string key"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        return value
+    return value.strftime("%Y-%m-%d")
+
+
+class CompletionIndex:
+    """Done tasks kept sorted by completion date for fast report ranges.
+
+    Dates are stored as YYYY-MM-DD strings, which sort chronologically, so a
+    range query is two bisects and a slice with no date parsing.
+    """
+
+    def __init__(self, tasks=()):
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        """Re-index a whole task list (after load or refresh)"""
+        self._dates = []
+        self._tasks = []
+        self._undated = {}   # id(task) -> done task without a completion date
+        self._indexed = {}   # id(task) -> date key the task is filed under
+        for task in tasks:
+            if task.status == "Done":
+                self._file(task, append=False)
+        order = sorted(range(len(self._tasks)), key=self._dates.__getitem__)
+        self._dates = [self._dates[i] for i in order]
+        self._tasks = [self._tasks[i] for i in order]
+
+    def __len__(self):
+        return len(self._tasks) + len(self._undated)
+
+    def _file(self, task, append=True):
+        if not task.completion_date:
+            self._undated[id(task)] = task
+            return
+        try:
+            datetime.strptime(task.completion_date, "%Y-%m-%d")
+        except (TypeError, ValueError):
+            return  # Unparseable dates never match a report range
+        key = task.completion_date
+        if append:
+            pos = bisect_right(self._dates, key)
+            self._dates.insert(pos, key)
+            self._tasks.insert(pos, task)
+        else:
+            self._dates.append(key)
+            self._tasks.append(task)
+        self._indexed[id(task)] = key
+
+    def _unfile(self, task):
+        if self._undated.pop(id(task), None) is not None:
+            return
+        key = self._indexed.pop(id(task), None)
+        if key is None:
+            return
+        lo = bisect_left(self._dates, key)
+        hi = bisect_right(self._dates, key)
+        for pos in range(lo, hi):
+            if self._tasks[pos] is task:
+                del self._dates[pos]
+                del self._tasks[pos]
+                return
+
+    def on_change(self, action, task, previous=None):
+        """Change listener for task_manager.add_change_listener"""
+        if previous is not None:
+            self._unfile(previous)
+        self._unfile(task)
+        if action != "delete" and task.status == "Done":
+            self._file(task)
+
+    def range(self, start=None, end=None):
+        """Done tasks completed between start and end (inclusive), oldest first"""
+        start_key = _date_key(start)
+        end_key = _date_key(end)
+        lo = bisect_left(self._dates, start_key) if start_key else 0
+        hi = bisect_right(self._dates, end_key) if end_key else len(self._dates)
+        result = self._tasks[lo:hi]
+        if not start_key and not end_key:
+            result.extend(self._undated.values())
+        return result
+
+
+class SubtaskIndex:
+    """Parent -> children index with done/total rollups kept current incrementally.
+
+    A task whose parent_id is unset, or names a task that no longer exists,
+    is shown at the top level. Each parent's rollup counts all of its
+    descendants. A change only adjusts the counters along the changed task's
+    ancestor chain, so it costs the depth of the task, not the size of the tree.
+    """
+
+    def __init__(self, tasks=()):
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        """Re-index a whole task list (after load or refresh)"""
+        self._tasks = {}     # task id -> task
+        self._filed = {}     # task id -> (parent id, done) the task is counted under
+        self._children = {}  # parent id -> {child id: None}, in insertion order
+        self._rollups = {}   # task id -> [done, total] over all descendants
+        for task in tasks:
+            if task.id is not None:
+                self._tasks[task.id] = task
+        for task in list(self._tasks.values()):
+            self._attach(task)
+
+    def _ancestors(self, parent_id):
+        """Ids from parent_id upwards, following parents of tasks already filed"""
+        while parent_id is not None:
+            yield parent_id
+            filed = self._filed.get(parent_id)
+            parent_id = filed[0] if filed else None
+
+    def _attach(self, task):
+        parent_id = task.parent_id
+        chain = list(self._ancestors(parent_id))
+        if task.id in chain:
+            # The new parent is one of the task's own descendants: keep it at the top level
+            parent_id = None
+            chain = []
+        done = task.status == "Done"
+        below = self._rollups.get(task.id, (0, 0))
+        done_delta = done + below[0]
+        total_delta = 1 + below[1]
+        for ancestor_id in chain:
+            rollup = self._rollups.setdefault(ancestor_id, [0, 0])
+            rollup[0] += done_delta
+            rollup[1] += total_delta
+        self._filed[task.id] = (parent_id, done)
+        self._children.setdefault(parent_id, {})[task.id] = None
+
+    def _detach(self, task_id):
+        parent_id, done = self._filed.pop(task_id)
+        below = self._rollups.get(task_id, (0, 0))
+        done_delta = done + below[0]
+        total_delta = 1 + below[1]
+        for ancestor_id in self._ancestors(parent_id):
+            rollup = self._rollups[ancestor_id]
+            rollup[0] -= done_delta
+            rollup[1] -= total_delta
+        siblings = self._children.get(parent_id)
+        if siblings is not None:
+            siblings.pop(task_id, None)
+            if not siblings:
+                del self._children[parent_id]
+
+    def on_change(self, action, task, previous=None):
+        """Change listener for task_manager.add_change_listener"""
+        if task.id is None:
+            return
+        if task.id in self._filed:
+            self._detach(task.id)
+        if action == "delete":
+            # Children of a deleted task keep their link and show at the top level
+            self._tasks.pop(task.id, None)
+        else:
+            self._tasks[task.id] = task
+            self._attach(task)
+
+    def is_root(self, task):
+        """Whether the task is shown at the top level of the tree"""
+        filed = self._filed.get(task.id)
+        parent_id = filed[0] if filed else task.parent_id
+        return parent_id is None or parent_id not in self._tasks
+
+    def has_children(self, task_id):
+        return task_id in self._children
+
+    def children(self, task_id):
+        """Direct subtasks of a task, in the order they were added"""
+        return [self._tasks[child_id] for child_id in self._children.get(task_id, ())]
+
+    def descendant_ids(self, task_id):
+        """Ids of every task below task_id"""
+        result = []
+        stack = list(self._children.get(task_id, ()))
+        while stack:
+            child_id = stack.pop()
+            result.append(child_id)
+            stack.extend(self._children.get(child_id, ()))
+        return result
+
+    def rollup(self, task_id):
+        """(done, total) over all descendants, or None for a task without subtasks"""
+        rollup = self._rollups.get(task_id)
+        if not rollup or not rollup[1]:
+            return None
+        return rollup[0], rollup[1]
+
+
+def find_dependency_cycle(task_id, blocker_ids, blockers_of):
+    """Chain of ids showing that blocking task_id on blocker_ids would form a cycle, or None.
+
+    blockers_of(id) returns the ids a task is currently blocked by. The chain
+    starts at task_id and each id blocks the next; the last one is one of
+    blocker_ids.
+    """
+    came_from = {}
+    stack = []
+    for blocker_id in blocker_ids:
+        if blocker_id not in came_from:
+            came_from[blocker_id] = None
+            stack.append(blocker_id)
+    while stack:
+        current = stack.pop()
+        if current == task_id:
+            chain = []
+            while current is not None:
+                chain.append(current)
+                current = came_from[current]
+            return chain
+        for blocker_id in blockers_of(current):
+            if blocker_id not in came_from:
+                came_from[blocker_id] = current
+                stack.append(blocker_id)
+    return None
+
+
+class DependencyIndex:
+    """"Blocked by" graph with a count of open blockers per task and the set of ready tasks.
+
+    A task is ready when it is not Done and every task blocking it is Done
+    (or no longer exists). A change only touches the edges of the changed
+    task, so listing the ready tasks costs the size of the ready set.
+    """
+
+    def __init__(self, tasks=()):
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        """Re-index a whole task list (after load or refresh)"""
+        self._tasks = {}       # task id -> task
+        self._filed = {}       # task id -> (blocker ids, done) the task is counted with
+        self._dependents = {}  # blocker id -> ids of the tasks it blocks
+        self._open = {}        # task id -> number of its blockers not yet Done
+        self._ready = {}       # ids of ready tasks (a dict as an ordered set)
+        for task in tasks:
+            if task.id is not None:
+                self._tasks[task.id] = task
+        for task in list(self._tasks.values()):
+            self._attach(task)
+
+    def _attach(self, task):
+        done = task.status == "Done"
+        blockers = tuple(dict.fromkeys(b for b in task.blocked_by if b != task.id))
+        open_count = 0
+        for blocker_id in blockers:
+            self._dependents.setdefault(blocker_id, set()).add(task.id)
+            filed = self._filed.get(blocker_id)
+            if filed is not None and not filed[1]:
+                open_count += 1
+        self._filed[task.id] = (blockers, done)
+        self._open[task.id] = open_count
+        if not done:
+            for dependent_id in self._dependents.get(task.id, ()):
+                self._open[dependent_id] += 1
+                self._ready.pop(dependent_id, None)
+            if open_count == 0:
+                self._ready[task.id] = None
+
+    def _detach(self, task_id):
+        blockers, done = self._filed.pop(task_id)
+        for blocker_id in blockers:
+            dependents = self._dependents[blocker_id]
+            dependents.discard(task_id)
+            if not dependents:
+                del self._dependents[blocker_id]
+        del self._open[task_id]
+        self._ready.pop(task_id, None)
+        if not done:
+            for dependent_id in self._dependents.get(task_id, ()):
+                self._open[dependent_id] -= 1
+                if self._open[dependent_id] == 0 and not self._filed[dependent_id][1]:
+                    self._ready[dependent_id] = None
+
+    def on_change(self, action, task, previous=None):
+        """Change listener for task_manager.add_change_listener"""
+        if task.id is None:
+            return
+        if task.id in self._filed:
+            self._detach(task.id)
+        if action == "delete":
+            self._tasks.pop(task.id, None)
+        else:
+            self._tasks[task.id] = task
+            self._attach(task)
+
+    def ready(self):
+        """Tasks that are not Done and not blocked by any open task"""
+        return [self._tasks[task_id] for task_id in self._ready]
+
+    def open_blockers(self, task_id):
+        """Number of tasks still blocking task_id"""
+        return self._open.get(task_id, 0)
+
+    def would_cycle(self, task_id, blocker_ids):
+        """Cycle chain (see find_dependency_cycle) if task_id were blocked by blocker_ids"""
+        filed = self._filed
+        return find_dependency_cycle(task_id, blocker_ids,
+                                     lambda i: filed[i][0] if i in filed else ())
+
+    def critical_path(self, task_id, memo=None):
+        """Longest chain of open tasks that must finish in turn, ending with task_id.
+
+        memo can be shared between calls to cost O(V + E) over many tasks.
+        """
+        filed = self._filed
+        if task_id not in filed or filed[task_id][1]:
+            return []
+        memo = {} if memo is None else memo  # id -> (chain length, next id down the chain)
+        stack = [(task_id, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if not expanded and current in memo:
+                continue
+            blockers = [b for b in filed[current][0] if b in filed and not filed[b][1]]
+            if not expanded:
+                memo[current] = None  # On the stack: a cycle back to it is ignored
+                stack.append((current, True))
+                stack.extend((b, False) for b in blockers if b not in memo)
+            else:
+                best = (1, None)
+                for blocker_id in blockers:
+                    below = memo.get(blocker_id)
+                    if below is not None and below[0] + 1 > best[0]:
+                        best = (below[0] + 1, blocker_id)
+                memo[current] = best
+        chain = []
+        current = task_id
+        while current is not None:
+            chain.append(current)
+            current = memo[current][1]
+        chain.reverse()
+        return chain
+
+    def schedule_risks(self, today=None):
+        """[(task, chain, days_left)] for open tasks whose chain is longer than their days left.
+
+        Each open task in a chain is assumed to take at least a day, so a task
+        due in 2 days behind 4 open tasks cannot make its deadline.
+        """
+        today = today or date.today()
+        memo = {}
+        risks = []
+        for task_id in [task_id for task_id, count in self._open.items() if count]:
+            task = self._tasks.get(task_id)
+            if task is None or not task.deadline:
+                continue
+            try:
+                days_left = (datetime.strptime(task.deadline, "%Y-%m-%d").date() - today).days
+            except ValueError:
+                continue
+            chain = self.critical_path(task_id, memo)
+            if len(chain) > max(days_left, 0) + 1:
+                risks.append((task, chain, days_left))
+        risks.sort(key=lambda risk: (risk[2] + 1 - len(risk[1]), risk[2]))
+        return risks
+
+
+class _TrieNode:
+    __slots__ = ("children", "tags", "best")
+
+    def __init__(self):
+        self.children = {}  # next character -> _TrieNode
+        self.tags = set()   # Tags (exact spelling) whose lowercased form ends here
+        self.best = None    # Cached top tags under this node, most used first; None = stale
+
+
+class TagIndex:
+    """Number of tasks per tag plus a prefix trie for autocomplete.
+
+    The trie is keyed on lowercased tags so "Work" and "work" suggest each
+    other. Every node caches its top tags by count; a count change only
+    invalidates the caches along that tag's path, and a query rebuilds them
+    from the children's caches. Suggestions cost the prefix length plus a
+    small merge, independent of the number of tasks.
+    """
+
+    TOP = 10  # Tags cached per trie node (the most suggestions a query can return)
+
+    def __init__(self, tasks=()):
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        """Re-index a whole task list (after load or refresh)"""
+        self.counts = {}  # tag -> number of tasks carrying it
+        self.version = getattr(self, "version", 0) + 1  # Bumped on every count change
+        self._root = _TrieNode()
+        for task in tasks:
+            for tag in set(task.tags):
+                self.counts[tag] = self.counts.get(tag, 0) + 1
+        for tag in self.counts:
+            self._path(tag, create=True)[-1].tags.add(tag)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def _path(self, key, create=False):
+        """Nodes from the root along a lowercased key (None if missing and not creating)"""
+        node = self._root
+        path = [node]
+        for ch in key.lower():
+            child = node.children.get(ch)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[ch] = _TrieNode()
+            node = child
+            path.append(node)
+        return path
+
+    def _bump(self, tag, delta):
+        self.version += 1
+        count = self.counts.get(tag, 0) + delta
+        path = self._path(tag, create=count > 0)
+        if count > 0:
+            self.counts[tag] = count
+            path[-1].tags.add(tag)
+        else:
+            self.counts.pop(tag, None)
+            if path is None:
+                return
+            path[-1].tags.discard(tag)
+            # Prune nodes left without tags or children
+            key = tag.lower()
+            for depth in range(len(path) - 1, 0, -1):
+                if path[depth].tags or path[depth].children:
+                    break
+                del path[depth - 1].children[key[depth - 1]]
+        for node in path:
+            node.best = None
+
+    def on_change(self, action, task, previous=None):
+        """Change listener for task_manager.add_change_listener"""
+        if action == "status":
+            return
+        if action == "delete":
+            old, new = set(task.tags), set()
+        else:
+            old, new = set(previous.tags) if previous is not None else set(), set(task.tags)
+        for tag in old - new:
+            self._bump(tag, -1)
+        for tag in new - old:
+            self._bump(tag, 1)
+
+    def _best(self, node):
+        if node.best is None:
+            candidates = [(-self.counts[tag], tag) for tag in node.tags]
+            for child in node.children.values():
+                candidates.extend((-self.counts[tag], tag) for tag in self._best(child))
+            candidates.sort()
+            node.best = [tag for _, tag in candidates[:self.TOP]]
+        return node.best
+
+    def suggest(self, prefix, limit=8, exclude=()):
+        """Existing tags starting with prefix (any case), most used first"""
+        path = self._path(prefix)
+        if path is None:
+            return []
+        result = [tag for tag in self._best(path[-1]) if tag not in exclude]
+        return result[:limit]
+
+    def most_used(self):
+        """[(tag, count)] for every tag, most used first"""
+        return sorted(self.counts.items(), key=lambda item: (-item[1], item[0].lower()))
@@ -0,0 +1,240 @@
+# ingest.py - Streaming JSONL command ingestion for task feeds
+#
+# Each input line is one command:
+#   {"op": "create",   "external_id": "MON-17", "task": {"title": "...", ...}}
+#   {"op": "update",   "external_id": "MON-17", "task": {"priority": "High"}}
+#   {"op": "complete", "external_id": "MON-17", "remarks": "auto-resolved"}
+#   {"op": "delete",   "external_id": "MON-17"}
+# update/complete/delete may address a task by "id" instead of "external_id".
+# An update that changes "status" completes or reopens the task the way the
+# app does (completion date, next occurrence of a recurring task).
+#
+# Lines are read in fixed-size chunks so memory stays bounded, and every chunk
+# that changes anything is written with a single save_tasks call. Commands are
+# idempotent: re-creating an existing external id, completing a Done task or
+# deleting a missing one are counted and skipped, so a feed can be re-run.
+import json
+import sys
+import time
+from itertools import islice
+
+from dedupe import DuplicateIndex
+from task_manager import (Task, load_tasks, save_tasks, add_task, delete_task, mark_task_done,
+                          edit_task, set_task_status, validate_task_dict)
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REJECTS_KEPT = 100
+OPERATIONS = ("create", "update", "complete", "delete")
+
+
+class IngestStats:
+    """Counters collected while ingesting a feed"""
+
+    def __init__(self):
+        self.lines = 0
+        self.created = 0
+        self.updated = 0
+        self.completed = 0
+        self.deleted = 0
+        self.duplicates = 0   # create for an external id that already exists
+        self.unchanged = 0    # update/complete/delete that was already applied
+        self.rejected = 0
+        self.commits = 0
+        self.elapsed = 0.0
+        self.rejects = []     # (line number, reason), capped at MAX_REJECTS_KEPT
+        self.similar = 0      # created task whose title looks like another open task
+        self.similar_titles = []  # (task, similarity, existing task), capped at MAX_REJECTS_KEPT
+
+    @property
+    def applied(self):
+        return self.created + self.updated + self.completed + self.deleted
+
+    @property
+    def throughput(self):
+        return self.lines / self.elapsed if self.elapsed else 0.0
+
+    def reject(self, line_no, reason):
+        self.rejected += 1
+        if len(self.rejects) < MAX_REJECTS_KEPT:
+            self.rejects.append((line_no, reason))
+
+    def summary(self) -> str:
+        return (f"{self.lines} commands in {self.elapsed:.2f}s ({self.throughput:,.0f}/s): "
+                f"{self.created} created, {self.updated} updated, {self.completed} completed, "
+                f"{self.deleted} deleted, {self.duplicates} duplicate, {self.unchanged} unchanged, "
+                f"{self.rejected} rejected, {self.similar} possible duplicates, {self.commits} commits")
+
+
+class _Ingestor:
+    """Applies parsed commands to a task list, tracking external ids"""
+
+    def __init__(self, tasks, stats):
+        self.tasks = tasks
+        self.stats = stats
+        self.by_external_id = {t.external_id: t for t in tasks if t.external_id}
+        self.by_id = {t.id: t for t in tasks}
+        self._positions = None  # task id -> list index, rebuilt lazily after deletes
+        self.created_ids = []
+
+    def _index_of(self, task):
+        if self._positions is None:
+            self._positions = {t.id: idx for idx, t in enumerate(self.tasks)}
+        return self._positions[task.id]
+
+    def _register(self, task):
+        """Index a task just appended to the list (None: nothing was appended)"""
+        if task is None:
+            return
+        if self._positions is not None:
+            self._positions[task.id] = len(self.tasks) - 1
+        self.by_id[task.id] = task
+
+    def _find(self, command):
+        if command.get("external_id") is not None:
+            return self.by_external_id.get(command["external_id"])
+        task_id = command.get("id")
+        if task_id is not None:
+            if isinstance(task_id, str) and task_id.strip().isdigit():
+                task_id = int(task_id)
+            if not isinstance(task_id, int) or isinstance(task_id, bool):
+                raise ValueError("id must be an integer")
+            return self.by_id.get(task_id)
+        raise ValueError("external_id or id is required")
+
+    def apply(self, command) -> bool:
+        """Apply one command, returning True if the task list changed"""
+        if not isinstance(command, dict):
+            raise ValueError("command must be a JSON object")
+        op = command.get("op")
+        if op not in OPERATIONS:
+            raise ValueError(f"op must be one of {', '.join(OPERATIONS)}")
+        external_id = command.get("external_id")
+        if external_id is not None and not isinstance(external_id, str):
+            raise ValueError("external_id must be a string")
+        fields = command.get("task") or {}
+        if not isinstance(fields, dict):
+            raise ValueError("task must be a JSON object")
+
+        if op == "create":
+            data = dict(fields)
+            data.pop("id", None)
+            if external_id is not None:
+                data["external_id"] = external_id
+            validate_task_dict(data)
+            if external_id is not None and external_id in self.by_external_id:
+                self.stats.duplicates += 1
+                return False
+            task = Task.from_dict(data)
+            add_task(self.tasks, task, save=False)
+            self._register(task)
+            if task.external_id:
+                self.by_external_id[task.external_id] = task
+            self.created_ids.append(task.id)
+            self.stats.created += 1
+            return True
+
+        task = self._find(command)
+        if op == "delete":
+            if task is None:
+                self.stats.unchanged += 1
+                return False
+            delete_task(self.tasks, self._index_of(task), save=False)
+            self._positions = None
+            del self.by_id[task.id]
+            self.by_external_id.pop(task.external_id, None)
+            self.stats.deleted += 1
+            return True
+
+        if task is None:
+            raise ValueError("no task with that id")
+
+        if op == "complete":
+            if task.status == "Done":
+                self.stats.unchanged += 1
+                return False
+            remarks = command.get("remarks")
+            if remarks is not None and not isinstance(remarks, str):
+                raise ValueError("remarks must be a string")
+            self._register(mark_task_done(self.tasks, self._index_of(task), remarks, save=False))
+            self.stats.completed += 1
+            return True
+
+        # update
+        merged = task.to_dict()
+        merged.update(fields)
+        merged["id"] = task.id
+        merged["external_id"] = task.external_id
+        validate_task_dict(merged)
+        if merged == task.to_dict():
+            self.stats.unchanged += 1
+            return False
+        status = merged["status"]
+        idx = self._index_of(task)
+        if status != task.status:
+            # Route status changes through the helpers the app and server use
+            merged["status"] = task.status
+            merged["completion_date"] = task.completion_date
+        new_task = Task.from_dict(merged)
+        edit_task(self.tasks, idx, new_task, save=False)
+        if status != task.status and status == "Done":
+            self._register(mark_task_done(self.tasks, idx, merged.get("remarks"), save=False))
+        elif status != task.status:
+            set_task_status(self.tasks, idx, status, save=False)
+        self.by_id[new_task.id] = new_task
+        if new_task.external_id:
+            self.by_external_id[new_task.external_id] = new_task
+        self.stats.updated += 1
+        return True
+
+
+def ingest_lines(lines, tasks, chunk_size=DEFAULT_CHUNK_SIZE, commit=save_tasks) -> IngestStats:
+    """Apply JSONL commands from an iterable of lines, committing once per chunk"""
+    stats = IngestStats()
+    ingestor = _Ingestor(tasks, stats)
+    started = time.perf_counter()
+    numbered = enumerate(lines, 1)
+
+    while True:
+        chunk = list(islice(numbered, chunk_size))
+        if not chunk:
+            break
+        changed = False
+        for line_no, line in chunk:
+            line = line.strip()
+            if not line:
+                continue
+            stats.lines += 1
+            try:
+                changed = ingestor.apply(json.loads(line)) or changed
+            except json.JSONDecodeError as e:
+                stats.reject(line_no, f"invalid JSON: {e.msg}")
+            except ValueError as e:
+                stats.reject(line_no, str(e))
+        if changed:
+            commit(tasks)
+            stats.commits += 1
+
+    _check_similar(ingestor)
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def _check_similar(ingestor):
+    """Count created tasks (still present) whose titles look like another open task"""
+    created = [ingestor.by_id[task_id] for task_id in ingestor.created_ids if task_id in ingestor.by_id]
+    if not created:
+        return
+    created_ids = set(ingestor.created_ids)
+    index = DuplicateIndex([t for t in ingestor.tasks if t.id not in created_ids])
+    found = index.check_batch(created)
+    ingestor.stats.similar = len(found)
+    ingestor.stats.similar_titles = found[:MAX_REJECTS_KEPT]
+
+
+def ingest_file(path, chunk_size=DEFAULT_CHUNK_SIZE) -> IngestStats:
+    """Ingest a JSONL file ("-" for stdin) into tasks.json"""
+    tasks = load_tasks()
+    if path == "-":
+        return ingest_lines(sys.stdin, tasks, chunk_size)
+    with open(path, "r", encoding="utf-8") as f:
+        return ingest_lines(f, tasks, chunk_size)
@@ -1,19 +1,33 @@
 # main.py - Task Manager Pro Entry Point
-import tkinter as tk
+import os
 
-from utils import setup_dpi_awareness, suppress_tk_warnings
-from app import LiteTodoApp
+import perf
 
 
 def main():
     """Application entry point"""
+    startup = perf.StartupTimer()
+
+    # Heavy modules are imported here so the startup timer covers them
+    import tkinter as tk
+    from utils import setup_dpi_awareness, suppress_tk_warnings
+    from app import LiteTodoApp
+    startup.mark("imports")
+
     # Initialize environment
     setup_dpi_awareness()
     suppress_tk_warnings()
-    
-    # Launch application
+
+    # Opt-in memory profiling: TASKMANAGER_MEMPROFILE=report.txt
+    memprofile_path = os.environ.get("TASKMANAGER_MEMPROFILE")
+    if memprofile_path:
+        import memprofile
+        memprofile.enable_for_app(memprofile_path, LiteTodoApp)
+
+    # Launch application; tasks are loaded after the window first paints
     root = tk.Tk()
-    app = LiteTodoApp(root)
+    startup.mark("tk")
+    app = LiteTodoApp(root, startup)
     root.mainloop()
 
 
@@ -0,0 +1,247 @@
+"""
+tracemalloc-based memory profiling for large task sets
+Snapshots allocations around load, filter, populate and report, attributes
+bytes to Task objects, tag lists, table row tuples and report strings, and
+writes a plain-text report with stable line order so two runs can be diffed.
+
+Usage:
+    python memprofile.py --size 100k --output mem_before.txt
+    python memprofile.py --size 100k --output mem_after.txt
+    diff mem_before.txt mem_after.txt
+
+    python memprofile.py --tasks-file tasks.json     # profile real data
+
+In the app, set TASKMANAGER_MEMPROFILE=report.txt to trace the same phases
+during a session; the report is written when the app exits.
+"""
+
+import argparse
+import atexit
+import functools
+import os
+import sys
+import tempfile
+import threading
+import tracemalloc
+
+TOP_SITES = 10
+MIN_SITE_BYTES = 4096  # Smaller sites are cache warm-up noise that differs run to run
+
+# Allocations by the profiler itself and by first-time imports are noise
+_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+]
+
+_lock = threading.Lock()  # In the app, the report phase runs on a worker thread
+_depth = 0     # Nesting level; only the outermost phase resets the peak
+_phases = {}  # name -> [calls, allocated bytes, peak bytes, {site: [bytes, blocks]}], in first-run order
+
+
+class phase:
+    """Context manager recording allocations made inside a block while tracing"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        global _depth
+        if tracemalloc.is_tracing():
+            self.before = tracemalloc.take_snapshot()
+            self.start_current, _ = tracemalloc.get_traced_memory()
+            with _lock:
+                if _depth == 0:
+                    tracemalloc.reset_peak()
+                _depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        global _depth
+        if hasattr(self, "before"):
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            diff = after.filter_traces(_FILTERS).compare_to(self.before.filter_traces(_FILTERS), "lineno")
+            with _lock:
+                _depth -= 1
+                entry = _phases.setdefault(self.name, [0, 0, 0, {}])
+                entry[0] += 1
+                entry[1] += current - self.start_current
+                entry[2] = max(entry[2], peak - self.start_current)
+                for stat in diff[:TOP_SITES]:
+                    if stat.size_diff >= MIN_SITE_BYTES:
+                        site = entry[3].setdefault(_site(stat.traceback[0]), [0, 0])
+                        site[0] += stat.size_diff
+                        site[1] += stat.count_diff
+            del self.before
+        return False
+
+
+def traced(name):
+    """Decorator running every call of a function inside phase(name)"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _site(frame):
+    return f"{os.path.basename(frame.filename)}:{frame.lineno}"
+
+
+# --------------------------
+# Attribution
+# --------------------------
+
+def _sizeof_str(value, seen):
+    if value is None or id(value) in seen:
+        return 0
+    seen.add(id(value))
+    return sys.getsizeof(value)
+
+
+def attribute(tasks=(), rows=(), report_text=None):
+    """Bytes held by each kind of object, as {category: (count, bytes)}"""
+    seen = set()
+    task_bytes = 0
+    field_bytes = 0
+    tag_list_bytes = 0
+    tag_count = 0
+    for task in tasks:
+        task_bytes += sys.getsizeof(task) + sys.getsizeof(task.__dict__)
+        for field in (task.title, task.deadline, task.priority, task.status,
+                      task.completion_date, task.remarks, task.external_id):
+            field_bytes += _sizeof_str(field, seen)
+        tag_list_bytes += sys.getsizeof(task.tags)
+        for tag in task.tags:
+            tag_list_bytes += _sizeof_str(tag, seen)
+            tag_count += 1
+
+    row_bytes = 0
+    for values, item_tags in rows:
+        row_bytes += sys.getsizeof(values) + sys.getsizeof(item_tags)
+        for value in values:
+            row_bytes += _sizeof_str(value, seen)
+
+    report_bytes = 0
+    report_count = 0
+    if report_text is not None:
+        chunks = [report_text] if isinstance(report_text, str) else report_text
+        for chunk in chunks:
+            report_bytes += _sizeof_str(chunk, seen)
+            report_count += 1
+
+    return {
+        "task_objects": (len(tasks), task_bytes),
+        "task_fields": (len(tasks), field_bytes),
+        "tag_lists": (tag_count, tag_list_bytes),
+        "row_tuples": (len(rows), row_bytes),
+        "report_strings": (report_count, report_bytes),
+    }
+
+
+# --------------------------
+# Report
+# --------------------------
+
+def _mb(value):
+    return f"{value / (1024 * 1024):10.2f} MB"
+
+
+def write_report(path, header=None, categories=None):
+    """Write the recorded phases (and optional attribution) as diffable text"""
+    with open(path, "w", encoding="utf-8") as f:
+        for key, value in (header or {}).items():
+            f.write(f"# {key}: {value}\n")
+        f.write("\n[phases]\n")
+        for name, (calls, allocated, peak, _) in _phases.items():
+            f.write(f"{name:<12} {calls:>6} calls  allocated {_mb(allocated)}   peak {_mb(peak)}\n")
+        if categories:
+            f.write("\n[objects]\n")
+            for name in sorted(categories):
+                count, size = categories[name]
+                f.write(f"{name:<16} {count:>10} objects {_mb(size)}\n")
+        for name, (_, _, _, sites) in _phases.items():
+            f.write(f"\n[top allocation sites: {name}]\n")
+            top = sorted(sites.items(), key=lambda item: (-item[1][0], item[0]))[:TOP_SITES]
+            for site, (size, count) in top:
+                f.write(f"{site:<32} {_mb(size)} {count:>10} blocks\n")
+
+
+def enable_for_app(path, app_class):
+    """Trace an app session's load / filter / populate / report and write the report at exit"""
+    from dialogs import ReportPopup
+    app_class.set_tasks = traced("load")(app_class.set_tasks)
+    app_class.filter_tasks = traced("filter")(app_class.filter_tasks)
+    # populate_tasks and generate_report only schedule the work: trace the
+    # row batches (Tk idle callbacks) and the report build (worker thread)
+    app_class._populate_batch = traced("populate")(app_class._populate_batch)
+    ReportPopup._build_report = staticmethod(traced("report")(ReportPopup._build_report))
+    tracemalloc.start()
+    atexit.register(lambda: write_report(path, {"source": "app session"}))
+
+
+# --------------------------
+# Headless profile
+# --------------------------
+
+def profile(tasks_file=None, size="10k", seed=42, search="review"):
+    """Run load / filter / populate / report under tracemalloc, returning the attribution"""
+    import task_manager
+    from task_manager import load_tasks, save_tasks, matches_filter
+    from rows import format_task_row
+    from report import group_report_tasks, format_report
+
+    with tempfile.TemporaryDirectory() as tmp:
+        saved_paths = (task_manager.TASKS_FILE, task_manager.BACKUP_FILE)
+        if tasks_file:
+            task_manager.TASKS_FILE = tasks_file
+        else:
+            from benchmark import SIZES, generate_tasks
+            task_manager.TASKS_FILE = os.path.join(tmp, "tasks.json")
+            save_tasks(generate_tasks(SIZES[size], seed))
+        task_manager.BACKUP_FILE = os.path.join(tmp, "tasks_backup.json")
+
+        tracemalloc.start()
+        try:
+            with phase("load"):
+                tasks = load_tasks()
+            with phase("filter"):
+                filtered = [t for t in tasks if matches_filter(t, search, "All")]
+                everything = [t for t in tasks if matches_filter(t, "", "All")]
+            with phase("populate"):
+                rows = [format_task_row(t) for t in everything]
+            with phase("report"):
+                report_text = format_report(*group_report_tasks(tasks), "", "")
+        finally:
+            tracemalloc.stop()
+            task_manager.TASKS_FILE, task_manager.BACKUP_FILE = saved_paths
+
+    del filtered
+    return attribute(tasks, rows, report_text)
+
+
+def main(argv=None):
+    from benchmark import SIZES
+    parser = argparse.ArgumentParser(description="Memory profile of load, filter, populate and report")
+    parser.add_argument("--size", default="10k", choices=list(SIZES), help="Synthetic task set size")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the synthetic task generator")
+    parser.add_argument("--tasks-file", help="Profile this tasks.json instead of synthetic data")
+    parser.add_argument("--output", default="memprofile.txt", help="Report file (default: memprofile.txt)")
+    args = parser.parse_args(argv)
+
+    categories = profile(args.tasks_file, args.size, args.seed)
+    header = {"source": args.tasks_file or f"synthetic {args.size} (seed {args.seed})",
+              "python": sys.version.split()[0]}
+    write_report(args.output, header, categories)
+    with open(args.output, encoding="utf-8") as f:
+        print(f.read(), end="")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+# perf.py - Lightweight timing instrumentation for hot paths
+#
+# Disabled by default: a @timed function then costs one flag check and a
+# span() is a shared no-op context manager. Enable it with TASKMANAGER_PERF=1
+# or by opening the performance panel (F12). Each operation keeps a
+# log-bucketed latency histogram (for p50/p95/p99) and recent spans are kept
+# in a ring buffer that can be exported as a Chrome trace (chrome://tracing).
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+MAX_SPANS = 20000       # Raw spans kept for trace export
+BUCKETS_PER_OCTAVE = 4  # Histogram resolution: ~19% per bucket
+
+_enabled = os.environ.get("TASKMANAGER_PERF", "") not in ("", "0")
+_lock = threading.Lock()
+_histograms = {}
+_spans = deque(maxlen=MAX_SPANS)
+_gauges = {}  # name -> callable returning a dict of counters (cache sizes, hit rates, ...)
+_origin = time.perf_counter()
+
+
+class _Histogram:
+    """Latency histogram with logarithmic microsecond buckets"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        us = seconds * 1e6
+        bucket = int(math.log2(us) * BUCKETS_PER_OCTAVE) if us > 1 else 0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples, in seconds"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min(2 ** ((bucket + 1) / BUCKETS_PER_OCTAVE) / 1e6, self.max)
+        return self.max
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = flag
+
+
+def is_enabled():
+    return _enabled
+
+
+def record(name, start, duration):
+    """Record a finished span (start from time.perf_counter, duration in seconds)"""
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = _Histogram()
+        histogram.add(duration)
+        _spans.append((name, start, duration, threading.get_ident()))
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, self.start, time.perf_counter() - self.start)
+        return False
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """Context manager timing a block: with perf.span("populate"): ..."""
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def timed(name=None):
+    """Decorator timing every call of a function under the given name"""
+    def decorator(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(label, start, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def stats():
+    """Per-operation summary rows: (name, count, p50, p95, p99, max) with times in ms"""
+    with _lock:
+        items = list(_histograms.items())
+    rows = []
+    for name, h in sorted(items):
+        rows.append((name, h.count, h.percentile(0.50) * 1000, h.percentile(0.95) * 1000,
+                     h.percentile(0.99) * 1000, h.max * 1000))
+    return rows
+
+
+def register_gauge(name, fn):
+    """Show the counters returned by fn() under name in the performance panel"""
+    _gauges[name] = fn
+
+
+def gauges():
+    """(name, counters) for every registered gauge, sorted by name"""
+    return [(name, fn()) for name, fn in sorted(_gauges.items())]
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _spans.clear()
+
+
+def export_chrome_trace(path):
+    """Write recorded spans in the Chrome trace event format"""
+    with _lock:
+        spans = list(_spans)
+    pid = os.getpid()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"traceEvents": [\n')
+        for i, (name, start, duration, tid) in enumerate(spans):
+            event = {"name": name, "ph": "X", "pid": pid, "tid": tid,
+                     "ts": round((start - _origin) * 1e6, 3), "dur": round(duration * 1e6, 3)}
+            f.write(("" if i == 0 else ",\n") + json.dumps(event))
+        f.write('\n], "displayTimeUnit": "ms"}\n')
+    return len(spans)
+
+
+class StartupTimer:
+    """Times consecutive startup phases (imports, window shell, task load, ...)
+
+    Phases are always recorded as "startup.<phase>" so they show in the
+    performance panel; the one-line summary is printed when perf is enabled.
+    """
+
+    def __init__(self):
+        self.start = self.last = time.perf_counter()
+        self.phases = []
+
+    def mark(self, name):
+        """End the current phase under the given name"""
+        now = time.perf_counter()
+        record(f"startup.{name}", self.last, now - self.last)
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def summary(self):
+        parts = [f"{name} {seconds * 1000:.1f} ms" for name, seconds in self.phases]
+        return f"Startup: {', '.join(parts)} (total {(self.last - self.start) * 1000:.1f} ms)"
+
+    def log(self):
+        if _enabled:
+            print(self.summary())
@@ -0,0 +1,127 @@
+# recurrence.py - Recurrence rules for repeating tasks and lazy expansion of their occurrences
+#
+# A recurring series is stored as one task row for its current occurrence,
+# carrying the rule and the occurrence number. The date of occurrence n is
+# computed directly from the rule's start date, so future occurrences are
+# never stored: they are expanded on demand for a date window, and the next
+# row is only created when the current one is completed.
+import calendar
+import re
+from datetime import date, timedelta
+
+FREQUENCIES = {"daily": "day", "weekly": "week", "monthly": "month"}
+UNITS = {unit: freq for freq, unit in FREQUENCIES.items()}
+
+_RULE_RE = re.compile(
+    r"^(?:(?P<freq>daily|weekly|monthly)|every\s+(?:(?P<interval>\d+)\s+)?(?P<unit>day|week|month)s?)"
+    r"(?:\s+until\s+(?P<until>\d{4}-\d{2}-\d{2})|\s+for\s+(?P<count>\d+)(?:\s+times)?)?$")
+
+
+def validate_rule(rule):
+    """Check a recurrence rule dict, raising ValueError on bad fields"""
+    if not isinstance(rule, dict):
+        raise ValueError("recurrence must be an object")
+    freq = rule.get("freq")
+    if not isinstance(freq, str) or freq not in FREQUENCIES:
+        raise ValueError(f"recurrence freq must be one of {', '.join(FREQUENCIES)}")
+    interval = rule.get("interval", 1)
+    if not isinstance(interval, int) or isinstance(interval, bool) or interval < 1:
+        raise ValueError("recurrence interval must be a positive integer")
+    for field in ("start", "until"):
+        value = rule.get(field)
+        if value is None and field == "until":
+            continue
+        try:
+            date.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"recurrence {field} must be YYYY-MM-DD")
+    count = rule.get("count")
+    if count is not None and (not isinstance(count, int) or isinstance(count, bool) or count < 1):
+        raise ValueError("recurrence count must be a positive integer")
+
+
+def parse_rule(text, start):
+    """Rule for text like "weekly", "every 2 weeks until 2026-12-31" or "monthly for 6" (None if blank)"""
+    text = " ".join(text.lower().split())
+    if text in ("", "never", "none"):
+        return None
+    match = _RULE_RE.match(text)
+    if not match:
+        raise ValueError(f"unrecognised repeat '{text}'")
+    if match["freq"]:
+        freq, interval = match["freq"], 1
+    else:
+        freq, interval = UNITS[match["unit"]], int(match["interval"] or 1)
+    rule = {"freq": freq, "interval": interval, "start": start.isoformat(),
+            "until": match["until"], "count": int(match["count"]) if match["count"] else None}
+    validate_rule(rule)
+    return rule
+
+
+def describe(rule, occurrence=1):
+    """Text for a rule that parse_rule reads back (a count is shown as what remains from occurrence)"""
+    unit = FREQUENCIES[rule["freq"]]
+    interval = rule.get("interval", 1)
+    text = rule["freq"] if interval == 1 else f"every {interval} {unit}s"
+    if rule.get("until"):
+        text += f" until {rule['until']}"
+    elif rule.get("count"):
+        text += f" for {max(rule['count'] - (occurrence or 1) + 1, 1)}"
+    return text
+
+
+def _add_months(day, months, anchor_day):
+    month = day.month - 1 + months
+    year = day.year + month // 12
+    month = month % 12 + 1
+    return date(year, month, min(anchor_day, calendar.monthrange(year, month)[1]))
+
+
+def occurrence_date(rule, n):
+    """Date of occurrence n (1-based), or None once the series has ended"""
+    if n < 1 or (rule.get("count") and n > rule["count"]):
+        return None
+    start = date.fromisoformat(rule["start"])
+    steps = (n - 1) * rule.get("interval", 1)
+    freq = rule["freq"]
+    if freq == "monthly":
+        day = _add_months(start, steps, start.day)
+    else:
+        day = start + timedelta(days=steps * (7 if freq == "weekly" else 1))
+    if rule.get("until") and day.isoformat() > rule["until"]:
+        return None
+    return day
+
+
+def first_on_or_after(rule, day):
+    """Smallest occurrence number whose date is on or after day (ignoring the end condition)"""
+    start = date.fromisoformat(rule["start"])
+    if day <= start:
+        return 1
+    interval = rule.get("interval", 1)
+    if rule["freq"] == "monthly":
+        months = (day.year - start.year) * 12 + day.month - start.month
+        n = months // interval + 1
+        if _add_months(start, (n - 1) * interval, start.day) < day:
+            n += 1
+        return n
+    days = (day - start).days
+    step = interval * (7 if rule["freq"] == "weekly" else 1)
+    return -(-days // step) + 1
+
+
+def next_occurrence_number(rule, occurrence, today):
+    """Occurrence to create after completing one: the next that isn't already past, or None"""
+    n = max(occurrence + 1, first_on_or_after(rule, today))
+    return n if occurrence_date(rule, n) is not None else None
+
+
+def iter_occurrences(rule, start, end, after=0):
+    """Yield (n, date) for occurrences after number `after` that fall within [start, end]"""
+    n = max(after + 1, first_on_or_after(rule, start))
+    while True:
+        day = occurrence_date(rule, n)
+        if day is None or day > end:
+            return
+        yield n, day
+        n += 1
@@ -0,0 +1,140 @@
+# reminders.py - Deadline and reminder-time notifications driven by a single after() timer
+#
+# Upcoming events (deadline morning, deadline missed, explicit reminder time)
+# sit in a min-heap keyed by time, and only the earliest one has a timer
+# armed. When it fires, due events are popped (O(log n) each) and the timer is
+# re-armed for the next one. Changing a task bumps its generation, so its old
+# events are dropped when they reach the top instead of being searched for.
+import heapq
+import time
+from datetime import date, datetime, time as dtime, timedelta
+
+DUE_TODAY_AT = dtime(9, 0)     # When the "due today" reminder fires on the deadline day
+MAX_TIMER_MS = 60 * 60 * 1000  # Re-check at least hourly (clock changes, suspend/resume)
+REMIND_FORMAT = "%Y-%m-%d %H:%M"
+
+
+class ReminderScheduler:
+    """Calls notify([(when, task, kind)]) on the Tk thread as reminders come due.
+
+    kind is "reminder" (the task's remind_at time), "due" (morning of the
+    deadline day) or "overdue" (the deadline has passed). Events already in
+    the past when a task is loaded or changed are not raised.
+    """
+
+    def __init__(self, root, notify):
+        self.root = root
+        self.notify = notify
+        self._timer = None
+        self._timer_at = None
+        self.rebuild(())
+
+    def rebuild(self, tasks):
+        """Schedule reminders for a whole task list (after load or refresh)"""
+        self._tasks = {}       # task id -> task
+        self._generation = {}  # task id -> generation its current events carry
+        self._live = {}        # task id -> number of its current events in the heap
+        self._dead = 0         # Heap entries left behind by changed or deleted tasks
+        self._seq = 0
+        self._heap = []
+        now = time.time()
+        for task in tasks:
+            if task.id is not None:
+                self._tasks[task.id] = task
+                self._heap.extend(self._events(task, now))
+        heapq.heapify(self._heap)
+        self._arm()
+
+    def _events(self, task, now):
+        """Heap entries (when, seq, task id, generation, kind) for a task's future reminders"""
+        generation = self._generation.setdefault(task.id, 0)
+        if task.status == "Done":
+            return []
+        times = []
+        if task.deadline:
+            try:
+                deadline = date.fromisoformat(task.deadline)
+            except ValueError:
+                deadline = None
+            if deadline is not None:
+                times.append((datetime.combine(deadline, DUE_TODAY_AT).timestamp(), "due"))
+                times.append((datetime.combine(deadline + timedelta(days=1), dtime.min).timestamp(), "overdue"))
+        if task.remind_at:
+            try:
+                times.append((datetime.strptime(task.remind_at, REMIND_FORMAT).timestamp(), "reminder"))
+            except ValueError:
+                pass
+        entries = []
+        for when, kind in times:
+            if when > now:
+                self._seq += 1
+                entries.append((when, self._seq, task.id, generation, kind))
+        self._live[task.id] = len(entries)
+        return entries
+
+    def _is_current(self, entry):
+        return entry[2] in self._tasks and self._generation.get(entry[2]) == entry[3]
+
+    def on_change(self, action, task, previous=None):
+        """Change listener for task_manager.add_change_listener"""
+        if task.id is None:
+            return
+        self._dead += self._live.pop(task.id, 0)
+        self._generation[task.id] = self._generation.get(task.id, 0) + 1
+        if action == "delete":
+            self._tasks.pop(task.id, None)
+        else:
+            self._tasks[task.id] = task
+            for entry in self._events(task, time.time()):
+                heapq.heappush(self._heap, entry)
+        if self._dead > len(self._heap) // 2 + 32:
+            self._heap = [entry for entry in self._heap if self._is_current(entry)]
+            heapq.heapify(self._heap)
+            self._dead = 0
+        self._arm()
+
+    def _arm(self):
+        """Point the single timer at the earliest current event"""
+        heap = self._heap
+        while heap and not self._is_current(heap[0]):
+            heapq.heappop(heap)
+            self._dead -= 1
+        when = heap[0][0] if heap else None
+        if when == self._timer_at:
+            return
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+            self._timer = None
+        self._timer_at = when
+        if when is not None:
+            delay_ms = int(max(0.0, when - time.time()) * 1000)
+            self._timer = self.root.after(min(delay_ms, MAX_TIMER_MS), self._fire)
+
+    def _fire(self):
+        self._timer = None
+        self._timer_at = None
+        now = time.time()
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if self._is_current(entry):
+                self._live[entry[2]] -= 1
+                due.append((entry[0], self._tasks[entry[2]], entry[4]))
+            else:
+                self._dead -= 1
+        self._arm()
+        if due:
+            self.notify(due)
+
+    def upcoming(self, limit=10):
+        """The next few (when, task, kind) events, soonest first"""
+        current = (entry for entry in heapq.nsmallest(limit + self._dead, self._heap)
+                   if self._is_current(entry))
+        return [(entry[0], self._tasks[entry[2]], entry[4]) for entry in current][:limit]
+
+    def stop(self):
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+            self._timer = None
+            self._timer_at = None
@@ -0,0 +1,300 @@
+# renderers.py - Streaming standup report renderers (text, Markdown, HTML, JSON, CSV)
+#
+# Every renderer works on the same report arguments produced for ReportPopup:
+# (done_tasks, in_progress_tasks, pending_tasks, start_date, end_date[, extras])
+# and yields the document in small chunks, so exports are written
+# incrementally. extras (report.report_extras) holds the sections after the
+# task lists: deadlines at risk, recurring series, time tracked and metrics.
+import csv
+import html
+import json
+import os
+import re
+
+from report import TIME_MAX_ROWS, days_left_text, iter_report_args_lines
+from timelog import format_duration
+
+SECTIONS = (
+    ("done", "Done"),
+    ("in_progress", "In Progress"),
+    ("pending", "Pending"),
+)
+
+
+def _period(start_date, end_date):
+    if start_date or end_date:
+        return f"{start_date or 'Beginning'} to {end_date or 'Now'}"
+    return "All Time"
+
+
+def _sections(report_args):
+    done_tasks, in_progress_tasks, pending_tasks = report_args[:3]
+    return zip(SECTIONS, (done_tasks, in_progress_tasks, pending_tasks))
+
+
+def _extras(report_args):
+    return report_args[5] if len(report_args) > 5 else None
+
+
+def _extra_sections(extras):
+    """(heading, [list items], [paragraphs]) as plain text for each extra section with content"""
+    if not extras:
+        return
+    if extras["at_risk"]:
+        yield "Deadlines at Risk", [
+            f"{row['title']} ({days_left_text(row['days_left'])}) - critical path: {' → '.join(row['chain'])}"
+            for row in extras["at_risk"]], []
+    if extras["recurring"]:
+        items = []
+        for row in extras["recurring"]:
+            item = f"{row['title']} ({row['rule']})"
+            if row["done"]:
+                item += f" - {row['done']} done"
+            if not row["open"]:
+                item += ", no open occurrence"
+            elif row["due"]:
+                item += f" - due {', '.join(row['due'])}{' ...' if row['more'] else ''}"
+            items.append(item)
+        yield "Recurring", items, []
+    summary = extras["time_tracked"]
+    if summary:
+        ranked = summary["tasks"]
+        items = [f"{row['title']} - {format_duration(row['seconds'])}" for row in ranked[:TIME_MAX_ROWS]]
+        if len(ranked) > TIME_MAX_ROWS:
+            rest = sum(row["seconds"] for row in ranked[TIME_MAX_ROWS:])
+            items.append(f"... and {len(ranked) - TIME_MAX_ROWS} more tasks - {format_duration(rest)}")
+        notes = []
+        if summary["tags"]:
+            notes.append("By tag: " + ", ".join(f"{row['tag']} {format_duration(row['seconds'])}"
+                                                for row in summary["tags"][:TIME_MAX_ROWS]))
+        if summary["days"]:
+            notes.append("By day: " + ", ".join(f"{row['day']} {format_duration(row['seconds'])}"
+                                                for row in summary["days"]))
+        yield f"Time Tracked ({format_duration(summary['seconds'])})", items, notes
+    metrics = extras["metrics"]
+    if metrics:
+        cycle = metrics["cycle_time_days"]
+        if cycle["count"]:
+            notes = [f"Cycle time (In Progress → Done): {cycle['count']} tasks, median {cycle['p50']} days, "
+                     f"85th percentile {cycle['p85']} days, max {cycle['max']} days"]
+        else:
+            notes = ["Cycle time (In Progress → Done): no tasks finished in this period"]
+        notes.append("Age of open work: " + ", ".join(f"{row['bucket']} {row['open']}" for row in metrics["aging"]))
+        if metrics["tags"]:
+            notes.append("By tag: " + ", ".join(f"{row['tag']} {row['open']} open / {row['done']} done"
+                                                for row in metrics["tags"]))
+        yield (f"Flow Metrics ({metrics['start']} to {metrics['end']})",
+               [f"Week of {row['week']}: {row['done']} done" for row in metrics["throughput"]], notes)
+
+
+class ReportRenderer:
+    """Base class for report formats"""
+
+    name = ""
+    extension = ""
+    newline = None  # Passed to open(); CSV needs ""
+
+    def iter_chunks(self, report_args):
+        """Yield the rendered document piece by piece"""
+        raise NotImplementedError
+
+    def write(self, f, report_args):
+        f.writelines(self.iter_chunks(report_args))
+
+    def export(self, path, report_args):
+        with open(path, "w", encoding="utf-8", newline=self.newline) as f:
+            self.write(f, report_args)
+
+
+class TextRenderer(ReportRenderer):
+    name = "Text"
+    extension = ".txt"
+
+    def iter_chunks(self, report_args):
+        return iter_report_args_lines(report_args)
+
+
+class MarkdownRenderer(ReportRenderer):
+    name = "Markdown"
+    extension = ".md"
+
+    # Characters with a meaning inside a line: emphasis, code, links and images
+    # (a "(" or "!" only counts next to a bracket), tables, HTML, headings, strikethrough
+    _SPECIAL = re.compile(r"([\\`*_\[\]#|<>~])")
+
+    @classmethod
+    def _escape(cls, text):
+        return cls._SPECIAL.sub(r"\\\1", " ".join(text.splitlines()))
+
+    @staticmethod
+    def _code(text):
+        return f"`` {text} ``" if "`" in text else f"`{text}`"
+
+    def iter_chunks(self, report_args):
+        yield "# Standup Report\n\n"
+        yield f"**Period:** {_period(*report_args[3:5])}\n"
+        for (key, heading), tasks in _sections(report_args):
+            yield f"\n## {heading}\n\n"
+            if not tasks:
+                yield "_None_\n"
+            for task in tasks:
+                line = f"- {self._escape(task.title)}"
+                if key == "done" and task.completion_date:
+                    line += f" (completed {task.completion_date})"
+                elif key != "done" and task.deadline:
+                    line += f" (deadline {task.deadline})"
+                if key != "done" and task.priority != "Medium":
+                    line += f" **{task.priority}**"
+                if task.tags:
+                    line += " " + " ".join(self._code(tag) for tag in task.tags)
+                yield line + "\n"
+                if key == "done" and task.remarks:
+                    yield f"  - {self._escape(task.remarks)}\n"
+        for heading, items, notes in _extra_sections(_extras(report_args)):
+            yield f"\n## {self._escape(heading)}\n\n"
+            for item in items:
+                yield f"- {self._escape(item)}\n"
+            for note in notes:
+                yield f"\n{self._escape(note)}\n"
+
+
+class HTMLRenderer(ReportRenderer):
+    name = "HTML"
+    extension = ".html"
+
+    def iter_chunks(self, report_args):
+        esc = html.escape
+        yield ("<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+               "<title>Standup Report</title>\n</head>\n<body>\n")
+        yield "<h1>Standup Report</h1>\n"
+        yield f"<p><strong>Period:</strong> {esc(_period(*report_args[3:5]))}</p>\n"
+        for (key, heading), tasks in _sections(report_args):
+            yield f"<h2>{heading}</h2>\n"
+            if not tasks:
+                yield "<p><em>None</em></p>\n"
+                continue
+            yield "<ul>\n"
+            for task in tasks:
+                item = f"<li>{esc(task.title)}"
+                if key == "done" and task.completion_date:
+                    item += f" <small>(completed {esc(task.completion_date)})</small>"
+                elif key != "done" and task.deadline:
+                    item += f" <small>(deadline {esc(task.deadline)})</small>"
+                if key != "done" and task.priority != "Medium":
+                    item += f" <strong>{esc(task.priority)}</strong>"
+                if task.tags:
+                    item += " " + " ".join(f"<code>{esc(tag)}</code>" for tag in task.tags)
+                if key == "done" and task.remarks:
+                    item += f"<br><em>{esc(task.remarks)}</em>"
+                yield item + "</li>\n"
+            yield "</ul>\n"
+        for heading, items, notes in _extra_sections(_extras(report_args)):
+            yield f"<h2>{esc(heading)}</h2>\n"
+            if items:
+                yield "<ul>\n" + "".join(f"<li>{esc(item)}</li>\n" for item in items) + "</ul>\n"
+            for note in notes:
+                yield f"<p>{esc(note)}</p>\n"
+        yield "</body>\n</html>\n"
+
+
+class JSONRenderer(ReportRenderer):
+    name = "JSON"
+    extension = ".json"
+
+    def iter_chunks(self, report_args):
+        start_date, end_date = report_args[3:5]
+        yield "{"
+        yield f"\"start\": {json.dumps(start_date or None)}, \"end\": {json.dumps(end_date or None)}"
+        for (key, _), tasks in _sections(report_args):
+            yield f", {json.dumps(key)}: ["
+            for i, task in enumerate(tasks):
+                yield ("\n  " if i == 0 else ",\n  ") + json.dumps(task.to_dict(), ensure_ascii=False)
+            yield "\n]" if tasks else "]"
+        extras = _extras(report_args)
+        for key, value in (extras or {}).items():
+            yield f",\n{json.dumps(key)}: {json.dumps(value, ensure_ascii=False)}"
+        yield "}\n"
+
+
+class _LineBuffer:
+    """File-like sink that hands each csv row back to the generator"""
+
+    def __init__(self):
+        self.value = ""
+
+    def write(self, text):
+        self.value = text
+
+
+class CSVRenderer(ReportRenderer):
+    name = "CSV"
+    extension = ".csv"
+    newline = ""
+
+    COLUMNS = ("section", "title", "status", "priority", "deadline", "completion_date", "tags", "remarks",
+               "value")
+
+    def iter_chunks(self, report_args):
+        buffer = _LineBuffer()
+        writer = csv.writer(buffer)
+        writer.writerow(self.COLUMNS)
+        yield buffer.value
+        for (key, _), tasks in _sections(report_args):
+            for task in tasks:
+                writer.writerow((key, task.title, task.status, task.priority, task.deadline or "",
+                                 task.completion_date or "", ";".join(task.tags), task.remarks or "", ""))
+                yield buffer.value
+        for section, title, deadline, value in self._extra_rows(_extras(report_args)):
+            writer.writerow((section, title, "", "", deadline or "", "", "", "", "" if value is None else value))
+            yield buffer.value
+
+    @staticmethod
+    def _extra_rows(extras):
+        """(section, title, deadline, value) rows for the extra sections, one fact per row"""
+        if not extras:
+            return
+        for row in extras["at_risk"]:
+            yield "at_risk", row["title"], row["deadline"], " → ".join(row["chain"])
+        for row in extras["recurring"]:
+            yield "recurring", row["title"], row["due"][0] if row["due"] else None, f"{row['rule']}; {row['done']} done"
+        summary = extras["time_tracked"]
+        if summary:
+            for row in summary["tasks"]:
+                yield "time_tracked", row["title"], None, row["seconds"]
+            for row in summary["tags"]:
+                yield "time_tracked:tag", row["tag"], None, row["seconds"]
+            for row in summary["days"]:
+                yield "time_tracked:day", row["day"], None, row["seconds"]
+        metrics = extras["metrics"]
+        if metrics:
+            # Same rows as analytics.export_metrics(fmt="csv")
+            for row in metrics["throughput"]:
+                yield "metrics:throughput", row["week"], None, row["done"]
+            for name, value in metrics["cycle_time_days"].items():
+                yield "metrics:cycle_time_days", name, None, value
+            for row in metrics["aging"]:
+                yield "metrics:aging", row["bucket"], None, row["open"]
+            for row in metrics["tags"]:
+                for name in ("open", "done", "cycle_p50_days"):
+                    yield f"metrics:tag:{row['tag']}", name, None, row[name]
+
+
+RENDERERS = [TextRenderer(), MarkdownRenderer(), HTMLRenderer(), JSONRenderer(), CSVRenderer()]
+
+
+def renderer_for_path(path):
+    """Pick a renderer from the file extension, defaulting to plain text"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".htm":
+        ext = ".html"
+    if ext == ".markdown":
+        ext = ".md"
+    for renderer in RENDERERS:
+        if renderer.extension == ext:
+            return renderer
+    return RENDERERS[0]
+
+
+def export_filetypes():
+    """filedialog filetypes list covering every renderer"""
+    return [(f"{r.name} files", f"*{r.extension}") for r in RENDERERS] + [("All files", "*.*")]
@@ -0,0 +1,417 @@
+# report.py - Standup report grouping and formatting (no Tk dependency)
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from itertools import islice
+
+from indexes import DependencyIndex
+from recurrence import describe, iter_occurrences
+from timelog import format_duration
+
+RECURRING_LOOKAHEAD_DAYS = 14  # Upcoming occurrences listed when the report range is open-ended
+RECURRING_MAX_DATES = 8        # Occurrence dates listed per series
+TIME_MAX_ROWS = 10             # Tasks and tags listed in the time tracked section
+
+
+def parse_report_date(date_str):
+    """Parse an optional YYYY-MM-DD string, returning None when empty"""
+    date_str = (date_str or "").strip()
+    if not date_str:
+        return None
+    return datetime.strptime(date_str, "%Y-%m-%d").date()
+
+
+def group_report_tasks(tasks, start_date=None, end_date=None, completion_index=None):
+    """Split tasks into (done, in_progress, pending) for the given completion date range.
+
+    With a CompletionIndex the done section comes from a range query (oldest
+    first) instead of parsing every completion date.
+    """
+    if completion_index is not None:
+        return (completion_index.range(start_date, end_date),) + split_open_tasks(tasks)
+
+    done_tasks = []
+    in_progress_tasks = []
+    pending_tasks = []
+
+    for task in tasks:
+        if task.status == "Done":
+            if task.completion_date:
+                try:
+                    comp_date = datetime.strptime(task.completion_date, "%Y-%m-%d").date()
+                    if (not start_date or comp_date >= start_date) and (not end_date or comp_date <= end_date):
+                        done_tasks.append(task)
+                except ValueError:
+                    pass
+            elif not start_date and not end_date:
+                done_tasks.append(task)
+        elif task.status == "In Progress":
+            in_progress_tasks.append(task)
+        else:
+            pending_tasks.append(task)
+
+    return done_tasks, in_progress_tasks, pending_tasks
+
+
+def split_open_tasks(tasks):
+    """Return (in_progress, pending) in list order"""
+    in_progress_tasks = []
+    pending_tasks = []
+    for task in tasks:
+        status = task.status
+        if status == "In Progress":
+            in_progress_tasks.append(task)
+        elif status != "Done":
+            pending_tasks.append(task)
+    return in_progress_tasks, pending_tasks
+
+
+def apply_history(groups, tasks, history, start_date=None, end_date=None):
+    """Rewrite (done, in_progress, pending) as the board stood at the end of a past range.
+
+    Open sections come from the status history replayed to end_date, and
+    tasks completed in the range but reopened since are added to done.
+    Ranges ending today or later (or without a history) are returned as is.
+    """
+    if history is None or end_date is None or end_date >= date.today():
+        return groups
+    done_tasks = list(groups[0])
+    board = history.board_at(end_date)
+    completed = history.completed_between(start_date, end_date)
+    listed = {id(task) for task in done_tasks}
+    in_progress_tasks = []
+    pending_tasks = []
+    for task in tasks:
+        status = board.get(task.id)
+        if status == "In Progress":
+            in_progress_tasks.append(task)
+        elif status == "Pending":
+            pending_tasks.append(task)
+        if task.id in completed and id(task) not in listed:
+            done_tasks.append(task)
+    return done_tasks, in_progress_tasks, pending_tasks
+
+
+def _open_task_line(i, task):
+    line = f"{i}. {task.title}"
+    if task.deadline:
+        line += f" (deadline: {task.deadline})"
+    if task.priority != "Medium":
+        line += f" [Priority: {task.priority}]"
+    if task.tags:
+        line += f" [{', '.join(task.tags)}]"
+    return line + "\n"
+
+
+def iter_report_lines(done_tasks, in_progress_tasks, pending_tasks, start_date, end_date):
+    """Yield the plain-text standup report one line at a time"""
+    yield "═" * 60 + "\n"
+    yield "STANDUP REPORT\n"
+    if start_date or end_date:
+        yield f"Period: {start_date or 'Beginning'} to {end_date or 'Now'}\n"
+    else:
+        yield "Period: All Time\n"
+    yield "═" * 60 + "\n"
+    yield "\n"
+
+    yield "✅ DONE:\n"
+    yield "─" * 60 + "\n"
+    if done_tasks:
+        for i, task in enumerate(done_tasks, 1):
+            line = f"{i}. {task.title}"
+            if task.completion_date:
+                line += f" (completed: {task.completion_date})"
+            if task.tags:
+                line += f" [{', '.join(task.tags)}]"
+            yield line + "\n"
+            if task.remarks:
+                yield f"   └─ Remarks: {task.remarks}\n"
+    else:
+        yield "No completed tasks\n"
+
+    yield "\n"
+    yield "🔄 IN PROGRESS:\n"
+    yield "─" * 60 + "\n"
+    if in_progress_tasks:
+        for i, task in enumerate(in_progress_tasks, 1):
+            yield _open_task_line(i, task)
+    else:
+        yield "No tasks in progress\n"
+
+    yield "\n"
+    yield "☐ PENDING:\n"
+    yield "─" * 60 + "\n"
+    if pending_tasks:
+        for i, task in enumerate(pending_tasks, 1):
+            yield _open_task_line(i, task)
+    else:
+        yield "No pending tasks\n"
+
+
+def dependency_risk_rows(risks, tasks):
+    """DependencyIndex.schedule_risks() results as JSON-ready rows, chains given as titles"""
+    titles = {task.id: task.title for task in tasks}
+    return [{"id": task.id, "title": task.title, "deadline": task.deadline, "days_left": days_left,
+             "chain": [titles.get(task_id, f"#{task_id}") for task_id in chain]}
+            for task, chain, days_left in risks]
+
+
+def days_left_text(days_left):
+    return f"due in {days_left} days" if days_left >= 0 else f"{-days_left} days overdue"
+
+
+def _dependency_risk_lines(rows):
+    if not rows:
+        return
+    yield "\n"
+    yield "⛓ DEADLINES AT RISK (critical path longer than the days left):\n"
+    yield "─" * 60 + "\n"
+    for i, row in enumerate(rows, 1):
+        when = days_left_text(row["days_left"])
+        yield f"{i}. {row['title']} ({when}, {len(row['chain'])} tasks on the critical path)\n"
+        yield f"   └─ {' → '.join(row['chain'])}\n"
+
+
+def iter_dependency_risk_lines(risks, tasks):
+    """Yield a report section for DependencyIndex.schedule_risks() results (nothing if empty)"""
+    return _dependency_risk_lines(dependency_risk_rows(risks, tasks))
+
+
+def recurring_rows(done_tasks, tasks, start_date=None, end_date=None):
+    """JSON-ready rows for the recurring section: one per series, open ones first.
+
+    Each series shows how many occurrences were done in the report range and
+    its open occurrences from the range start (or today) to its end (or two
+    weeks ahead), expanded from the rule rather than read from stored rows.
+    Only RECURRING_MAX_DATES dates are listed; "more" says whether there are others.
+    """
+    today = date.today()
+    lo = start_date or today
+    hi = end_date if end_date and end_date >= lo else max(lo, today) + timedelta(days=RECURRING_LOOKAHEAD_DAYS)
+    done = {}  # series id -> [latest done occurrence, number done in range]
+    for task in done_tasks:
+        if task.recurrence:
+            entry = done.setdefault(task.series_id or task.id, [task, 0])
+            if (task.occurrence or 1) >= (entry[0].occurrence or 1):
+                entry[0] = task
+            entry[1] += 1
+    rows = []
+    for task in tasks:
+        if not task.recurrence or task.status == "Done":
+            continue
+        dates = []
+        if task.deadline and lo.isoformat() <= task.deadline <= hi.isoformat():
+            dates.append(task.deadline)
+        upcoming = iter_occurrences(task.recurrence, lo, hi, after=task.occurrence or 1)
+        dates.extend(day.isoformat() for _, day in islice(upcoming, RECURRING_MAX_DATES + 1))
+        rows.append({"title": task.title, "rule": describe(task.recurrence, task.occurrence),
+                     "done": done.pop(task.series_id or task.id, (None, 0))[1], "open": True,
+                     "due": dates[:RECURRING_MAX_DATES], "more": len(dates) > RECURRING_MAX_DATES})
+    for task, count in done.values():
+        rows.append({"title": task.title, "rule": describe(task.recurrence), "done": count, "open": False,
+                     "due": [], "more": False})
+    return rows
+
+
+def _recurring_lines(rows):
+    if not rows:
+        return
+    yield "\n"
+    yield "🔁 RECURRING:\n"
+    yield "─" * 60 + "\n"
+    for i, row in enumerate(rows, 1):
+        if not row["open"]:
+            yield f"{i}. {row['title']} ({row['rule']}) - {row['done']} done, no open occurrence\n"
+            continue
+        line = f"{i}. {row['title']} ({row['rule']})"
+        if row["done"]:
+            line += f" - {row['done']} done"
+        yield line + "\n"
+        if row["due"]:
+            yield f"   └─ Due: {', '.join(row['due'])}{' ...' if row['more'] else ''}\n"
+
+
+def time_summary(totals, tasks):
+    """TimeLog.totals() results as a JSON-ready dict, largest first (None if no time was tracked)"""
+    by_task, by_tag, by_day = totals
+    total = sum(by_task.values())
+    if not total:
+        return None
+    titles = {task.id: task.title for task in tasks}
+    return {
+        "seconds": total,
+        "tasks": [{"id": task_id, "title": titles.get(task_id, f"#{task_id} (deleted)"), "seconds": seconds}
+                  for task_id, seconds in sorted(by_task.items(), key=lambda item: -item[1])],
+        "tags": [{"tag": tag, "seconds": seconds}
+                 for tag, seconds in sorted(by_tag.items(), key=lambda item: (-item[1], item[0]))],
+        "days": [{"day": day, "seconds": seconds} for day, seconds in sorted(by_day.items()) if seconds],
+    }
+
+
+def _time_lines(summary):
+    if not summary:
+        return
+    yield "\n"
+    yield f"⏱ TIME TRACKED ({format_duration(summary['seconds'])}):\n"
+    yield "─" * 60 + "\n"
+    ranked = summary["tasks"]
+    for i, row in enumerate(ranked[:TIME_MAX_ROWS], 1):
+        yield f"{i}. {row['title']} - {format_duration(row['seconds'])}\n"
+    if len(ranked) > TIME_MAX_ROWS:
+        rest = sum(row["seconds"] for row in ranked[TIME_MAX_ROWS:])
+        yield f"   ... and {len(ranked) - TIME_MAX_ROWS} more tasks - {format_duration(rest)}\n"
+    tags = summary["tags"][:TIME_MAX_ROWS]
+    if tags:
+        yield "   └─ By tag: " + ", ".join(f"{row['tag']} {format_duration(row['seconds'])}"
+                                          for row in tags) + "\n"
+    if summary["days"]:
+        yield "   └─ By day: " + ", ".join(f"{row['day']} {format_duration(row['seconds'])}"
+                                          for row in summary["days"]) + "\n"
+
+
+def iter_time_lines(totals, tasks):
+    """Yield a report section for TimeLog.totals() results (nothing if no time was tracked)"""
+    return _time_lines(time_summary(totals, tasks))
+
+
+def report_extras(tasks, done_tasks, start_date=None, end_date=None, time_totals=None, metrics=None):
+    """The sections after the task lists, as JSON-ready data every renderer can use.
+
+    Passed as an optional sixth report argument; empty sections are
+    empty lists or None.
+    """
+    return {
+        "at_risk": dependency_risk_rows(DependencyIndex(tasks).schedule_risks(), tasks),
+        "recurring": recurring_rows(done_tasks, tasks, start_date, end_date),
+        "time_tracked": time_summary(time_totals, tasks) if time_totals is not None else None,
+        "metrics": metrics,
+    }
+
+
+def iter_extra_lines(extras):
+    """Yield the plain-text sections for report_extras() data"""
+    yield from _dependency_risk_lines(extras["at_risk"])
+    yield from _recurring_lines(extras["recurring"])
+    yield from _time_lines(extras["time_tracked"])
+    if extras["metrics"]:
+        from analytics import iter_metrics_lines  # NumPy is slow to import
+        yield from iter_metrics_lines(extras["metrics"])
+
+
+def iter_report_args_lines(report_args):
+    """Yield the plain-text report for report arguments, with the extra sections if given"""
+    yield from iter_report_lines(*report_args[:5])
+    if len(report_args) > 5:
+        yield from iter_extra_lines(report_args[5])
+
+
+def format_report(done_tasks, in_progress_tasks, pending_tasks, start_date, end_date):
+    """Format the grouped tasks as the plain-text standup report"""
+    return "".join(iter_report_lines(done_tasks, in_progress_tasks, pending_tasks, start_date, end_date))
+
+
+def report_size(report_args):
+    """Tasks listed by a report, the measure ReportCache budgets by"""
+    return sum(len(group) for group in report_args[:3])
+
+
+class ReportCache:
+    """Grouped reports (report arguments) keyed by date range, kept until a change can affect them.
+
+    Only the grouping is kept: lines are formatted from it as they are shown
+    or exported, and the reports held list at most max_tasks tasks in total
+    (least recently used reports go first). Keys are (start, end) YYYY-MM-DD
+    strings ("" for open-ended). Every report lists all open tasks, so a
+    change involving an open task drops everything; a change to a done task
+    only drops ranges containing its completion date. Builds in flight are
+    tracked too, so a result computed from data that changed meanwhile is
+    never stored. Reports also depend on today's date (overdue, upcoming
+    occurrences), so everything is dropped at midnight.
+    """
+
+    def __init__(self, max_tasks=200000):
+        self.max_tasks = max_tasks
+        self._entries = OrderedDict()  # key -> report_args
+        self._size = 0                 # report_size() summed over the entries
+        self._pending = {}             # key -> token of the build in flight
+        self._tokens = 0
+        self._day = date.today()
+        self.hits = 0
+        self.misses = 0
+
+    def check_day(self):
+        """Drop every report (and build in flight) if the date changed since they were built"""
+        today = date.today()
+        if today != self._day:
+            self._day = today
+            self.clear()
+
+    def get(self, key):
+        self.check_day()
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def begin(self, key):
+        """Start tracking a build for key; pass the token back to put()"""
+        self.check_day()
+        self._tokens += 1
+        self._pending[key] = self._tokens
+        return self._tokens
+
+    def put(self, key, token, report_args):
+        """Store a finished build unless it was invalidated, superseded or too big to keep"""
+        self.check_day()
+        if self._pending.get(key) != token:
+            return False
+        del self._pending[key]
+        self._discard(key)
+        size = report_size(report_args)
+        if size > self.max_tasks:
+            return False
+        self._entries[key] = report_args
+        self._size += size
+        while self._size > self.max_tasks:
+            self._discard(next(iter(self._entries)))
+        return True
+
+    def _discard(self, key):
+        report_args = self._entries.pop(key, None)
+        if report_args is not None:
+            self._size -= report_size(report_args)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        return self._size
+
+    def clear(self):
+        self._entries.clear()
+        self._pending.clear()
+        self._size = 0
+
+    @staticmethod
+    def _affects(key, task):
+        if task.status != "Done":
+            return True
+        start, end = key
+        if not task.completion_date:
+            return not start and not end
+        return (not start or task.completion_date >= start) and (not end or task.completion_date <= end)
+
+    def on_change(self, action, task, previous=None):
+        """Change listener for task_manager.add_change_listener"""
+        if action == "status":
+            # The task moved into or out of the open sections every report lists
+            self.clear()
+            return
+        for store, drop in ((self._entries, self._discard), (self._pending, self._pending.pop)):
+            stale = [key for key in store
+                     if self._affects(key, task) or (previous is not None and self._affects(key, previous))]
+            for key in stale:
+                drop(key)
@@ -0,0 +1,92 @@
+# rows.py - Display formatting for task table rows (no Tk dependency)
+from collections import OrderedDict
+from datetime import date
+
+PRIORITY_ICONS = {"High": "🔴 High", "Medium": "🟡 Medium", "Low": "🟢 Low"}
+STATUS_ICONS = {"Done": "✅", "In Progress": "🔄"}  # Anything else shows as Pending (⬜)
+
+
+def format_task_row(task):
+    """Return the Treeview (values, tags) for a task"""
+    tags_str = ", ".join(task.tags) if task.tags else "—"
+    priority_display = PRIORITY_ICONS.get(task.priority, task.priority)
+    deadline_display = task.deadline if task.deadline else "—"
+    status_icon = STATUS_ICONS.get(task.status, "⬜")
+    title = task.title
+    if task.recurrence and task.status != "Done":
+        title += "   🔁"
+    
+    values = (
+        status_icon,
+        priority_display,
+        title,
+        deadline_display,
+        tags_str
+    )
+    
+    item_tags = []
+    if task.is_overdue():
+        item_tags.append("overdue")
+    elif task.status == "Done":
+        item_tags.append("done")
+    elif task.status == "In Progress":
+        item_tags.append("in_progress")
+    
+    return values, item_tags
+
+
+class RowCache:
+    """Formatted rows per task, reused across repaints until the task changes.
+
+    Entries are keyed by id(task) and hold the task itself, so an id cannot be
+    reused while its entry exists. Mutations arrive through the task_manager
+    change listener; the overdue tag depends on today's date, so everything is
+    dropped when the day rolls over. Least recently used rows are evicted once
+    max_entries is reached.
+    """
+
+    def __init__(self, max_entries=50000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # id(task) -> (task, values, item_tags)
+        self._day = date.today()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def check_day(self):
+        """Drop every row if the date changed since they were formatted (call once per repaint)"""
+        today = date.today()
+        if today != self._day:
+            self._day = today
+            self._entries.clear()
+
+    def row(self, task):
+        """Cached format_task_row(task)"""
+        entry = self._entries.get(id(task))
+        if entry is not None and entry[0] is task:
+            self.hits += 1
+            self._entries.move_to_end(id(task))
+            return entry[1], entry[2]
+        self.misses += 1
+        values, item_tags = format_task_row(task)
+        self._entries[id(task)] = (task, values, item_tags)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return values, item_tags
+
+    def clear(self):
+        self._entries.clear()
+
+    def on_change(self, action, task, previous=None):
+        """Change listener for task_manager.add_change_listener"""
+        self._entries.pop(id(task), None)
+        if previous is not None:
+            self._entries.pop(id(previous), None)
+
+    def stats(self):
+        return {"rows": len(self._entries), "max": self.max_entries, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
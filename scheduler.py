@@ -0,0 +1,141 @@
+# scheduler.py - "Next up" ranking of open tasks, kept in a heap and updated per change
+#
+# Every open task has an urgency score (deadline, priority, age, In Progress,
+# effort). Scores live in a binary heap; a change pushes a fresh entry and
+# marks the old one dead instead of searching for it. The top k are read
+# without popping by walking the heap best-first with a small frontier heap,
+# which costs O(k log k) on top of skipping dead or blocked entries.
+import heapq
+from datetime import date
+
+PRIORITY_POINTS = {"High": 30, "Medium": 15, "Low": 0}
+IN_PROGRESS_POINTS = 20   # Finish what's started before opening something new
+DEADLINE_POINTS = 100     # Due today; halves as the days left grow by two
+OVERDUE_POINTS_PER_DAY = 2
+OVERDUE_MAX_DAYS = 30
+AGE_POINTS_PER_WEEK = 2
+AGE_MAX_POINTS = 20
+EFFORT_POINTS = 10        # Quick wins first: a 2 hour task gets half of this
+DEFAULT_EFFORT_HOURS = 4  # Assumed for tasks without an estimate
+
+
+def score_parts(task, today, first_seen=None):
+    """Urgency score of a task broken down as {component: points}"""
+    parts = {"priority": PRIORITY_POINTS.get(task.priority, 0)}
+    if task.status == "In Progress":
+        parts["in_progress"] = IN_PROGRESS_POINTS
+    if task.deadline:
+        try:
+            days_left = (date.fromisoformat(task.deadline) - today).days
+        except ValueError:
+            days_left = None
+        if days_left is not None:
+            if days_left < 0:
+                overdue = min(-days_left, OVERDUE_MAX_DAYS)
+                parts["deadline"] = DEADLINE_POINTS + OVERDUE_POINTS_PER_DAY * overdue
+            else:
+                parts["deadline"] = DEADLINE_POINTS * 2 / (days_left + 2)
+    if first_seen is not None:
+        age_days = max(0, (today - date.fromtimestamp(first_seen)).days)
+        parts["age"] = min(AGE_POINTS_PER_WEEK * age_days / 7, AGE_MAX_POINTS)
+    effort = task.effort if task.effort else DEFAULT_EFFORT_HOURS
+    parts["effort"] = EFFORT_POINTS * 2 / (effort + 2)
+    return parts
+
+
+class TaskScheduler:
+    """Open tasks ordered by urgency score, kept current through change listeners.
+
+    first_seen(task_id) returns the epoch seconds a task was first seen (for
+    its age), or None. Scores depend on today's date, so everything is
+    rescored when the day rolls over (check_day).
+    """
+
+    def __init__(self, tasks=(), first_seen=None):
+        self.first_seen = first_seen
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        """Score a whole task list (after load or refresh) and heapify it"""
+        self._today = date.today()
+        self._tasks = {}    # task id -> task
+        self._entries = {}  # task id -> its live heap entry
+        self._heap = []
+        self._seq = 0
+        for task in tasks:
+            if task.id is not None and task.status != "Done":
+                self._tasks[task.id] = task
+                self._heap.append(self._new_entry(task))
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _new_entry(self, task):
+        first_seen = self.first_seen(task.id) if self.first_seen else None
+        # [negated score, insertion order, task id]; the id is set to None when the entry dies
+        entry = [-sum(score_parts(task, self._today, first_seen).values()), self._seq, task.id]
+        self._seq += 1
+        self._entries[task.id] = entry
+        return entry
+
+    def check_day(self):
+        """Rescore everything if the date changed since the scores were computed"""
+        if date.today() != self._today:
+            self.rebuild(list(self._tasks.values()))
+
+    def on_change(self, action, task, previous=None):
+        """Change listener for task_manager.add_change_listener"""
+        if task.id is None:
+            return
+        entry = self._entries.pop(task.id, None)
+        if entry is not None:
+            entry[2] = None
+            self._tasks.pop(task.id, None)
+        if action != "delete" and task.status != "Done":
+            self._tasks[task.id] = task
+            heapq.heappush(self._heap, self._new_entry(task))
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            # Mostly dead entries: drop them so walks stay proportional to live tasks
+            self._heap = [entry for entry in self._heap if entry[2] is not None]
+            heapq.heapify(self._heap)
+
+    def ranked(self, blocked=None):
+        """Yield open tasks best first without modifying the heap.
+
+        blocked(task_id) -> true skips a task (e.g. one with open blockers).
+        Taking k tasks costs O(k log k) plus the entries skipped.
+        """
+        heap = self._heap
+        if not heap:
+            return
+        frontier = [(heap[0][0], heap[0][1], 0)]
+        while frontier:
+            _, _, pos = heapq.heappop(frontier)
+            for child in (2 * pos + 1, 2 * pos + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child][0], heap[child][1], child))
+            task_id = heap[pos][2]
+            if task_id is None or (blocked is not None and blocked(task_id)):
+                continue
+            yield self._tasks[task_id]
+
+    def top(self, k, blocked=None):
+        """The k most urgent open tasks"""
+        result = []
+        if k > 0:
+            for task in self.ranked(blocked):
+                result.append(task)
+                if len(result) >= k:
+                    break
+        return result
+
+    def score(self, task_id):
+        """Current score of an open task, or None"""
+        entry = self._entries.get(task_id)
+        return None if entry is None else -entry[0]
+
+    def explain(self, task):
+        """{component: points} behind a task's score"""
+        first_seen = self.first_seen(task.id) if self.first_seen else None
+        return score_parts(task, self._today, first_seen)
@@ -0,0 +1,507 @@
+# server.py - Local asyncio HTTP/JSON API over the task store
+#
+# Stdlib-only. Serves the same tasks.json used by LiteTodoApp, keeping the
+# task list cached in memory and reloading it when another process (such as
+# the desktop app) rewrites the file. Concurrent writes are queued and applied
+# as group commits: every write that arrives while a commit is pending is
+# applied in memory and then persisted with a single save_tasks call.
+import asyncio
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+
+import task_manager
+from task_manager import (Task, read_tasks, save_tasks, add_task, delete_task, mark_task_done,
+                          edit_task, set_task_status, find_task_index, matches_filter,
+                          validate_task_dict, add_change_listener, remove_change_listener)
+from report import parse_report_date, group_report_tasks, apply_history, format_report
+from indexes import CompletionIndex, find_dependency_cycle
+from history import TaskHistory
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_SIZE = 1024 * 1024
+
+
+class HTTPError(Exception):
+    """Error that maps directly onto an HTTP error response"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def task_etag(task):
+    """Strong ETag derived from the task's stored fields"""
+    digest = hashlib.sha1(json.dumps(task.to_dict(), sort_keys=True).encode("utf-8")).hexdigest()
+    return f'"{digest[:16]}"'
+
+
+def _etag_matches(header, etag):
+    """Check an If-Match / If-None-Match header value against an ETag"""
+    if header is None:
+        return False
+    candidates = [c.strip() for c in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class TaskServer:
+    """Asyncio HTTP server exposing CRUD, query and report endpoints"""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, commit_delay=0.005):
+        self.host = host
+        self.port = port
+        self.commit_delay = commit_delay  # Seconds to wait for more writes before committing
+        self.version = 0
+        self.commits = 0
+        self.tasks = []
+        self._by_id = {}
+        self.completion_index = CompletionIndex()
+        self.history = TaskHistory()
+        self._file_stamp = None
+        self._saving = False  # True while a commit is being written; disk reloads wait until it lands
+        self._list_cache = None  # (version, body) for the unfiltered task list
+        self._write_queue = None
+        self._writer = None
+        self._server = None
+        self._save_executor = None  # Single thread so commits hit the disk in order
+
+    # --------------------------
+    # Store cache
+    # --------------------------
+
+    def _stat_file(self):
+        try:
+            st = os.stat(task_manager.TASKS_FILE)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _reload(self):
+        """Load tasks.json into the in-memory cache (raises, leaving the cache alone, if unreadable)"""
+        stamp = self._stat_file()
+        try:
+            tasks = read_tasks()  # Never load_tasks: its backup restore would overwrite the file
+        except FileNotFoundError:
+            tasks = []
+        self.tasks = tasks
+        self._by_id = {task.id: task for task in self.tasks}
+        self.completion_index.rebuild(self.tasks)
+        self.history.sync(self.tasks)
+        self._file_stamp = stamp
+        self.version += 1
+
+    def _sync_from_disk(self):
+        """Reload the cache if another process rewrote tasks.json"""
+        if self._saving:
+            return  # Our own commit is being written, and the cache is already ahead of the file
+        stamp = self._stat_file()
+        if stamp != self._file_stamp:
+            try:
+                self._reload()
+            except (OSError, ValueError) as e:
+                # Keep serving the cache; try again once the file changes
+                self._file_stamp = stamp
+                print(f"Could not reload {task_manager.TASKS_FILE}: {e}")
+
+    @property
+    def collection_etag(self):
+        return f'"v{self.version}"'
+
+    def _get_task(self, task_id):
+        task = self._by_id.get(task_id)
+        if task is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"task {task_id} not found")
+        return task
+
+    def _register(self, spawned):
+        """Index the next occurrence a completed recurring task spawned (if any)"""
+        if spawned is not None:
+            self._by_id[spawned.id] = spawned
+
+    def _index_of(self, task_id):
+        idx = find_task_index(self.tasks, task_id)
+        if idx < 0:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"task {task_id} not found")
+        return idx
+
+    # --------------------------
+    # Group commit
+    # --------------------------
+
+    async def _submit(self, operation):
+        """Queue a write and wait until its group commit is on disk"""
+        future = asyncio.get_running_loop().create_future()
+        await self._write_queue.put((operation, future))
+        return await future
+
+    async def _commit_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._write_queue.get()]
+            if self.commit_delay:
+                await asyncio.sleep(self.commit_delay)
+            while not self._write_queue.empty():
+                batch.append(self._write_queue.get_nowait())
+
+            self._sync_from_disk()
+            outcomes = []
+            changed = False
+            for operation, future in batch:
+                try:
+                    outcomes.append((future, operation(), None))
+                    changed = True
+                except Exception as e:
+                    outcomes.append((future, None, e))
+
+            if changed:
+                self._saving = True
+                try:
+                    await loop.run_in_executor(self._save_executor, save_tasks, list(self.tasks))
+                    await loop.run_in_executor(self._save_executor, self.history.flush)
+                    self._file_stamp = self._stat_file()
+                    self.version += 1
+                    self.commits += 1
+                except Exception as e:
+                    # Roll the cache back to what is actually on disk
+                    try:
+                        self._reload()
+                    except (OSError, ValueError):
+                        pass
+                    error = HTTPError(HTTPStatus.INTERNAL_SERVER_ERROR, f"save failed: {e}")
+                    outcomes = [(f, None, err or error) for f, _, err in outcomes]
+                finally:
+                    self._saving = False
+
+            for future, result, error in outcomes:
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+    # --------------------------
+    # Write operations (run inside the commit loop)
+    # --------------------------
+
+    def _check_if_match(self, task, headers):
+        if_match = headers.get("if-match")
+        if if_match is not None and not _etag_matches(if_match, task_etag(task)):
+            raise HTTPError(HTTPStatus.PRECONDITION_FAILED, "task was modified")
+
+    def _check_links(self, task_id, data, current=None):
+        """Reject a new parent or blocker that doesn't exist, and blockers that would form a cycle"""
+        parent_id = data.get("parent_id")
+        if parent_id is not None and parent_id not in self._by_id and (
+                current is None or parent_id != current.parent_id):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "parent_id does not name a task")
+        blocked_by = data.get("blocked_by") or []
+        existing = set(current.blocked_by) if current is not None else set()
+        if any(b not in self._by_id and b not in existing for b in blocked_by):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "blocked_by names a task that does not exist")
+        if task_id is not None and blocked_by:
+            by_id = self._by_id
+            cycle = find_dependency_cycle(task_id, blocked_by,
+                                          lambda i: by_id[i].blocked_by if i in by_id else ())
+            if cycle:
+                raise HTTPError(HTTPStatus.CONFLICT, f"blocked_by would form a cycle: {cycle + [task_id]}")
+
+    def _op_create(self, data, headers):
+        def operation():
+            if_match = headers.get("if-match")
+            if if_match is not None and not _etag_matches(if_match, self.collection_etag):
+                raise HTTPError(HTTPStatus.PRECONDITION_FAILED, "task list was modified")
+            task = Task.from_dict(data)
+            task.id = None
+            self._check_links(None, data)
+            add_task(self.tasks, task, save=False)
+            self._by_id[task.id] = task
+            return task
+        return operation
+
+    def _op_replace(self, task_id, data, headers, partial):
+        def operation():
+            current = self._get_task(task_id)
+            self._check_if_match(current, headers)
+            merged = current.to_dict() if partial else {}
+            merged.update(data)
+            merged["id"] = task_id
+            status = merged.get("status", "Pending")
+            try:
+                validate_task_dict(merged)
+            except ValueError as e:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, str(e))
+            self._check_links(task_id, merged, current)
+
+            idx = self._index_of(task_id)
+            if partial and status != current.status:
+                # Route status changes through the same helpers the app uses
+                merged["status"] = current.status
+                merged["completion_date"] = current.completion_date
+                edit_task(self.tasks, idx, Task.from_dict(merged), save=False)
+                if status == "Done":
+                    self._register(mark_task_done(self.tasks, idx, merged.get("remarks"), save=False))
+                else:
+                    set_task_status(self.tasks, idx, status, save=False)
+            else:
+                edit_task(self.tasks, idx, Task.from_dict(merged), save=False)
+            self._by_id[task_id] = self.tasks[idx]
+            return self.tasks[idx]
+        return operation
+
+    def _op_done(self, task_id, remarks, headers):
+        def operation():
+            self._check_if_match(self._get_task(task_id), headers)
+            idx = self._index_of(task_id)
+            self._register(mark_task_done(self.tasks, idx, remarks, save=False))
+            return self.tasks[idx]
+        return operation
+
+    def _op_delete(self, task_id, headers):
+        def operation():
+            self._check_if_match(self._get_task(task_id), headers)
+            delete_task(self.tasks, self._index_of(task_id), save=False)
+            del self._by_id[task_id]
+            return None
+        return operation
+
+    # --------------------------
+    # Request handling
+    # --------------------------
+
+    def _query_tasks(self, params):
+        search = params.get("q", [""])[0]
+        filter_option = params.get("filter", ["All"])[0]
+        status = params.get("status", [None])[0]
+        priority = params.get("priority", [None])[0]
+        tag = params.get("tag", [None])[0]
+        parent = params.get("parent", [None])[0]
+        if parent is not None:
+            try:
+                parent = int(parent)
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "parent must be a task id")
+        return [task for task in self.tasks
+                if matches_filter(task, search, filter_option)
+                and (status is None or task.status == status)
+                and (priority is None or task.priority == priority)
+                and (tag is None or tag in task.tags)
+                and (parent is None or task.parent_id == parent)]
+
+    def _report(self, params):
+        start_str = params.get("start", [""])[0]
+        end_str = params.get("end", [""])[0]
+        try:
+            start_date = parse_report_date(start_str)
+            end_date = parse_report_date(end_str)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid date format. Use YYYY-MM-DD")
+        done, in_progress, pending = apply_history(
+            group_report_tasks(self.tasks, start_date, end_date, self.completion_index),
+            self.tasks, self.history, start_date, end_date)
+        return {
+            "start": start_str or None,
+            "end": end_str or None,
+            "done": [t.to_dict() for t in done],
+            "in_progress": [t.to_dict() for t in in_progress],
+            "pending": [t.to_dict() for t in pending],
+            "text": format_report(done, in_progress, pending, start_str, end_str),
+        }
+
+    def _parse_body(self, body):
+        try:
+            data = json.loads(body.decode("utf-8") or "{}")
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "body must be valid JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "body must be a JSON object")
+        return data
+
+    def _not_modified_or(self, headers, etag, payload):
+        if _etag_matches(headers.get("if-none-match"), etag):
+            return HTTPStatus.NOT_MODIFIED, None, {"ETag": etag}
+        return HTTPStatus.OK, payload, {"ETag": etag}
+
+    async def _dispatch(self, method, target, headers, body):
+        url = urlsplit(target)
+        params = parse_qs(url.query)
+        parts = [p for p in url.path.split("/") if p]
+
+        if method in ("GET", "HEAD"):
+            self._sync_from_disk()
+
+        if parts == ["tasks"]:
+            if method == "GET":
+                etag = self.collection_etag
+                if _etag_matches(headers.get("if-none-match"), etag):
+                    return HTTPStatus.NOT_MODIFIED, None, {"ETag": etag}
+                if not params:
+                    if not self._list_cache or self._list_cache[0] != self.version:
+                        body_bytes = json.dumps([t.to_dict() for t in self.tasks]).encode("utf-8")
+                        self._list_cache = (self.version, body_bytes)
+                    return HTTPStatus.OK, self._list_cache[1], {"ETag": etag}
+                return HTTPStatus.OK, [t.to_dict() for t in self._query_tasks(params)], {"ETag": etag}
+            if method == "POST":
+                data = self._parse_body(body)
+                try:
+                    validate_task_dict(data)
+                except ValueError as e:
+                    raise HTTPError(HTTPStatus.BAD_REQUEST, str(e))
+                task = await self._submit(self._op_create(data, headers))
+                return HTTPStatus.CREATED, task.to_dict(), {
+                    "ETag": task_etag(task), "Location": f"/tasks/{task.id}"}
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "method not allowed")
+
+        if len(parts) in (2, 3) and parts[0] == "tasks":
+            try:
+                task_id = int(parts[1])
+            except ValueError:
+                raise HTTPError(HTTPStatus.NOT_FOUND, "not found")
+
+            if len(parts) == 3:
+                if parts[2] != "done" or method != "POST":
+                    raise HTTPError(HTTPStatus.NOT_FOUND, "not found")
+                remarks = self._parse_body(body).get("remarks")
+                task = await self._submit(self._op_done(task_id, remarks, headers))
+                return HTTPStatus.OK, task.to_dict(), {"ETag": task_etag(task)}
+
+            if method == "GET":
+                task = self._get_task(task_id)
+                return self._not_modified_or(headers, task_etag(task), task.to_dict())
+            if method in ("PUT", "PATCH"):
+                data = self._parse_body(body)
+                task = await self._submit(self._op_replace(task_id, data, headers, method == "PATCH"))
+                return HTTPStatus.OK, task.to_dict(), {"ETag": task_etag(task)}
+            if method == "DELETE":
+                await self._submit(self._op_delete(task_id, headers))
+                return HTTPStatus.NO_CONTENT, None, {}
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "method not allowed")
+
+        if parts == ["report"] and method == "GET":
+            etag = f'"v{self.version}-{url.query}"'
+            if _etag_matches(headers.get("if-none-match"), etag):
+                return HTTPStatus.NOT_MODIFIED, None, {"ETag": etag}
+            return HTTPStatus.OK, self._report(params), {"ETag": etag}
+
+        raise HTTPError(HTTPStatus.NOT_FOUND, "not found")
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, target, version = request_line.decode("latin-1").split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, version, headers, body
+
+    def _write_response(self, writer, method, status, payload, extra_headers, keep_alive):
+        if payload is None:
+            body = b""
+        elif isinstance(payload, bytes):
+            body = payload
+        else:
+            body = json.dumps(payload).encode("utf-8")
+        status = HTTPStatus(status)
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}",
+                 f"Date: {formatdate(usegmt=True)}",
+                 "Content-Type: application/json; charset=utf-8",
+                 f"Content-Length: {len(body)}",
+                 f"X-Store-Version: {self.version}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines.extend(f"{name}: {value}" for name, value in extra_headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if method != "HEAD" and body:
+            writer.write(body)
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                method = "GET"
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, target, version, headers, body = request
+                    keep_alive = (version == "HTTP/1.1" and
+                                  headers.get("connection", "").lower() != "close")
+                    status, payload, extra = await self._dispatch(method, target, headers, body)
+                except HTTPError as e:
+                    status, payload, extra = e.status, {"error": e.message}, {}
+                except ValueError:
+                    status, payload, extra = HTTPStatus.BAD_REQUEST, {"error": "malformed request"}, {}
+                except Exception as e:
+                    status, payload, extra = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}, {}
+                self._write_response(writer, method, status, payload, extra, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    # --------------------------
+    # Lifecycle
+    # --------------------------
+
+    async def start(self):
+        """Load the store and start listening; returns the bound (host, port)"""
+        self.history.load()
+        self._reload()
+        self.history.flush()
+        add_change_listener(self.completion_index.on_change)
+        add_change_listener(self.history.on_change)
+        self._save_executor = ThreadPoolExecutor(max_workers=1)
+        self._write_queue = asyncio.Queue()
+        self._writer = asyncio.create_task(self._commit_loop())
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+        return self.host, self.port
+
+    async def stop(self):
+        remove_change_listener(self.completion_index.on_change)
+        remove_change_listener(self.history.on_change)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+        if self._save_executor is not None:
+            self._save_executor.shutdown(wait=True)
+        self.history.flush()
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Serving tasks on http://{self.host}:{self.port}")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+
+def run_server(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Run the API server until interrupted"""
+    try:
+        asyncio.run(TaskServer(host, port).serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -2,16 +2,39 @@
 import json
 import os
 import shutil
+import threading
 from datetime import datetime
 from typing import List, Optional
 
+from perf import timed
+from recurrence import validate_rule, next_occurrence_number, occurrence_date
+
 TASKS_FILE = "tasks.json"
 BACKUP_FILE = "tasks_backup.json"
 
+PRIORITIES = ("High", "Medium", "Low")
+STATUSES = ("Pending", "In Progress", "Done")
+PRIORITY_ORDER = {"High": 0, "Medium": 1, "Low": 2}
+
 class Task:
     def __init__(self, title: str, deadline: Optional[str] = None, 
                  priority: str = "Medium", status: str = "Pending", tags: Optional[List[str]] = None,
-                 completion_date: Optional[str] = None, remarks: Optional[str] = None):
+                 completion_date: Optional[str] = None, remarks: Optional[str] = None,
+                 id: Optional[int] = None, external_id: Optional[str] = None,
+                 parent_id: Optional[int] = None, blocked_by: Optional[List[int]] = None,
+                 effort: Optional[float] = None, remind_at: Optional[str] = None,
+                 recurrence: Optional[dict] = None, occurrence: Optional[int] = None,
+                 series_id: Optional[int] = None):
+        self.id = id              # Stable integer id, assigned when the task is stored
+        _reserve_id(id)
+        self.parent_id = parent_id  # Id of the task this is a subtask of (None = top level)
+        self.blocked_by = blocked_by or []  # Ids of tasks that must be Done before this one can start
+        self.effort = effort      # Optional estimate in hours
+        self.remind_at = remind_at  # Optional reminder time, "YYYY-MM-DD HH:MM" local time
+        self.recurrence = recurrence  # Repeat rule (see recurrence.py); None = one-off task
+        self.occurrence = occurrence  # Which occurrence of the series this row is (1-based)
+        self.series_id = series_id    # Id of the series' first task (None on that task itself)
+        self.external_id = external_id  # Id from an external feed, used to deduplicate imports
         self.title = title
         self.deadline = deadline  # Expected format: "YYYY-MM-DD"
         self.priority = priority  # High / Medium / Low
@@ -31,13 +54,22 @@ class Task:
 
     def to_dict(self) -> dict:
         return {
+            "id": self.id,
             "title": self.title,
             "deadline": self.deadline,
             "priority": self.priority,
             "status": self.status,
             "tags": self.tags,
             "completion_date": self.completion_date,
-            "remarks": self.remarks
+            "remarks": self.remarks,
+            "external_id": self.external_id,
+            "parent_id": self.parent_id,
+            "blocked_by": self.blocked_by,
+            "effort": self.effort,
+            "remind_at": self.remind_at,
+            "recurrence": self.recurrence,
+            "occurrence": self.occurrence,
+            "series_id": self.series_id
         }
 
     @staticmethod
@@ -49,19 +81,96 @@ class Task:
             status=data.get("status", "Pending"),
             tags=data.get("tags", []),
             completion_date=data.get("completion_date"),
-            remarks=data.get("remarks")
+            remarks=data.get("remarks"),
+            id=data.get("id"),
+            external_id=data.get("external_id"),
+            parent_id=data.get("parent_id"),
+            blocked_by=data.get("blocked_by", []),
+            effort=data.get("effort"),
+            remind_at=data.get("remind_at"),
+            recurrence=data.get("recurrence"),
+            occurrence=data.get("occurrence"),
+            series_id=data.get("series_id")
         )
 
+
+def validate_task_dict(data: dict):
+    """Check a task dict against the Task.from_dict schema, raising ValueError on bad fields"""
+    if not isinstance(data, dict):
+        raise ValueError("task must be a JSON object")
+    title = data.get("title")
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError("title is required")
+    for field in ("deadline", "completion_date"):
+        value = data.get(field)
+        if value is not None:
+            try:
+                datetime.strptime(value, "%Y-%m-%d")
+            except (TypeError, ValueError):
+                raise ValueError(f"{field} must be YYYY-MM-DD")
+    if data.get("priority", "Medium") not in PRIORITIES:
+        raise ValueError(f"priority must be one of {', '.join(PRIORITIES)}")
+    if data.get("status", "Pending") not in STATUSES:
+        raise ValueError(f"status must be one of {', '.join(STATUSES)}")
+    tags = data.get("tags", [])
+    if tags is not None and (not isinstance(tags, list) or not all(isinstance(t, str) for t in tags)):
+        raise ValueError("tags must be a list of strings")
+    remarks = data.get("remarks")
+    if remarks is not None and not isinstance(remarks, str):
+        raise ValueError("remarks must be a string")
+    external_id = data.get("external_id")
+    if external_id is not None and not isinstance(external_id, str):
+        raise ValueError("external_id must be a string")
+    task_id = data.get("id")
+    if task_id is not None and (not isinstance(task_id, int) or isinstance(task_id, bool)):
+        raise ValueError("id must be an integer")
+    parent_id = data.get("parent_id")
+    if parent_id is not None and (not isinstance(parent_id, int) or isinstance(parent_id, bool)):
+        raise ValueError("parent_id must be an integer")
+    if parent_id is not None and parent_id == task_id:
+        raise ValueError("a task cannot be its own parent")
+    blocked_by = data.get("blocked_by", [])
+    if blocked_by is not None and (not isinstance(blocked_by, list) or
+                                   not all(isinstance(b, int) and not isinstance(b, bool) for b in blocked_by)):
+        raise ValueError("blocked_by must be a list of task ids")
+    if blocked_by and task_id is not None and task_id in blocked_by:
+        raise ValueError("a task cannot block itself")
+    effort = data.get("effort")
+    if effort is not None and (not isinstance(effort, (int, float)) or isinstance(effort, bool) or not effort > 0):
+        raise ValueError("effort must be a positive number of hours")
+    remind_at = data.get("remind_at")
+    if remind_at is not None:
+        try:
+            datetime.strptime(remind_at, "%Y-%m-%d %H:%M")
+        except (TypeError, ValueError):
+            raise ValueError("remind_at must be YYYY-MM-DD HH:MM")
+    if data.get("recurrence") is not None:
+        validate_rule(data["recurrence"])
+    for field in ("occurrence", "series_id"):
+        value = data.get(field)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 1):
+            raise ValueError(f"{field} must be a positive integer")
+
 # --------------------------
 # JSON Storage Functions
 # --------------------------
 
+def read_tasks() -> List[Task]:
+    """Parse tasks.json as it is, raising OSError / ValueError instead of recovering"""
+    with open(TASKS_FILE, "r") as f:
+        data = json.load(f)
+    if isinstance(data, dict):  # {"next_id": ..., "tasks": [...]}; older files are a bare list
+        next_id = data.get("next_id")
+        if isinstance(next_id, int):
+            _reserve_id(next_id - 1)
+        data = data.get("tasks", [])
+    return assign_task_ids([Task.from_dict(item) for item in data])
+
+@timed("load_tasks")
 def load_tasks() -> List[Task]:
     """Load tasks from JSON file with error recovery"""
     try:
-        with open(TASKS_FILE, "r") as f:
-            data = json.load(f)
-            return [Task.from_dict(item) for item in data]
+        return read_tasks()
     except FileNotFoundError:
         # Create empty tasks file if it doesn't exist
         save_tasks([])
@@ -73,10 +182,9 @@ def load_tasks() -> List[Task]:
             try:
                 print("Attempting to restore from backup...")
                 shutil.copy(BACKUP_FILE, TASKS_FILE)
-                with open(TASKS_FILE, "r") as f:
-                    data = json.load(f)
-                    print("Successfully restored from backup!")
-                    return [Task.from_dict(item) for item in data]
+                tasks = read_tasks()
+                print("Successfully restored from backup!")
+                return tasks
             except:
                 print("Backup restore failed. Starting with empty task list.")
                 save_tasks([])
@@ -89,6 +197,7 @@ def load_tasks() -> List[Task]:
         print(f"Unexpected error loading tasks: {e}")
         return []
 
+@timed("save_tasks")
 def save_tasks(tasks: List[Task]):
     """Save tasks to JSON file with automatic backup"""
     try:
@@ -99,34 +208,217 @@ def save_tasks(tasks: List[Task]):
             except:
                 pass  # Backup failed but continue with save
         
-        # Save tasks
-        with open(TASKS_FILE, "w") as f:
-            json.dump([task.to_dict() for task in tasks], f, indent=2)
+        # Save tasks to a temporary file and swap it in, so readers never see a half-written file
+        temp_file = TASKS_FILE + ".tmp"
+        with open(temp_file, "w") as f:
+            json.dump({"next_id": _next_id, "tasks": [task.to_dict() for task in tasks]}, f, indent=2)
+        os.replace(temp_file, TASKS_FILE)
     except Exception as e:
         print(f"Error saving tasks: {e}")
         raise
 
+# --------------------------
+# Task Ids
+# --------------------------
+# Ids come from a high-water mark that only grows, so a deleted task's id is
+# never given to another task (the history, time log and task links are keyed
+# by id). Every id a Task is created with raises the mark, and it is saved as
+# "next_id" in tasks.json.
+
+_id_lock = threading.Lock()
+_next_id = 1  # Lowest id not handed out or seen yet
+
+def _reserve_id(task_id):
+    """Keep an id that is in use from ever being handed out again"""
+    global _next_id
+    if isinstance(task_id, int) and task_id >= _next_id:
+        with _id_lock:
+            _next_id = max(_next_id, task_id + 1)
+
+def next_task_id() -> int:
+    """Hand out a new task id, higher than any id stored or seen so far"""
+    global _next_id
+    with _id_lock:
+        task_id = _next_id
+        _next_id += 1
+    return task_id
+
+# --------------------------
+# Change Notifications
+# --------------------------
+
+_change_listeners = []
+
+def add_change_listener(listener):
+    """Register listener(action, task, previous) to run after every task mutation.
+
+    action is "add", "delete", "edit" or "status"; previous is the replaced
+    Task for "edit" and None otherwise.
+    """
+    if listener not in _change_listeners:
+        _change_listeners.append(listener)
+
+def remove_change_listener(listener):
+    if listener in _change_listeners:
+        _change_listeners.remove(listener)
+
+def _notify_change(action: str, task: Task, previous: Optional[Task] = None):
+    for listener in list(_change_listeners):
+        listener(action, task, previous)
+
 # --------------------------
 # Task Operations
 # --------------------------
 
-def add_task(tasks: List[Task], task: Task):
+def assign_task_ids(tasks: List[Task]) -> List[Task]:
+    """Give every task without an id a new one"""
+    for task in tasks:
+        if task.id is None:
+            task.id = next_task_id()
+    return tasks
+
+def find_task_index(tasks: List[Task], task_id: int) -> int:
+    """Return the list position of the task with the given id, or -1"""
+    for idx, task in enumerate(tasks):
+        if task.id == task_id:
+            return idx
+    return -1
+
+def add_task(tasks: List[Task], task: Task, save: bool = True):
+    if task.id is None:
+        task.id = next_task_id()
+    else:
+        _reserve_id(task.id)
     tasks.append(task)
-    save_tasks(tasks)
+    _notify_change("add", task)
+    if save:
+        save_tasks(tasks)
 
-def delete_task(tasks: List[Task], task_index: int):
+def delete_task(tasks: List[Task], task_index: int, save: bool = True):
     if 0 <= task_index < len(tasks):
-        tasks.pop(task_index)
-        save_tasks(tasks)
+        task = tasks.pop(task_index)
+        _notify_change("delete", task)
+        if save:
+            save_tasks(tasks)
 
-def mark_task_done(tasks: List[Task], task_index: int, remarks: Optional[str] = None):
+def mark_task_done(tasks: List[Task], task_index: int, remarks: Optional[str] = None,
+                   save: bool = True) -> Optional[Task]:
+    """Complete a task, returning the next occurrence it spawned (appended to tasks) if it recurs"""
+    spawned = None
     if 0 <= task_index < len(tasks):
         tasks[task_index].status = "Done"
         tasks[task_index].completion_date = datetime.today().strftime("%Y-%m-%d")
         tasks[task_index].remarks = remarks if remarks else None
-        save_tasks(tasks)
+        _notify_change("status", tasks[task_index])
+        if tasks[task_index].recurrence:
+            spawned = spawn_next_occurrence(tasks, tasks[task_index])
+        if save:
+            save_tasks(tasks)
+    return spawned
+
+def spawn_next_occurrence(tasks: List[Task], task: Task) -> Optional[Task]:
+    """Add the next open occurrence of a completed recurring task (None if the series ended)"""
+    series_id = task.series_id or task.id
+    occurrence = task.occurrence or 1
+    # A series has one open row: completing a reopened occurrence must not spawn a second one
+    for other in tasks:
+        if (other is not task and other.recurrence and other.status != "Done"
+                and (other.series_id or other.id) == series_id):
+            return None
+    today = datetime.today().date()
+    n = next_occurrence_number(task.recurrence, occurrence, today)
+    if n is None:
+        return None
+    deadline = occurrence_date(task.recurrence, n)
+    remind_at = None
+    if task.remind_at and task.deadline:
+        try:
+            shift = deadline - datetime.strptime(task.deadline, "%Y-%m-%d").date()
+            remind_at = (datetime.strptime(task.remind_at, "%Y-%m-%d %H:%M") + shift).strftime("%Y-%m-%d %H:%M")
+        except ValueError:
+            pass
+    successor = Task(title=task.title, deadline=deadline.isoformat(), priority=task.priority,
+                     tags=list(task.tags), parent_id=task.parent_id, effort=task.effort,
+                     remind_at=remind_at, recurrence=task.recurrence, occurrence=n,
+                     series_id=series_id)
+    add_task(tasks, successor, save=False)
+    return successor
+
+def set_task_status(tasks: List[Task], task_index: int, status: str, save: bool = True):
+    """Move a task back to Pending or In Progress, clearing its completion info"""
+    if 0 <= task_index < len(tasks):
+        task = tasks[task_index]
+        task.status = status
+        task.completion_date = None
+        if status == "Pending":
+            task.remarks = None
+        _notify_change("status", task)
+        if save:
+            save_tasks(tasks)
 
-def edit_task(tasks: List[Task], task_index: int, new_task: Task):
+def edit_task(tasks: List[Task], task_index: int, new_task: Task, save: bool = True):
     if 0 <= task_index < len(tasks):
+        if new_task.id is None:
+            new_task.id = tasks[task_index].id
+        previous = tasks[task_index]
         tasks[task_index] = new_task
-        save_tasks(tasks)
+        _notify_change("edit", new_task, previous)
+        if save:
+            save_tasks(tasks)
+
+# --------------------------
+# Queries
+# --------------------------
+
+def matches_filter(task: Task, search_text: str = "", filter_option: str = "All") -> bool:
+    """Check a task against the search box text and a quick filter option"""
+    if search_text:
+        search_text = search_text.lower()
+        if not (search_text in task.title.lower() or
+               search_text in ' '.join(task.tags).lower() or
+               search_text in task.priority.lower()):
+            return False
+
+    if filter_option == "Pending":
+        return task.status == "Pending"
+    elif filter_option == "In Progress":
+        return task.status == "In Progress"
+    elif filter_option == "Done":
+        return task.status == "Done"
+    elif filter_option == "Overdue":
+        return task.is_overdue()
+    elif filter_option == "High Priority":
+        return task.priority == "High"
+    elif filter_option == "Recurring":
+        return task.recurrence is not None and task.status != "Done"
+    return True
+
+def default_sort_key(task: Task):
+    """Deadline first (tasks without one last), then priority"""
+    return (task.deadline is None, task.deadline or "", PRIORITY_ORDER.get(task.priority, 3))
+
+def column_sort_key(column: str):
+    """Sort key for a table column, or None for an unknown column"""
+    if column == "priority":
+        return lambda t: PRIORITY_ORDER.get(t.priority, 3)
+    elif column == "deadline":
+        return lambda t: (t.deadline is None, t.deadline or "")
+    elif column == "status":
+        return lambda t: t.status
+    elif column == "title":
+        return lambda t: t.title.lower()
+    elif column == "tags":
+        return lambda t: ', '.join(t.tags).lower()
+    return None
+
+def count_statuses(tasks: List[Task]) -> dict:
+    """Single pass over tasks counting each status plus overdue ones"""
+    counts = {"Pending": 0, "In Progress": 0, "Done": 0, "Overdue": 0}
+    today = datetime.today().strftime("%Y-%m-%d")
+    for task in tasks:
+        status = task.status
+        counts[status] = counts.get(status, 0) + 1
+        # Cheap ISO string comparison first; only past deadlines get parsed
+        if task.deadline and task.deadline < today and task.is_overdue():
+            counts["Overdue"] += 1
+    return counts
@@ -0,0 +1,80 @@
+"""Tests for flow metrics over the status history (analytics.py)"""
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import analytics
+from analytics import compute_metrics, export_metrics, iter_metrics_lines
+from history import TaskHistory
+from task_manager import Task, assign_task_ids
+
+START = date(2026, 3, 2)  # A Monday
+END = date(2026, 3, 15)
+NOW = datetime(2026, 3, 16).timestamp()
+
+
+def at(days, hours=0):
+    return datetime.combine(START, datetime.min.time()) + timedelta(days=days, hours=hours)
+
+
+@pytest.fixture
+def board():
+    """Two tasks finished in the first week, one in the second, one still open"""
+    tasks = assign_task_ids([Task("a", tags=["docs"], status="Done"), Task("b", status="Done"),
+                             Task("c", tags=["docs"], status="Done"), Task("d", tags=["docs"])])
+    a, b, c, d = (task.id for task in tasks)
+    log = TaskHistory()
+    log.record(a, "Pending", at(0))
+    log.record(b, "Pending", at(0))
+    log.record(d, "Pending", at(0, 1))
+    log.record(a, "In Progress", at(1))
+    log.record(b, "In Progress", at(1))
+    log.record(a, "Done", at(2))        # 1 day
+    log.record(b, "Done", at(4))        # 3 days
+    log.record(c, "In Progress", at(8))
+    log.record(c, "Done", at(10))       # 2 days
+    return tasks, log
+
+
+def test_metrics(board):
+    tasks, log = board
+    metrics = compute_metrics(tasks, log, START, END, now=NOW)
+    assert (metrics["start"], metrics["end"]) == ("2026-03-02", "2026-03-15")
+    assert [row["done"] for row in metrics["throughput"]] == [2, 1]
+    assert metrics["cycle_time_days"] == {"count": 3, "mean": 2.0, "p50": 2.0, "p85": 2.7, "max": 3.0}
+    assert metrics["aging"][2] == {"bucket": "1-3 months", "open": 0}
+    assert sum(row["open"] for row in metrics["aging"]) == 1
+    docs = next(row for row in metrics["tags"] if row["tag"] == "docs")
+    assert docs == {"tag": "docs", "open": 1, "done": 2, "cycle_p50_days": 1.5}
+
+
+def test_numpy_and_plain_python_agree(board, monkeypatch):
+    tasks, log = board
+    with_numpy = compute_metrics(tasks, log, START, END, now=NOW)
+    monkeypatch.setattr(analytics, "HAS_NUMPY", False)
+    assert compute_metrics(tasks, log, START, END, now=NOW) == with_numpy
+
+
+def test_empty_history():
+    metrics = compute_metrics([Task("open", id=1)], TaskHistory(), START, END, now=NOW)
+    assert metrics["cycle_time_days"]["count"] == 0
+    assert "no tasks finished in this period" in "".join(iter_metrics_lines(metrics))
+
+
+def test_exports(board):
+    tasks, log = board
+    metrics = compute_metrics(tasks, log, START, END, now=NOW)
+    out = io.StringIO()
+    export_metrics(out, metrics, "json")
+    assert json.loads(out.getvalue()) == metrics
+    out = io.StringIO()
+    export_metrics(out, metrics, "csv")
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert rows[0] == ["section", "name", "value"]
+    assert ["throughput", "2026-03-02", "2"] in rows
+    out = io.StringIO()
+    export_metrics(out, metrics)
+    assert "Week of 2026-03-09: 1" in out.getvalue()
@@ -0,0 +1,69 @@
+"""Tests for LiteTodoApp logic that runs without a display (app.py)"""
+import pytest
+
+import app as app_module
+from app import LiteTodoApp
+from task_manager import Task, assign_task_ids
+
+
+class FakeTree:
+    def __init__(self, selection):
+        self._selection = selection
+
+    def selection(self):
+        return self._selection
+
+
+class FakeRoot:
+    def __init__(self):
+        self.clipboard = None
+
+    def clipboard_clear(self):
+        self.clipboard = ""
+
+    def clipboard_append(self, text):
+        self.clipboard += text
+
+
+class FakeLabel:
+    def config(self, **kwargs):
+        self.text = kwargs.get("text")
+
+
+@pytest.fixture
+def warnings(monkeypatch):
+    shown = []
+    monkeypatch.setattr(app_module.messagebox, "showwarning", lambda title, message: shown.append(title))
+    return shown
+
+
+def make_app(selection):
+    """A LiteTodoApp with just the state the selection handlers touch"""
+    app = object.__new__(LiteTodoApp)
+    app.tree = FakeTree(selection)
+    app.root = FakeRoot()
+    app.status_bar = FakeLabel()
+    app.tasks = assign_task_ids([Task("Parent"), Task("Child")])
+    app.get_dialog = lambda *args, **kwargs: pytest.fail("no dialog should open")
+    app._task_popup = lambda: pytest.fail("no dialog should open")
+    return app
+
+
+@pytest.mark.parametrize("handler", ["add_subtask_popup", "blocked_by_popup", "delete_task", "mark_done",
+                                     "mark_pending", "mark_in_progress", "toggle_timer"])
+def test_placeholder_row_selection_warns(handler, warnings):
+    getattr(make_app(("more-0",)), handler)()
+    assert warnings == ["No Selection"]
+
+
+@pytest.mark.parametrize("handler", ["copy_task_title", "edit_task_popup"])
+def test_placeholder_row_selection_is_ignored(handler, warnings):
+    app = make_app(("more-0",))
+    getattr(app, handler)()
+    assert warnings == [] and app.root.clipboard is None
+
+
+def test_copy_task_title_of_a_task_row(warnings):
+    app = make_app(("1",))
+    app.copy_task_title()
+    assert app.root.clipboard == "Child"
@@ -0,0 +1,123 @@
+"""Tests for the worker-thread runner (background.py), driven by a fake Tk root"""
+import threading
+import time
+
+import pytest
+
+from background import BackgroundRunner
+
+
+class FakeRoot:
+    """Stands in for Tk: after() callbacks are queued and run by run_pending()"""
+
+    def __init__(self):
+        self.callbacks = {}
+        self._ids = 0
+
+    def after(self, ms, fn):
+        self._ids += 1
+        self.callbacks[self._ids] = fn
+        return self._ids
+
+    def after_cancel(self, job_id):
+        del self.callbacks[job_id]
+
+    def run_pending(self):
+        callbacks, self.callbacks = self.callbacks, {}
+        for fn in callbacks.values():
+            fn()
+
+
+@pytest.fixture
+def runner():
+    runner = BackgroundRunner(FakeRoot())
+    yield runner
+    runner.shutdown()
+
+
+def drain(runner, timeout=5.0):
+    """Run the Tk side until every submitted job has been dispatched"""
+    deadline = time.monotonic() + timeout
+    while runner.root.callbacks:
+        assert time.monotonic() < deadline, "background jobs did not finish"
+        runner.root.run_pending()
+        time.sleep(0.001)
+
+
+def test_results_are_delivered_on_the_polling_thread(runner):
+    delivered = []
+    job = runner.submit(lambda a, b: a + b, 2, 3, name="add",
+                        on_done=lambda result: delivered.append((result, threading.get_ident())))
+    assert delivered == []  # Nothing runs until the Tk side polls
+    drain(runner)
+    assert delivered == [(5, threading.get_ident())]
+    assert job.finished and job.name == "add"
+    assert runner.root.callbacks == {}  # Polling stops once nothing is outstanding
+
+
+def test_ordered_jobs_run_and_report_in_submission_order(runner):
+    started = []
+    delivered = []
+
+    def step(i):
+        started.append(i)
+        time.sleep(0.002 * (5 - i))  # Earlier jobs are slower
+        return i
+
+    for i in range(5):
+        runner.submit(step, i, ordered=True, on_done=delivered.append)
+    drain(runner)
+    assert started == delivered == [0, 1, 2, 3, 4]
+
+
+def test_cancelled_jobs_never_call_back(runner):
+    gate = threading.Event()
+    ran = []
+    delivered = []
+    blocker = runner.submit(gate.wait, ordered=True, on_done=delivered.append)
+    stale = runner.submit(ran.append, "stale", ordered=True, on_done=delivered.append)
+    stale.cancel()  # Cancelled while still queued behind the blocker: never runs
+    running = runner.submit(lambda job: job.cancel() or "late", with_job=True, on_done=delivered.append)
+    gate.set()
+    drain(runner)
+    assert ran == [] and delivered == [True]
+    assert stale.finished and running.finished and running.cancelled
+    assert runner._outstanding == 0
+
+
+def test_progress_is_reported_in_order_before_the_result(runner):
+    events = []
+
+    def work(job, count):
+        for i in range(1, count + 1):
+            job.progress(i)
+        return "done"
+
+    runner.submit(work, 3, with_job=True, on_progress=lambda value: events.append(("progress", value)),
+                  on_done=lambda result: events.append(("done", result)))
+    drain(runner)
+    assert events == [("progress", 1), ("progress", 2), ("progress", 3), ("done", "done")]
+
+
+def test_errors_go_to_on_error_or_are_printed(runner, capsys):
+    errors = []
+
+    def fail():
+        raise OSError("disk full")
+
+    runner.submit(fail, on_error=errors.append, on_done=lambda result: pytest.fail("no result expected"))
+    runner.submit(fail, name="save_tasks")
+    drain(runner)
+    assert [str(e) for e in errors] == ["disk full"]
+    assert "Background job save_tasks failed: disk full" in capsys.readouterr().out
+
+
+def test_shutdown_waits_for_queued_saves_and_stops_polling():
+    root = FakeRoot()
+    runner = BackgroundRunner(root)
+    written = []
+    for i in range(3):
+        runner.submit(lambda i=i: (time.sleep(0.002), written.append(i)), ordered=True)
+    runner.shutdown()
+    assert written == [0, 1, 2]
+    assert root.callbacks == {}
@@ -0,0 +1,41 @@
+"""Tests for the benchmark regression check (benchmark.py)"""
+import json
+
+import pytest
+
+import benchmark
+from benchmark import compare
+
+BASELINE = {"1k": {"load": 0.100, "filter": 0.0010, "report": 0.050}}
+
+
+def test_slowdown_within_tolerance_passes():
+    results = {"1k": {"load": 0.120, "filter": 0.0010, "report": 0.050}}  # +20%
+    assert compare(results, BASELINE, tolerance=0.25, floor=0.0005) == []
+
+
+def test_slowdown_under_the_floor_passes():
+    results = {"1k": {"load": 0.100, "filter": 0.0014, "report": 0.050}}  # +40%, but only 0.4 ms
+    assert compare(results, BASELINE, tolerance=0.25, floor=0.0005) == []
+
+
+def test_real_regression_is_reported():
+    results = {"1k": {"load": 0.100, "filter": 0.0020, "report": 0.080}}
+    assert compare(results, BASELINE, tolerance=0.25, floor=0.0005) == [
+        ("1k", "filter", 0.0010, 0.0020), ("1k", "report", 0.050, 0.080)]
+
+
+def test_timings_missing_from_the_baseline_are_skipped():
+    results = {"1k": {"load": 0.100, "new_benchmark": 9.0}, "10k": {"load": 5.0}}
+    assert compare(results, BASELINE, tolerance=0.25, floor=0.0005) == []
+
+
+@pytest.mark.parametrize("report, status, message", [(0.050, 0, "No regressions"),
+                                                      (0.080, 1, "1 regression(s)")])
+def test_main_exits_1_on_regression(tmp_path, monkeypatch, capsys, report, status, message):
+    monkeypatch.setattr(benchmark, "run_size",
+                        lambda count, repeat, seed: {"load": 0.100, "filter": 0.0010, "report": report})
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"meta": {}, "results": BASELINE}))
+    assert benchmark.main(["--sizes", "1k", "--baseline", str(baseline)]) == status
+    assert message in capsys.readouterr().out
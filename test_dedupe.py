@@ -0,0 +1,137 @@
+"""Tests for near-duplicate title detection (dedupe.py)"""
+import pytest
+
+import dedupe
+import task_manager
+from task_manager import Task, add_task, assign_task_ids, delete_task, edit_task, mark_task_done
+from dedupe import DuplicateIndex, normalize_title, title_keys
+
+
+@pytest.fixture
+def listen():
+    """Register indexes as change listeners for one test"""
+    added = []
+
+    def register(index):
+        task_manager.add_change_listener(index.on_change)
+        added.append(index)
+        return index
+
+    yield register
+    for index in added:
+        task_manager.remove_change_listener(index.on_change)
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "pure"])
+def numpy_mode(request, monkeypatch):
+    """Run a test with the bulk NumPy path and with the pure-Python fallback"""
+    if request.param and not dedupe.HAS_NUMPY:
+        pytest.skip("NumPy is not installed")
+    monkeypatch.setattr(dedupe, "HAS_NUMPY", request.param)
+    return request.param
+
+
+def titles(matches):
+    return [task.title for _, task in matches]
+
+
+def test_normalize_title():
+    assert normalize_title("  Fix: the LOGIN-page_bug!! ") == "fix the login page bug"
+    assert normalize_title("?!") == ""
+
+
+@pytest.mark.skipif(not dedupe.HAS_NUMPY, reason="NumPy is not installed")
+def test_bulk_keys_match_per_title_keys():
+    names = [normalize_title(t) for t in ("Renew domain", "a", "Ticket 42 café", "Write Q3 report")]
+    assert dedupe._title_keys_bulk(names).tolist() == [title_keys(name) for name in names]
+
+
+def test_find_similar_ranks_and_filters(numpy_mode):
+    tasks = assign_task_ids([Task("Renew the domain name"), Task("Renew domain names"),
+                             Task("Book flights"), Task("Renew the domain name", status="Done")])
+    index = DuplicateIndex(tasks)
+    matches = index.find_similar("renew domain name")
+    assert titles(matches) == ["Renew domain names", "Renew the domain name"]  # Most similar first
+    assert matches[0][0] > matches[1][0]
+    assert titles(index.find_similar("Renew the domain name", exclude_id=tasks[0].id)) == ["Renew domain names"]
+    assert index.find_similar("Something unrelated") == []
+    assert index.find_similar("!!!") == []
+    assert len(index) == 3  # Done tasks are not indexed
+
+
+def test_numbers_must_match_exactly(numpy_mode):
+    tasks = assign_task_ids([Task("Migrated ticket 1"), Task("Migrated ticket 2")])
+    index = DuplicateIndex(tasks)
+    assert titles(index.find_similar("Migrated ticket 1")) == ["Migrated ticket 1"]
+    assert index.duplicate_groups() == []
+
+
+def test_change_listener_keeps_the_index_current(listen):
+    tasks = assign_task_ids([Task("Renew the domain name"), Task("Book flights")])
+    index = listen(DuplicateIndex(tasks))
+    assert titles(index.find_similar("Book flights")) == ["Book flights"]
+
+    add_task(tasks, Task("Pay the electricity bill"), save=False)
+    assert titles(index.find_similar("pay electricity bill")) == ["Pay the electricity bill"]
+
+    renamed = Task("Book train tickets", id=tasks[1].id)
+    edit_task(tasks, 1, renamed, save=False)
+    assert index.find_similar("Book flights") == []
+    assert titles(index.find_similar("Book train tickets")) == ["Book train tickets"]
+
+    mark_task_done(tasks, 0, save=False)
+    assert index.find_similar("Renew the domain name") == []
+
+    delete_task(tasks, 1, save=False)
+    assert index.find_similar("Book train tickets") == []
+    assert len(index) == 1
+
+
+def test_check_batch_catches_repeats_within_the_batch(numpy_mode):
+    existing = assign_task_ids([Task("Renew the domain name")])
+    batch = assign_task_ids([Task("Renew domain name"), Task("Water the plants"),
+                             Task("Water plants"), Task("Book flights")])
+    found = DuplicateIndex(existing).check_batch(batch)
+    assert [(task.title, other.title) for task, _, other in found] == [
+        ("Renew domain name", "Renew the domain name"), ("Water plants", "Water the plants")]
+    assert all(similarity >= dedupe.DUPLICATE_THRESHOLD for _, similarity, _ in found)
+
+
+def test_duplicate_groups_largest_first(numpy_mode):
+    tasks = assign_task_ids([Task("Water the plants"), Task("Renew domain name"), Task("Water plants"),
+                             Task("Renew the domain name"), Task("Water the plants!"), Task("Book flights")])
+    groups = DuplicateIndex(tasks).duplicate_groups()
+    assert [[task.title for task in group] for group in groups] == [
+        ["Water the plants", "Water plants", "Water the plants!"],
+        ["Renew domain name", "Renew the domain name"]]
+
+
+def test_background_build_replays_changes_made_meanwhile(listen):
+    tasks = assign_task_ids([Task("Renew the domain name"), Task("Book flights"), Task("Water the plants")])
+    index = listen(DuplicateIndex(tasks))
+    snapshot = index.begin_build()
+    assert not index.ready
+
+    add_task(tasks, Task("Pay the electricity bill"), save=False)
+    edit_task(tasks, 1, Task("Book train tickets", id=tasks[1].id), save=False)
+    mark_task_done(tasks, 2, save=False)
+    built = DuplicateIndex.build_state(snapshot)  # What the worker returns
+    index.finish_build(built)
+
+    assert index.ready
+    assert titles(index.find_similar("pay electricity bill")) == ["Pay the electricity bill"]
+    assert index.find_similar("Book flights") == []
+    assert titles(index.find_similar("Book train tickets")) == ["Book train tickets"]
+    assert index.find_similar("Water the plants") == []
+    assert len(index) == 3
+
+
+def test_stale_background_build_is_discarded():
+    tasks = assign_task_ids([Task("Book flights")])
+    index = DuplicateIndex(tasks)
+    stale = DuplicateIndex.build_state(index.begin_build())
+    index.rebuild(assign_task_ids([Task("Renew the domain name")]))
+    index.finish_build(stale)
+    assert not index.ready
+    assert titles(index.find_similar("Renew domain name")) == ["Renew the domain name"]
+    assert index.find_similar("Book flights") == []
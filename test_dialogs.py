@@ -0,0 +1,106 @@
+"""Tests for dialog logic that runs without a display (dialogs.py)"""
+import pytest
+
+import dialogs
+import perf
+from dedupe import DuplicateIndex
+from dialogs import ReportPopup, TaskPopup
+from renderers import renderer_for_path
+from report import format_report, iter_report_args_lines
+from task_manager import Task, assign_task_ids, edit_task
+
+
+class FakeEntry:
+    def __init__(self, text=""):
+        self.text = text
+
+    def get(self):
+        return self.text
+
+
+class FakeVar:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+def make_task_popup(task, **fields):
+    """A TaskPopup whose form shows task, as open() would leave it"""
+    popup = object.__new__(TaskPopup)
+    popup.task = None
+    popup.original_task = task
+    popup.duplicate_index = None
+    popup.entry_title = FakeEntry(fields.get("title", task.title))
+    popup.entry_deadline = FakeEntry(task.deadline or "")
+    popup.priority_var = FakeVar(fields.get("priority", task.priority))
+    popup.entry_tags = FakeEntry(", ".join(task.tags))
+    popup.entry_effort = FakeEntry("")
+    popup.entry_remind_at = FakeEntry("")
+    popup.entry_repeat = FakeEntry("")
+    popup._close = lambda: None
+    return popup
+
+
+@pytest.fixture
+def no_calendar(monkeypatch):
+    monkeypatch.setattr(dialogs, "HAS_CALENDAR", False)
+    monkeypatch.setattr(dialogs.messagebox, "showerror", lambda *args, **kwargs: pytest.fail("no error expected"))
+
+
+def test_editing_keeps_the_external_id(no_calendar):
+    tasks = assign_task_ids([Task("Ingested", external_id="MON-17", tags=["feed"], blocked_by=[])])
+    popup = make_task_popup(tasks[0], title="Ingested and renamed", priority="High")
+    popup.save()
+    edit_task(tasks, 0, popup.task, save=False)
+    assert (tasks[0].title, tasks[0].priority, tasks[0].external_id) == ("Ingested and renamed", "High", "MON-17")
+
+
+def test_duplicate_check_is_skipped_until_the_index_is_built(monkeypatch):
+    index = DuplicateIndex(assign_task_ids([Task("Renew the domain name")]))
+    index.begin_build()  # Building on a worker
+    popup = make_task_popup(Task("placeholder"))
+    popup.original_task = None
+    popup.duplicate_index = index
+    monkeypatch.setattr(dialogs.messagebox, "askyesno", lambda *args, **kwargs: pytest.fail("no prompt expected"))
+    assert popup._confirm_not_duplicate("Renew domain name")
+    assert not index.ready
+
+
+class FakeJob:
+    cancelled = False
+
+    def __init__(self):
+        self.progress_reports = []
+
+    def progress(self, value):
+        self.progress_reports.append(value)
+
+
+def test_report_export_streams_from_the_report_arguments(tmp_path, monkeypatch):
+    tasks = assign_task_ids([Task(f"task {i}", tags=["bulk"]) for i in range(5)]
+                            + [Task("shipped", status="Done", completion_date="2026-03-01")])
+    report_args = ReportPopup._build_report(FakeJob(), tasks, None, None, None, None, None, "", "")
+    assert len(report_args) == 6  # The grouping and extras, never the formatted lines
+    monkeypatch.setattr(ReportPopup, "EXPORT_PROGRESS_EVERY", 10)
+    job = FakeJob()
+    path = tmp_path / "report.txt"
+    ReportPopup._write_export(job, str(path), renderer_for_path(str(path)), report_args)
+    lines = list(iter_report_args_lines(report_args))
+    text = path.read_text(encoding="utf-8")
+    assert text == "".join(lines) and text.startswith(format_report(*report_args[:5]))
+    assert job.progress_reports == list(range(10, len(lines) + 1, 10))
+
+
+def test_report_build_is_timed_on_the_worker():
+    was_enabled = perf.is_enabled()
+    perf.reset()
+    perf.enable(True)
+    try:
+        tasks = assign_task_ids([Task("open")])
+        ReportPopup._build_report(FakeJob(), tasks, None, None, None, None, None, "", "")
+        assert [(name, count) for name, count, *_ in perf.stats()] == [("generate_report", 1)]
+    finally:
+        perf.enable(was_enabled)
+        perf.reset()
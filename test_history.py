@@ -0,0 +1,100 @@
+"""Tests for the status transition log (history.py)"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import history as history_module
+from history import RECORD, TaskHistory
+from report import apply_history
+from task_manager import Task, assign_task_ids
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Run against a scratch task_history.bin in a temporary directory"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def at(day, hour=12):
+    return datetime(2026, 3, day, hour)
+
+
+def test_board_at_replays_transitions():
+    log = TaskHistory()
+    log.record(1, "Pending", at(1))
+    log.record(1, "In Progress", at(2))
+    log.record(2, "Pending", at(2))
+    log.record(1, "Done", at(4))
+    log.record(2, None, at(5))  # Deleted
+    assert log.board_at(date(2026, 2, 28)) == {}
+    assert log.board_at(date(2026, 3, 3)) == {1: "In Progress", 2: "Pending"}
+    assert log.board_at(date(2026, 3, 5)) == {1: "Done"}
+    assert log.completed_between(date(2026, 3, 4), date(2026, 3, 4)) == {1}
+    assert log.completed_between(date(2026, 3, 5)) == set()
+
+
+def test_repeated_status_is_not_logged_twice():
+    log = TaskHistory()
+    log.record(1, "Pending", at(1))
+    log.record(1, "Pending", at(2))
+    assert len(log) == 1
+    assert log.transitions(1) == [(at(1), "Pending")]
+
+
+def test_checkpoints_give_the_same_board(monkeypatch):
+    monkeypatch.setattr(history_module, "CHECKPOINT_MIN_EVENTS", 3)
+    log = TaskHistory()
+    statuses = ("Pending", "In Progress", "Done")
+    for i in range(30):
+        log.record(i % 4, statuses[i % 3], datetime(2026, 3, 1) + timedelta(minutes=30 * i))
+    assert log._cp_positions  # Checkpoints were taken
+    replayed = {}
+    for when, task_id, code in zip(*log.columns()):
+        if when <= int(datetime(2026, 3, 1, 12).timestamp()):
+            replayed[task_id] = history_module.STATUS_NAMES[code]
+    assert log.board_at(datetime(2026, 3, 1, 12)) == replayed
+
+
+def test_clock_stepping_back_keeps_the_log_sorted():
+    log = TaskHistory()
+    log.record(1, "Pending", at(3))
+    log.record(1, "Done", at(2))
+    times, _, _ = log.columns()
+    assert list(times) == sorted(times)
+
+
+def test_sync_seeds_done_tasks_at_their_completion_date():
+    tasks = assign_task_ids([Task("open"), Task("done", status="Done", completion_date="2026-03-02")])
+    log = TaskHistory()
+    log.sync(tasks)
+    assert log.board_at(date(2026, 3, 2)) == {tasks[1].id: "Done"}
+
+    tasks[0].status = "In Progress"
+    log.sync(tasks[:1])  # Changed and deleted outside this process
+    board = log.board_at(datetime.now())
+    assert board == {tasks[0].id: "In Progress"}
+
+
+def test_log_survives_a_restart(store):
+    log = TaskHistory()
+    log.record(1, "Pending", at(1))
+    log.record(1, "Done", at(2))
+    log.flush()
+    with open(history_module.HISTORY_FILE, "ab") as f:
+        f.write(RECORD.pack(0, 2, 0)[:5])  # Torn record from a crash
+    reloaded = TaskHistory().load()
+    assert reloaded.transitions(1) == [(at(1), "Pending"), (at(2), "Done")]
+    assert TaskHistory(str(store / "missing.bin")).load().board_at(at(9)) == {}
+
+
+def test_reports_for_past_ranges_use_the_board_of_the_time():
+    tasks = assign_task_ids([Task("reopened"), Task("started later", status="In Progress")])
+    log = TaskHistory()
+    log.record(tasks[1].id, "Pending", at(1))
+    log.record(tasks[0].id, "Done", at(2))
+    log.record(tasks[0].id, "Pending", at(6))
+    log.record(tasks[1].id, "In Progress", at(6))
+    done, in_progress, pending = apply_history(([], [], []), tasks, log, date(2026, 3, 1), date(2026, 3, 3))
+    assert [t.title for t in done] == ["reopened"]
+    assert in_progress == [] and [t.title for t in pending] == ["started later"]
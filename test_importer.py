@@ -0,0 +1,106 @@
+"""Tests for the bulk importer (importer.py)"""
+import json
+
+import pytest
+
+from task_manager import Task, assign_task_ids, save_tasks, read_tasks
+from importer import import_file, parse_column_mapping, parse_file
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Run against a scratch tasks.json / task_history.bin in a temporary directory"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_csv_rows_are_normalised(store):
+    path = write(store / "dump.csv",
+                 "title,deadline,priority,status,tags,effort\n"
+                 "Ship it,03/15/2026,urgent,doing,release; web,1.5h\n"
+                 "Tidy up,15.03.2026,minor,todo,,\n")
+    result = parse_file(path, workers=1)
+    assert (result.rows, result.error_count) == (2, 0)
+    ship, tidy = result.tasks
+    assert (ship.deadline, ship.priority, ship.status, ship.tags, ship.effort) == \
+        ("2026-03-15", "High", "In Progress", ["release", "web"], 1.5)
+    assert (tidy.deadline, tidy.priority, tidy.status, tidy.tags) == ("2026-03-15", "Low", "Pending", [])
+
+
+def test_errors_carry_source_row_numbers(store):
+    path = write(store / "dump.csv",
+                 "title,deadline,effort\n"
+                 "Good,2026-01-01,\n"
+                 "Bad date,someday,\n"
+                 ",2026-01-01,\n"
+                 "Bad effort,,lots\n")
+    result = parse_file(path, workers=1, chunk_size=2)
+    assert [t.title for t in result.tasks] == ["Good"]
+    assert result.rows == 4 and result.error_count == 3
+    assert [row for row, _ in result.errors] == [3, 4, 5]
+    assert "someday" in result.errors[0][1]
+
+
+def test_jsonl_and_json_with_column_mapping(store):
+    mapping = parse_column_mapping(["title=summary", "external_id=key"])
+    jsonl = write(store / "dump.jsonl",
+                  json.dumps({"summary": "One", "key": 101}) + "\n\n"
+                  "not json\n"
+                  + json.dumps(["a list"]) + "\n")
+    result = parse_file(jsonl, mapping, workers=1)
+    assert [(t.title, t.external_id) for t in result.tasks] == [("One", "101")]
+    assert [row for row, _ in result.errors] == [3, 4]
+
+    dump = write(store / "dump.json", json.dumps({"tasks": [{"summary": "Two", "key": "K-2"}]}))
+    result = parse_file(dump, mapping, workers=1)
+    assert [(t.title, t.external_id) for t in result.tasks] == [("Two", "K-2")]
+
+
+def test_invalid_column_mapping():
+    with pytest.raises(ValueError):
+        parse_column_mapping(["nonsense=column"])
+    with pytest.raises(ValueError):
+        parse_column_mapping(["title"])
+
+
+def test_import_skips_known_external_ids_and_assigns_fresh_ids(store):
+    existing = assign_task_ids([Task("Already here", external_id="E-1"), Task("Other")])
+    save_tasks(existing)
+    path = write(store / "dump.csv",
+                 "title,external_id\n"
+                 "Already here again,E-1\n"
+                 "New one,E-2\n"
+                 "Repeated row,E-2\n"
+                 "No key,\n")
+    result = import_file(path, workers=1)
+    assert (result.rows, result.skipped) == (4, 2)
+    assert [t.title for t in result.tasks] == ["New one", "No key"]
+
+    on_disk = read_tasks()
+    ids = [t.id for t in on_disk]
+    assert len(ids) == len(set(ids)) == 4
+    assert min(t.id for t in result.tasks) > max(t.id for t in existing)
+
+
+def test_dry_run_leaves_the_store_alone(store):
+    save_tasks(assign_task_ids([Task("Existing")]))
+    path = write(store / "dump.csv", "title\nNew\n")
+    result = import_file(path, workers=1, dry_run=True)
+    assert [t.title for t in result.tasks] == ["New"]
+    assert [t.title for t in read_tasks()] == ["Existing"]
+
+
+def test_import_reports_near_duplicate_titles(store):
+    save_tasks(assign_task_ids([Task("Renew the domain name")]))
+    path = write(store / "dump.csv", "title\nRenew domain name\nBook flights\n")
+    result = import_file(path, workers=1)
+    assert result.duplicate_count == 1
+    task, similarity, existing = result.duplicates[0]
+    assert task.title == "Renew domain name" and existing.title == "Renew the domain name"
+    assert similarity >= 0.5
+    assert len(read_tasks()) == 3  # Possible duplicates are still imported
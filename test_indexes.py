@@ -0,0 +1,187 @@
+"""Tests for the in-memory task indexes (indexes.py), driven through task_manager's helpers"""
+from datetime import date
+
+import pytest
+
+import task_manager
+from task_manager import (Task, add_task, assign_task_ids, delete_task, edit_task, mark_task_done,
+                          set_task_status)
+from indexes import CompletionIndex, DependencyIndex, SubtaskIndex, TagIndex, find_dependency_cycle
+
+
+@pytest.fixture
+def listen():
+    """Register indexes as change listeners for one test"""
+    added = []
+
+    def register(index):
+        task_manager.add_change_listener(index.on_change)
+        added.append(index)
+        return index
+
+    yield register
+    for index in added:
+        task_manager.remove_change_listener(index.on_change)
+
+
+def done(title, completion_date):
+    return Task(title, status="Done", completion_date=completion_date)
+
+
+# --------------------------
+# CompletionIndex
+# --------------------------
+
+def test_completion_range_is_inclusive_and_sorted():
+    tasks = assign_task_ids([done("c", "2026-03-03"), done("a", "2026-03-01"), Task("open"),
+                             done("b", "2026-03-02"), done("undated", None), done("bad", "03/01/2026")])
+    index = CompletionIndex(tasks)
+    assert [t.title for t in index.range("2026-03-01", "2026-03-02")] == ["a", "b"]
+    assert [t.title for t in index.range("2026-03-02")] == ["b", "c"]
+    # Only an unbounded range lists done tasks without a completion date
+    assert [t.title for t in index.range()] == ["a", "b", "c", "undated"]
+    assert len(index) == 4
+
+
+def test_completion_index_follows_changes(listen):
+    tasks = []
+    index = listen(CompletionIndex())
+    add_task(tasks, Task("first"), save=False)
+    add_task(tasks, done("old", "2026-01-05"), save=False)
+    mark_task_done(tasks, 0, save=False)
+    assert [t.title for t in index.range("2026-01-01", "2026-01-31")] == ["old"]
+    assert tasks[0] in index.range()
+
+    set_task_status(tasks, 0, "Pending", save=False)
+    assert tasks[0] not in index.range()
+    edit_task(tasks, 1, done("old", "2026-02-05"), save=False)
+    assert index.range("2026-01-01", "2026-01-31") == []
+    delete_task(tasks, 1, save=False)
+    assert index.range() == []
+
+
+# --------------------------
+# SubtaskIndex
+# --------------------------
+
+def tree():
+    """root -> (a -> a1, b); a1 is Done"""
+    return assign_task_ids([Task("root"), Task("a"), Task("b"), Task("a1", status="Done")])
+
+
+def link(tasks):
+    root, a, b, a1 = tasks
+    a.parent_id = b.parent_id = root.id
+    a1.parent_id = a.id
+    return tasks
+
+
+def test_rollups_count_all_descendants():
+    root, a, b, a1 = tasks = link(tree())
+    index = SubtaskIndex(tasks)
+    assert index.rollup(root.id) == (1, 3)
+    assert index.rollup(a.id) == (1, 1)
+    assert index.rollup(b.id) is None
+    assert [t.title for t in index.children(root.id)] == ["a", "b"]
+    assert sorted(index.descendant_ids(root.id)) == sorted([a.id, b.id, a1.id])
+    assert index.is_root(root) and not index.is_root(a1)
+
+
+def test_rollups_follow_status_and_parent_changes(listen):
+    tasks = link(tree())
+    root, a, b, a1 = tasks
+    index = listen(SubtaskIndex(tasks))
+    mark_task_done(tasks, 2, save=False)
+    assert index.rollup(root.id) == (2, 3)
+    moved = Task.from_dict(a1.to_dict())
+    moved.parent_id = b.id
+    edit_task(tasks, 3, moved, save=False)
+    assert index.rollup(a.id) is None and index.rollup(b.id) == (1, 1)
+    assert index.rollup(root.id) == (2, 3)
+
+
+def test_orphans_and_cycles_show_at_the_top_level(listen):
+    tasks = link(tree())
+    root, a, b, a1 = tasks
+    index = listen(SubtaskIndex(tasks))
+    delete_task(tasks, 1, save=False)  # a1 keeps its parent_id but has no parent any more
+    assert index.is_root(a1)
+    assert index.rollup(root.id) == (0, 1)
+
+    looped = Task.from_dict(root.to_dict())
+    looped.parent_id = b.id  # b is root's own child
+    edit_task(tasks, 0, looped, save=False)
+    assert index.is_root(looped)
+
+
+# --------------------------
+# DependencyIndex
+# --------------------------
+
+def chain(*deadlines):
+    """Tasks where each one is blocked by the one before it"""
+    tasks = assign_task_ids([Task(f"t{i}", deadline=deadline) for i, deadline in enumerate(deadlines)])
+    for blocker, task in zip(tasks, tasks[1:]):
+        task.blocked_by = [blocker.id]
+    return tasks
+
+
+def test_ready_tasks_follow_their_blockers(listen):
+    tasks = chain(None, None, None)
+    index = listen(DependencyIndex(tasks))
+    assert [t.title for t in index.ready()] == ["t0"]
+    assert index.open_blockers(tasks[1].id) == 1
+    mark_task_done(tasks, 0, save=False)
+    assert [t.title for t in index.ready()] == ["t1"]
+    set_task_status(tasks, 0, "Pending", save=False)
+    assert [t.title for t in index.ready()] == ["t0"]
+    delete_task(tasks, 0, save=False)  # A blocker that no longer exists blocks nothing
+    assert [t.title for t in index.ready()] == ["t1"]
+
+
+def test_cycles_are_detected_before_they_are_made():
+    tasks = chain(None, None, None)
+    index = DependencyIndex(tasks)
+    first, _, last = tasks
+    assert index.would_cycle(first.id, [last.id]) == [first.id, tasks[1].id, last.id]
+    assert index.would_cycle(last.id, [first.id]) is None
+    assert find_dependency_cycle(1, [1], lambda task_id: ()) == [1]
+
+
+def test_critical_path_and_schedule_risks():
+    today = date(2026, 3, 2)
+    tasks = chain(None, None, "2026-03-03")
+    index = DependencyIndex(tasks)
+    assert index.critical_path(tasks[2].id) == [t.id for t in tasks]
+    risks = index.schedule_risks(today)
+    assert [(task.title, days_left) for task, _, days_left in risks] == [("t2", 1)]
+    assert index.schedule_risks(date(2026, 2, 20)) == []  # Enough days left for the chain
+
+
+# --------------------------
+# TagIndex
+# --------------------------
+
+def test_tag_counts_and_suggestions(listen):
+    tasks = []
+    index = listen(TagIndex())
+    for tags in (["Work", "home"], ["work"], ["work", "writing"], ["Work"]):
+        add_task(tasks, Task("t", tags=tags), save=False)
+    assert index.most_used() == [("Work", 2), ("work", 2), ("home", 1), ("writing", 1)]
+    assert index.suggest("w") == ["Work", "work", "writing"]
+    assert index.suggest("WR") == ["writing"]
+    assert index.suggest("w", exclude={"work"}) == ["Work", "writing"]
+    assert index.suggest("x") == []
+
+
+def test_tags_follow_edits_and_deletes(listen):
+    tasks = []
+    index = listen(TagIndex())
+    add_task(tasks, Task("t", tags=["alpha", "beta"]), save=False)
+    version = index.version
+    edit_task(tasks, 0, Task("t", tags=["beta", "gamma"]), save=False)
+    assert index.version > version
+    assert index.counts == {"beta": 1, "gamma": 1}
+    assert index.suggest("a") == []  # The pruned branch suggests nothing
+    delete_task(tasks, 0, save=False)
+    assert len(index) == 0 and index.suggest("") == []
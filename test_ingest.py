@@ -0,0 +1,120 @@
+"""Tests for streaming JSONL command ingestion (ingest.py)"""
+import json
+
+import pytest
+
+from task_manager import Task, assign_task_ids
+from ingest import ingest_lines
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Run against a scratch tasks.json / task_history.bin in a temporary directory"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def ingest(tasks, *commands, chunk_size=1000):
+    """Feed commands (dicts or raw lines) without writing tasks.json"""
+    lines = [c if isinstance(c, str) else json.dumps(c) for c in commands]
+    return ingest_lines(lines, tasks, chunk_size, commit=lambda tasks: None)
+
+
+def test_create_update_complete_delete(store):
+    tasks = []
+    stats = ingest(tasks,
+                   {"op": "create", "external_id": "A", "task": {"title": "Alpha"}},
+                   {"op": "create", "external_id": "B", "task": {"title": "Beta"}},
+                   {"op": "update", "external_id": "A", "task": {"priority": "High"}},
+                   {"op": "complete", "external_id": "B", "remarks": "auto"},
+                   {"op": "delete", "external_id": "A"})
+    assert (stats.created, stats.updated, stats.completed, stats.deleted) == (2, 1, 1, 1)
+    assert [(t.title, t.status, t.remarks) for t in tasks] == [("Beta", "Done", "auto")]
+
+
+def test_replaying_a_feed_changes_nothing(store):
+    tasks = []
+    feed = [{"op": "create", "external_id": "A", "task": {"title": "Alpha"}},
+            {"op": "complete", "external_id": "A"},
+            {"op": "delete", "external_id": "missing"}]
+    ingest(tasks, *feed)
+    stats = ingest(tasks, *feed)
+    assert (stats.duplicates, stats.unchanged, stats.commits) == (1, 2, 0)
+    assert len(tasks) == 1
+
+
+def test_tasks_spawned_by_recurring_completion_get_unique_ids(store):
+    tasks = assign_task_ids([Task("Water plants", deadline="2026-01-05",
+                                  recurrence={"freq": "weekly", "interval": 1, "start": "2026-01-05"})])
+    series_id = tasks[0].id
+    spawned_id = series_id + 1  # Ids are handed out in order
+    stats = ingest(tasks,
+                   {"op": "complete", "id": series_id},
+                   {"op": "update", "id": spawned_id, "task": {"priority": "High"}},
+                   {"op": "create", "external_id": "N", "task": {"title": "Next"}},
+                   {"op": "delete", "id": series_id},
+                   {"op": "update", "external_id": "N", "task": {"priority": "Low"}})
+    assert stats.rejected == 0
+    ids = [t.id for t in tasks]
+    assert len(ids) == len(set(ids)) == 2
+    spawned, created = tasks
+    assert (spawned.id, spawned.series_id, spawned.status, spawned.priority) == \
+        (spawned_id, series_id, "Pending", "High")
+    assert (created.external_id, created.priority) == ("N", "Low")
+
+
+def test_malformed_lines_are_rejected_and_the_feed_goes_on(store):
+    tasks = assign_task_ids([Task("Existing")])
+    stats = ingest(tasks,
+                   '{"op": "create", "task": {"title": ',
+                   {"op": "create", "task": 5},
+                   {"op": "update", "id": [1], "task": {}},
+                   {"op": "complete", "id": {"x": 1}},
+                   {"op": "delete", "id": True},
+                   {"op": "complete", "id": tasks[0].id, "remarks": ["no"]},
+                   {"op": "create", "task": {"title": ""}},
+                   {"op": "rename"},
+                   {"op": "create", "task": {"title": "Still created"}},
+                   {"op": "update", "id": str(tasks[0].id), "task": {"priority": "High"}})
+    assert [line_no for line_no, _ in stats.rejects] == [1, 2, 3, 4, 5, 6, 7, 8]
+    assert stats.rejects[1][1] == "task must be a JSON object"
+    assert stats.rejects[2][1] == "id must be an integer"
+    assert [(t.title, t.priority, t.status) for t in tasks] == \
+        [("Existing", "High", "Pending"), ("Still created", "Medium", "Pending")]
+
+
+def test_status_updates_complete_and_reopen_tasks(store):
+    tasks = []
+    ingest(tasks,
+           {"op": "create", "external_id": "A", "task": {"title": "Alpha"}},
+           {"op": "update", "external_id": "A", "task": {"status": "Done", "remarks": "shipped"}})
+    task = tasks[0]
+    assert (task.status, task.remarks) == ("Done", "shipped")
+    assert task.completion_date is not None
+
+    ingest(tasks, {"op": "update", "external_id": "A", "task": {"status": "Pending"}})
+    task = tasks[0]
+    assert (task.status, task.completion_date, task.remarks) == ("Pending", None, None)
+
+
+def test_status_update_spawns_the_next_occurrence(store):
+    tasks = []
+    ingest(tasks,
+           {"op": "create", "external_id": "R",
+            "task": {"title": "Standup", "deadline": "2026-01-05",
+                     "recurrence": {"freq": "daily", "interval": 1, "start": "2026-01-05"}}},
+           {"op": "update", "external_id": "R", "task": {"status": "Done"}})
+    assert [t.status for t in tasks] == ["Done", "Pending"]
+    assert tasks[1].series_id == tasks[0].id
+
+
+def test_unhashable_recurrence_freq_rejects_only_its_line(store):
+    tasks = []
+    stats = ingest(tasks,
+                   {"op": "create", "external_id": "A", "task": {"title": "good"}},
+                   {"op": "create", "external_id": "B",
+                    "task": {"title": "bad", "recurrence": {"freq": ["daily"], "start": "2026-01-01"}}},
+                   {"op": "create", "external_id": "C", "task": {"title": "also good"}})
+    assert stats.created == 2
+    assert [(line, "freq" in reason) for line, reason in stats.rejects] == [(2, True)]
+    assert [t.external_id for t in tasks] == ["A", "C"]
@@ -0,0 +1,82 @@
+"""Tests for memory attribution and the diffable report (memprofile.py)"""
+import sys
+import tracemalloc
+
+import pytest
+
+import memprofile
+from memprofile import attribute, phase, traced, write_report
+from rows import format_task_row
+from task_manager import Task
+
+
+@pytest.fixture
+def phases(monkeypatch):
+    """Record phases into an empty table with tracemalloc running"""
+    monkeypatch.setattr(memprofile, "_phases", {})
+    tracemalloc.start()
+    yield memprofile._phases
+    tracemalloc.stop()
+
+
+def test_attribute_counts_each_kind_of_object():
+    tasks = [Task("One", tags=["a", "b"]), Task("Two", tags=["a"]), Task("Three")]
+    rows = [format_task_row(task) for task in tasks]
+    lines = ["line 1\n", "line 2\n", "line 3\n", "line 4\n"]
+    categories = attribute(tasks, rows, lines)
+    assert {name: count for name, (count, _) in categories.items()} == {
+        "task_objects": 3, "task_fields": 3, "tag_lists": 3, "row_tuples": 3, "report_strings": 4}
+    assert categories["report_strings"][1] == sum(sys.getsizeof(line) for line in lines)
+    assert attribute(report_text="whole report")["report_strings"] == (1, sys.getsizeof("whole report"))
+    assert attribute()["task_objects"] == (0, 0)
+
+
+def test_shared_strings_are_counted_once():
+    shared = "shared-tag"
+    one = attribute([Task("x", tags=[shared])])["tag_lists"]
+    two = attribute([Task("x", tags=[shared]), Task("y", tags=[shared])])["tag_lists"]
+    # The second task adds its list but not the string both lists point to
+    assert two[0] == 2 and two[1] - one[1] == sys.getsizeof([shared])
+
+
+def run_workload():
+    @traced("build")
+    def build():
+        return [Task(f"task {i}", tags=[f"tag{i % 7}"]) for i in range(500)]
+
+    with phase("load"):
+        tasks = build()
+    with phase("report"):
+        text = "".join(f"{task.title}\n" for task in tasks)
+    return tasks, text
+
+
+def skeleton(path):
+    """Report lines without their numbers: what must not move between runs"""
+    with open(path, encoding="utf-8") as f:
+        return [line.split()[0] if line.strip() else "" for line in f]
+
+
+def test_phases_nest_and_record_calls(phases):
+    run_workload()
+    run_workload()
+    assert list(phases) == ["build", "load", "report"]  # In the order they first finished
+    assert [phases[name][0] for name in phases] == [2, 2, 2]
+    calls, allocated, peak, sites = phases["load"]
+    assert allocated > 0 and peak > 0 and sites
+
+
+def test_report_line_order_is_stable_between_runs(phases, tmp_path):
+    paths = []
+    for run in range(2):
+        phases.clear()
+        tasks, text = run_workload()
+        path = tmp_path / f"run{run}.txt"
+        write_report(str(path), {"source": "test", "python": "3"},
+                     attribute(tasks, [], text))
+        paths.append(path)
+    first, second = (skeleton(path) for path in paths)
+    assert first == second
+    assert first[:4] == ["#", "#", "", "[phases]"]
+    objects = first.index("[objects]")
+    assert first[objects + 1:objects + 6] == sorted(attribute())
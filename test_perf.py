@@ -0,0 +1,99 @@
+"""Tests for the timing instrumentation (perf.py)"""
+import json
+
+import pytest
+
+import perf
+from perf import _Histogram
+
+
+@pytest.fixture
+def recording():
+    """Record spans for one test, starting from an empty slate"""
+    was_enabled = perf.is_enabled()
+    perf.reset()
+    perf.enable(True)
+    yield
+    perf.enable(was_enabled)
+    perf.reset()
+
+
+def stats_by_name():
+    return {row[0]: row[1:] for row in perf.stats()}
+
+
+def test_percentiles_are_bucket_upper_bounds():
+    h = _Histogram()
+    assert h.percentile(0.5) == 0.0
+    for ms in range(1, 101):
+        h.add(ms / 1000)
+    for fraction in (0.50, 0.95, 0.99):
+        exact = fraction * 100 / 1000
+        # Never below the true value and at most one bucket (~19%) above it
+        assert exact <= h.percentile(fraction) <= exact * 2 ** (1 / perf.BUCKETS_PER_OCTAVE)
+    assert h.percentile(1.0) == h.max == 0.1  # Capped at the slowest sample
+    assert (h.count, round(h.total, 6)) == (100, 5.05)
+
+
+def test_sub_microsecond_samples_share_the_first_bucket():
+    h = _Histogram()
+    h.add(0.0)
+    h.add(5e-7)
+    assert h.buckets == {0: 2}
+    assert h.percentile(0.99) == 5e-7
+
+
+def test_timed_records_each_call(recording):
+    @perf.timed("op.named")
+    def named():
+        return 42
+
+    @perf.timed()
+    def anonymous():
+        raise ValueError("boom")
+
+    assert [named() for _ in range(3)] == [42] * 3
+    with pytest.raises(ValueError):
+        anonymous()
+    stats = stats_by_name()
+    assert stats["op.named"][0] == 3
+    # Failed calls are timed too, under the function's qualified name by default
+    assert stats[anonymous.__qualname__][0] == 1
+    count, p50, p95, p99, peak = stats["op.named"]
+    assert 0 <= p50 <= p95 <= p99 <= peak
+
+
+def test_nothing_is_recorded_while_disabled(recording):
+    perf.enable(False)
+
+    @perf.timed("op.off")
+    def op():
+        return "result"
+
+    assert op() == "result"
+    with perf.span("span.off"):
+        pass
+    assert perf.stats() == []
+
+
+def test_chrome_trace_export(recording, tmp_path):
+    with perf.span("outer"):
+        with perf.span("inner"):
+            pass
+    perf.record("manual", perf._origin + 0.5, 0.25)
+    path = tmp_path / "trace.json"
+    assert perf.export_chrome_trace(str(path)) == 3
+
+    trace = json.loads(path.read_text(encoding="utf-8"))
+    events = trace["traceEvents"]
+    assert [e["name"] for e in events] == ["inner", "outer", "manual"]  # In the order they finished
+    assert all(e["ph"] == "X" and {"pid", "tid", "ts", "dur"} <= e.keys() for e in events)
+    assert (events[2]["ts"], events[2]["dur"]) == (500000.0, 250000.0)  # Microseconds from the origin
+    inner, outer = events[0], events[1]
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"] + 1
+
+
+def test_empty_trace_is_valid_json(recording, tmp_path):
+    path = tmp_path / "trace.json"
+    assert perf.export_chrome_trace(str(path)) == 0
+    assert json.loads(path.read_text(encoding="utf-8"))["traceEvents"] == []
@@ -0,0 +1,96 @@
+"""Tests for recurrence rules and the occurrences they spawn (recurrence.py, task_manager.py)"""
+from datetime import date, timedelta
+
+import pytest
+
+from recurrence import (describe, first_on_or_after, iter_occurrences, next_occurrence_number, occurrence_date,
+                        parse_rule, validate_rule)
+from task_manager import Task, assign_task_ids, mark_task_done
+
+START = date(2026, 1, 31)
+
+
+@pytest.mark.parametrize("text", ["daily", "weekly", "every 2 weeks until 2026-12-31", "monthly for 6",
+                                  "every 3 days"])
+def test_parse_and_describe_round_trip(text):
+    rule = parse_rule(text, START)
+    assert describe(rule) == text
+    assert parse_rule(describe(rule), START) == rule
+
+
+def test_parse_rejects_nonsense():
+    assert parse_rule("  Never ", START) is None
+    with pytest.raises(ValueError):
+        parse_rule("fortnightly", START)
+    with pytest.raises(ValueError):
+        validate_rule({"freq": "daily", "interval": 0, "start": "2026-01-01"})
+    with pytest.raises(ValueError):
+        validate_rule({"freq": "daily", "start": "01/01/2026"})
+
+
+@pytest.mark.parametrize("freq", [["daily"], {"daily": 1}, None, 7])
+def test_validate_rejects_non_string_freq(freq):
+    with pytest.raises(ValueError, match="freq"):
+        validate_rule({"freq": freq, "start": "2026-01-01"})
+
+
+def test_count_is_described_as_what_remains():
+    assert describe(parse_rule("monthly for 6", START), occurrence=4) == "monthly for 3"
+
+
+def test_monthly_dates_clamp_to_short_months():
+    rule = parse_rule("monthly", START)
+    assert [occurrence_date(rule, n) for n in (1, 2, 3)] == [START, date(2026, 2, 28), date(2026, 3, 31)]
+
+
+def test_series_end():
+    assert occurrence_date(parse_rule("weekly for 2", START), 3) is None
+    assert occurrence_date(parse_rule("daily until 2026-02-01", START), 3) is None
+    assert occurrence_date(parse_rule("daily", START), 0) is None
+
+
+@pytest.mark.parametrize("text", ["daily", "every 2 weeks", "monthly", "every 3 months"])
+def test_first_on_or_after_matches_a_scan(text):
+    rule = parse_rule(text, START)
+    for offset in range(0, 120, 7):
+        day = START + timedelta(days=offset)
+        n = first_on_or_after(rule, day)
+        assert occurrence_date(rule, n) >= day
+        assert n == 1 or occurrence_date(rule, n - 1) < day
+
+
+def test_iter_occurrences_window():
+    rule = parse_rule("weekly", START)
+    found = list(iter_occurrences(rule, date(2026, 2, 5), date(2026, 2, 28), after=1))
+    assert found == [(2, date(2026, 2, 7)), (3, date(2026, 2, 14)), (4, date(2026, 2, 21)), (5, date(2026, 2, 28))]
+
+
+def test_next_occurrence_skips_the_past():
+    rule = parse_rule("daily", START)
+    assert next_occurrence_number(rule, 1, date(2026, 2, 10)) == 11
+    assert next_occurrence_number(parse_rule("daily for 3", START), 3, START) is None
+
+
+def test_completing_an_occurrence_spawns_the_next():
+    today = date.today()
+    rule = parse_rule("weekly", today)
+    tasks = assign_task_ids([Task("Review", deadline=today.isoformat(), priority="High", tags=["team"],
+                                  remind_at=f"{today.isoformat()} 09:00", recurrence=rule, occurrence=1)])
+    spawned = mark_task_done(tasks, 0, save=False)
+    assert tasks[-1] is spawned
+    assert (spawned.occurrence, spawned.series_id, spawned.status) == (2, tasks[0].id, "Pending")
+    assert spawned.deadline == (today + timedelta(weeks=1)).isoformat()
+    assert spawned.remind_at == f"{spawned.deadline} 09:00"
+    assert (spawned.priority, spawned.tags) == ("High", ["team"])
+
+    # Reopening and completing the first occurrence again must not spawn a second open row
+    tasks[0].status = "Pending"
+    assert mark_task_done(tasks, 0, save=False) is None
+    assert len(tasks) == 2
+
+
+def test_finished_series_spawns_nothing():
+    today = date.today()
+    tasks = assign_task_ids([Task("Once", recurrence=parse_rule("daily for 1", today), occurrence=1)])
+    assert mark_task_done(tasks, 0, save=False) is None
+    assert len(tasks) == 1
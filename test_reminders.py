@@ -0,0 +1,99 @@
+"""Tests for deadline and reminder notifications (reminders.py)"""
+from datetime import datetime
+
+import pytest
+
+import reminders
+from reminders import MAX_TIMER_MS, ReminderScheduler
+from task_manager import Task, assign_task_ids
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now.timestamp()
+
+    def time(self):
+        return self.now
+
+
+class FakeRoot:
+    """Records after() timers instead of running a Tk event loop"""
+
+    def __init__(self):
+        self.timers = {}
+        self._next = 0
+
+    def after(self, ms, callback):
+        self._next += 1
+        self.timers[self._next] = (ms, callback)
+        return self._next
+
+    def after_cancel(self, timer):
+        del self.timers[timer]
+
+    def delay(self):
+        (ms, _), = self.timers.values()
+        return ms
+
+    def fire(self):
+        (timer, (_, callback)), = self.timers.items()
+        del self.timers[timer]
+        callback()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(datetime(2026, 3, 2, 8, 0))
+    monkeypatch.setattr(reminders.time, "time", clock.time)
+    return clock
+
+
+@pytest.fixture
+def scheduler():
+    notified = []
+    root = FakeRoot()
+    return ReminderScheduler(root, notified.extend), root, notified
+
+
+def test_one_timer_for_the_earliest_event(clock, scheduler):
+    reminder, root, notified = scheduler
+    tasks = assign_task_ids([Task("report", deadline="2026-03-02"),
+                             Task("call", remind_at="2026-03-02 08:30")])
+    reminder.rebuild(tasks)
+    assert len(root.timers) == 1 and root.delay() == 30 * 60 * 1000
+    assert [kind for _, _, kind in reminder.upcoming()] == ["reminder", "due", "overdue"]
+
+    clock.now = datetime(2026, 3, 2, 9, 0).timestamp()
+    root.fire()
+    assert [(task.title, kind) for _, task, kind in notified] == [("call", "reminder"), ("report", "due")]
+    assert root.delay() == MAX_TIMER_MS  # The overdue event is 15 hours away
+
+
+def test_changed_and_deleted_tasks_drop_their_old_events(clock, scheduler):
+    reminder, root, notified = scheduler
+    task = assign_task_ids([Task("call", remind_at="2026-03-02 08:30")])[0]
+    reminder.rebuild([task])
+    moved = Task("call", id=task.id, remind_at="2026-03-02 08:45")
+    reminder.on_change("edit", moved, task)
+    assert root.delay() == 45 * 60 * 1000
+    reminder.on_change("status", Task("call", id=task.id, status="Done", remind_at="2026-03-02 08:45"))
+    assert reminder.upcoming() == [] and root.timers == {}
+
+    reminder.on_change("edit", moved)
+    reminder.on_change("delete", moved)
+    clock.now = datetime(2026, 3, 3).timestamp()
+    assert reminder.upcoming() == [] and notified == []
+
+
+def test_past_events_are_not_raised(clock, scheduler):
+    reminder, root, notified = scheduler
+    reminder.rebuild(assign_task_ids([Task("late", deadline="2026-03-01", remind_at="2026-03-01 10:00"),
+                                      Task("bad", deadline="soon", remind_at="tomorrow")]))
+    assert reminder.upcoming() == [] and root.timers == {}
+
+
+def test_stop_cancels_the_timer(clock, scheduler):
+    reminder, root, _ = scheduler
+    reminder.rebuild(assign_task_ids([Task("call", remind_at="2026-03-02 08:30")]))
+    reminder.stop()
+    assert root.timers == {}
@@ -0,0 +1,97 @@
+"""Tests for the report export formats (renderers.py)"""
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from analytics import compute_metrics
+from history import TaskHistory
+from renderers import RENDERERS, CSVRenderer, HTMLRenderer, JSONRenderer, MarkdownRenderer, TextRenderer
+from report import group_report_tasks, report_extras
+from task_manager import Task, assign_task_ids
+from timelog import TimeLog
+
+
+@pytest.fixture
+def report_args():
+    """Report arguments with every extra section filled in"""
+    today = date.today()
+    tasks = assign_task_ids([
+        Task("Ship *v2* [beta]", deadline=(today + timedelta(days=1)).isoformat(), tags=["release"]),
+        Task("Write | docs #3"),
+        Task("Fix `build`", status="In Progress"),
+        Task("Standup", deadline=today.isoformat(),
+             recurrence={"freq": "daily", "interval": 1, "start": today.isoformat()}, occurrence=1),
+        Task("Old bug", status="Done", completion_date=today.isoformat(), remarks="done <b>early</b>"),
+    ])
+    tasks[0].blocked_by = [tasks[1].id]
+    tasks[1].blocked_by = [tasks[2].id]
+
+    history = TaskHistory()
+    start = datetime.combine(today - timedelta(days=3), datetime.min.time())
+    history.record(tasks[4].id, "In Progress", start)
+    history.record(tasks[4].id, "Done", start + timedelta(days=2))
+    time_log = TimeLog()
+    time_log.rebuild(tasks)
+    time_log.start(tasks[0].id, start.timestamp())
+    time_log.stop(tasks[0].id, start.timestamp() + 5400)
+
+    groups = group_report_tasks(tasks)
+    extras = report_extras(tasks, groups[0], time_totals=time_log.totals(),
+                           metrics=compute_metrics(tasks, history))
+    return groups + ("", "", extras)
+
+
+def render(renderer, report_args):
+    return "".join(renderer.iter_chunks(report_args))
+
+
+def test_every_format_has_the_extra_sections(report_args):
+    text = render(TextRenderer(), report_args)
+    for heading in ("DEADLINES AT RISK", "RECURRING", "TIME TRACKED (1h 30m)", "FLOW METRICS"):
+        assert heading in text
+    for renderer in (MarkdownRenderer(), HTMLRenderer()):
+        document = render(renderer, report_args)
+        for heading in ("Deadlines at Risk", "Recurring", "Time Tracked (1h 30m)", "Flow Metrics"):
+            assert heading in document, (renderer.name, heading)
+
+    data = json.loads(render(JSONRenderer(), report_args))
+    assert [row["title"] for row in data["at_risk"]] == ["Ship *v2* [beta]"]
+    assert data["at_risk"][0]["chain"] == ["Fix `build`", "Write | docs #3", "Ship *v2* [beta]"]
+    assert data["recurring"][0]["title"] == "Standup"
+    assert data["time_tracked"]["seconds"] == 5400
+    assert data["metrics"]["cycle_time_days"]["count"] == 1
+
+    rows = list(csv.DictReader(io.StringIO(render(CSVRenderer(), report_args))))
+    sections = {row["section"] for row in rows}
+    assert {"done", "in_progress", "pending", "at_risk", "recurring", "time_tracked",
+            "metrics:throughput"} <= sections
+    assert next(row for row in rows if row["section"] == "time_tracked")["value"] == "5400"
+
+
+def test_reports_without_extras_still_render():
+    report_args = ([], [], assign_task_ids([Task("Only task")]), "2026-01-01", "")
+    for renderer in RENDERERS:
+        assert "Only task" in render(renderer, report_args)
+    assert list(json.loads(render(JSONRenderer(), report_args))) == ["start", "end", "done", "in_progress",
+                                                                     "pending"]
+
+
+def test_markdown_escapes_inline_syntax(report_args):
+    document = render(MarkdownRenderer(), report_args)
+    assert "- Ship \\*v2\\* \\[beta\\]" in document
+    assert "- Write \\| docs \\#3" in document
+    assert "Fix \\`build\\`" in document
+    assert "  - done \\<b\\>early\\</b\\>" in document
+
+
+def test_markdown_escape_keeps_each_title_on_its_line():
+    assert MarkdownRenderer._escape("two\nlines") == "two lines"
+    assert MarkdownRenderer._code("a`b") == "`` a`b ``"
+
+
+def test_html_escapes_titles(report_args):
+    document = render(HTMLRenderer(), report_args)
+    assert "<b>" not in document and "&lt;b&gt;early&lt;/b&gt;" in document
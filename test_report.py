@@ -0,0 +1,97 @@
+"""Tests for report formatting and the report cache (report.py)"""
+from datetime import date
+
+import pytest
+
+import report
+from report import ReportCache, format_report, iter_report_args_lines, iter_report_lines, report_extras
+from task_manager import Task, assign_task_ids
+
+
+class FakeDate(date):
+    current = date(2026, 3, 2)
+
+    @classmethod
+    def today(cls):
+        return cls.current
+
+
+def report_args(size, start="", end=""):
+    """Report arguments listing size tasks"""
+    return [Task("done", status="Done")] * size, [], [], start, end
+
+
+GROUPS = (
+    [Task("Shipped", status="Done", completion_date="2026-03-01", tags=["release"], remarks="on time"),
+     Task("Closed", status="Done")],
+    [Task("Writing", status="In Progress", deadline="2026-03-05", priority="High", tags=["docs", "web"])],
+    [Task("Later", priority="Low"), Task("Someday")],
+)
+
+
+@pytest.mark.parametrize("groups, start, end", [
+    (GROUPS, "", ""),
+    (GROUPS, "2026-03-01", ""),
+    (([], [], []), "", "2026-03-31"),
+])
+def test_streamed_lines_match_format_report(groups, start, end):
+    streamed = list(iter_report_lines(*groups, start, end))
+    assert streamed == format_report(*groups, start, end).splitlines(keepends=True)
+    assert all(line.endswith("\n") and line.count("\n") == 1 for line in streamed)
+    assert list(iter_report_args_lines(groups + (start, end))) == streamed
+
+
+def test_extra_sections_follow_the_task_lists():
+    tasks = assign_task_ids([Task("Blocker", deadline="2026-03-03", effort=40.0), Task("Waits")])
+    tasks[1].blocked_by = [tasks[0].id]
+    tasks[1].deadline = "2026-03-04"
+    extras = report_extras(tasks, [], time_totals=None)
+    lines = list(iter_report_args_lines(GROUPS + ("", "", extras)))
+    base = format_report(*GROUPS, "", "").splitlines(keepends=True)
+    assert lines[:len(base)] == base and len(lines) > len(base)
+
+
+def test_reports_are_reused_until_a_change_affects_them():
+    cache = ReportCache()
+    token = cache.begin(("2026-01-01", "2026-01-31"))
+    args = report_args(1, "2026-01-01", "2026-01-31")
+    assert cache.put(("2026-01-01", "2026-01-31"), token, args)
+    assert cache.get(("2026-01-01", "2026-01-31")) is args
+    cache.on_change("edit", Task("Old", id=1, status="Done", completion_date="2026-02-10"))
+    assert cache.get(("2026-01-01", "2026-01-31")) is not None
+    cache.on_change("add", Task("Open", id=2))
+    assert cache.get(("2026-01-01", "2026-01-31")) is None
+
+
+def test_reports_are_dropped_after_midnight(monkeypatch):
+    monkeypatch.setattr(report, "date", FakeDate)
+    cache = ReportCache()
+    key = ("", "")
+    cache.put(key, cache.begin(key), report_args(1))
+    in_flight = cache.begin(("2026-03-01", ""))
+    assert cache.get(key) is not None
+
+    monkeypatch.setattr(FakeDate, "current", date(2026, 3, 3))
+    assert cache.get(key) is None
+    # A build started yesterday must not be stored either
+    assert not cache.put(("2026-03-01", ""), in_flight, report_args(1))
+
+
+def test_cache_is_bounded_by_the_tasks_it_lists():
+    cache = ReportCache(max_tasks=10)
+    for key, size in ((("a", ""), 4), (("b", ""), 4)):
+        assert cache.put(key, cache.begin(key), report_args(size))
+    cache.get(("a", ""))  # Now the most recently used
+    assert cache.put(("c", ""), cache.begin(("c", "")), report_args(5))
+    assert (cache.get(("b", "")), len(cache), cache.size) == (None, 2, 9)
+    assert cache.get(("a", "")) is not None
+
+    # A report bigger than the whole budget is shown but never kept
+    assert not cache.put(("d", ""), cache.begin(("d", "")), report_args(11))
+    assert cache.get(("d", "")) is None and cache.size == 9
+
+    # Replacing or invalidating an entry gives its share back
+    assert cache.put(("a", ""), cache.begin(("a", "")), report_args(1))
+    assert cache.size == 6
+    cache.on_change("add", Task("Open", id=2))
+    assert (len(cache), cache.size) == (0, 0)
@@ -0,0 +1,105 @@
+"""Tests for table row formatting and the row cache (rows.py)"""
+from datetime import date, datetime
+
+import pytest
+
+import rows
+import task_manager
+from rows import RowCache, format_task_row
+from task_manager import Task, add_task, assign_task_ids, edit_task, mark_task_done, set_task_status
+
+
+class FakeDate(date):
+    current = date(2026, 3, 2)
+
+    @classmethod
+    def today(cls):
+        return cls.current
+
+
+class FakeDatetime(datetime):
+    @classmethod
+    def today(cls):
+        return cls.combine(FakeDate.current, datetime.min.time())
+
+
+@pytest.fixture(autouse=True)
+def fixed_today(monkeypatch):
+    monkeypatch.setattr(rows, "date", FakeDate)
+    monkeypatch.setattr(task_manager, "datetime", FakeDatetime)
+    monkeypatch.setattr(FakeDate, "current", date(2026, 3, 2))
+
+
+@pytest.fixture
+def listen():
+    """Register a row cache as a change listener for one test"""
+    added = []
+
+    def register(cache):
+        task_manager.add_change_listener(cache.on_change)
+        added.append(cache)
+        return cache
+
+    yield register
+    for cache in added:
+        task_manager.remove_change_listener(cache.on_change)
+
+
+def test_format_task_row():
+    values, item_tags = format_task_row(Task("Ship", deadline="2026-03-01", priority="High", tags=["a", "b"]))
+    assert values == ("⬜", "🔴 High", "Ship", "2026-03-01", "a, b") and item_tags == ["overdue"]
+    values, item_tags = format_task_row(Task("Water", status="In Progress", recurrence={
+        "freq": "daily", "interval": 1, "start": "2026-03-02"}))
+    assert values == ("🔄", "🟡 Medium", "Water   🔁", "—", "—") and item_tags == ["in_progress"]
+
+
+def test_rows_are_reused_until_a_change_notification(listen):
+    tasks = assign_task_ids([Task("One"), Task("Two")])
+    cache = listen(RowCache())
+    first = cache.row(tasks[0])
+    assert cache.row(tasks[0]) == first and (cache.hits, cache.misses) == (1, 1)
+
+    set_task_status(tasks, 0, "In Progress", save=False)  # Mutated in place
+    assert cache.row(tasks[0]) != first and cache.misses == 2
+
+    renamed = Task("One, renamed", id=tasks[0].id)
+    edit_task(tasks, 0, renamed, save=False)  # Replaced: the old object's row goes too
+    assert cache.row(renamed)[0][2] == "One, renamed"
+    assert len(cache) == 1
+
+    add_task(tasks, Task("Three"), save=False)
+    mark_task_done(tasks, 1, save=False)
+    assert cache.row(tasks[1]) == (("✅", "🟡 Medium", "Two", "—", "—"), ["done"])
+
+
+def test_a_new_object_at_a_reused_address_is_not_served_a_stale_row():
+    cache = RowCache()
+    task = Task("Old")
+    cache.row(task)
+    impostor = Task("New")
+    cache._entries[id(impostor)] = (task,) + cache._entries.pop(id(task))[1:]  # Same key, other task
+    assert cache.row(impostor)[0][2] == "New"
+
+
+def test_day_rollover_restyles_overdue_rows():
+    cache = RowCache()
+    task = Task("Due today", deadline="2026-03-02")
+    assert cache.row(task)[1] == []
+    FakeDate.current = date(2026, 3, 3)
+    assert cache.row(task)[1] == []  # Still the cached row until the repaint checks the day
+    cache.check_day()
+    assert len(cache) == 0
+    assert cache.row(task)[1] == ["overdue"]
+
+
+def test_least_recently_used_rows_are_evicted():
+    cache = RowCache(max_entries=2)
+    a, b, c = Task("a"), Task("b"), Task("c")
+    cache.row(a)
+    cache.row(b)
+    cache.row(a)  # b is now the least recently used
+    cache.row(c)
+    assert cache.stats() == {"rows": 2, "max": 2, "hits": 1, "misses": 3, "evictions": 1}
+    cache.row(a)
+    cache.row(b)
+    assert (cache.hits, cache.misses) == (2, 4)
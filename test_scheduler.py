@@ -0,0 +1,97 @@
+"""Tests for the "Next up" ranking (scheduler.py)"""
+import random
+from datetime import date, timedelta
+
+import pytest
+
+import scheduler
+import task_manager
+from scheduler import DEADLINE_POINTS, TaskScheduler, score_parts
+from task_manager import Task, add_task, assign_task_ids, delete_task, edit_task, mark_task_done
+
+TODAY = date(2026, 3, 2)
+
+
+class FakeDate(date):
+    current = TODAY
+
+    @classmethod
+    def today(cls):
+        return cls.current
+
+
+@pytest.fixture(autouse=True)
+def fixed_today(monkeypatch):
+    monkeypatch.setattr(scheduler, "date", FakeDate)
+
+
+@pytest.fixture
+def listen():
+    """Register a scheduler as a change listener for one test"""
+    added = []
+
+    def register(index):
+        task_manager.add_change_listener(index.on_change)
+        added.append(index)
+        return index
+
+    yield register
+    for index in added:
+        task_manager.remove_change_listener(index.on_change)
+
+
+def due(days):
+    return (TODAY + timedelta(days=days)).isoformat()
+
+
+def test_score_parts():
+    parts = score_parts(Task("t", deadline=due(0), priority="High", status="In Progress", effort=2), TODAY)
+    assert parts == {"priority": 30, "in_progress": 20, "deadline": DEADLINE_POINTS, "effort": 5}
+    assert score_parts(Task("t", deadline=due(2)), TODAY)["deadline"] == DEADLINE_POINTS / 2
+    assert score_parts(Task("t", deadline=due(-3)), TODAY)["deadline"] == DEADLINE_POINTS + 6
+    assert "deadline" not in score_parts(Task("t", deadline="someday"), TODAY)
+
+
+def test_top_follows_changes(listen):
+    tasks = assign_task_ids([Task("later", deadline=due(10)), Task("soon", deadline=due(1)),
+                             Task("done", status="Done")])
+    ranking = listen(TaskScheduler(tasks))
+    assert [t.title for t in ranking.top(5)] == ["soon", "later"]
+    add_task(tasks, Task("today", deadline=due(0)), save=False)
+    assert [t.title for t in ranking.top(2)] == ["today", "soon"]
+    mark_task_done(tasks, 1, save=False)
+    edit_task(tasks, 0, Task("later", deadline=due(-1)), save=False)
+    assert [t.title for t in ranking.top(5)] == ["later", "today"]
+    delete_task(tasks, 0, save=False)
+    assert [t.title for t in ranking.top(5)] == ["today"]
+    assert ranking.score(tasks[0].id) is None  # "soon" is Done
+
+
+def test_blocked_tasks_are_skipped():
+    tasks = assign_task_ids([Task("urgent", deadline=due(0)), Task("calm")])
+    ranking = TaskScheduler(tasks)
+    assert [t.title for t in ranking.top(1, blocked=lambda task_id: task_id == tasks[0].id)] == ["calm"]
+
+
+def test_ranking_matches_a_full_sort(listen):
+    rng = random.Random(7)
+    tasks = []
+    ranking = listen(TaskScheduler())
+    for i in range(300):
+        add_task(tasks, Task(f"t{i}", deadline=due(rng.randint(-5, 30)), priority=rng.choice(["High", "Low"]),
+                             effort=rng.choice([None, 1, 8])), save=False)
+        if i % 3 == 0:
+            delete_task(tasks, rng.randrange(len(tasks)), save=False)
+    expected = sorted(tasks, key=lambda t: -sum(score_parts(t, TODAY).values()))
+    scores = [ranking.score(t.id) for t in ranking.top(50)]
+    assert scores == [sum(score_parts(t, TODAY).values()) for t in expected[:50]]
+    assert len(ranking) == len(tasks)
+
+
+def test_scores_are_recomputed_when_the_day_changes(monkeypatch):
+    tasks = assign_task_ids([Task("t", deadline=due(2))])
+    ranking = TaskScheduler(tasks)
+    before = ranking.score(tasks[0].id)
+    monkeypatch.setattr(FakeDate, "current", TODAY + timedelta(days=2))
+    ranking.check_day()
+    assert ranking.score(tasks[0].id) > before
@@ -0,0 +1,169 @@
+"""Tests for the local HTTP/JSON API server (server.py)"""
+import asyncio
+import json
+
+import pytest
+
+import task_manager
+from task_manager import Task, save_tasks, read_tasks
+from server import TaskServer
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Run against a scratch tasks.json / task_history.bin in a temporary directory"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+async def request(port, method, path, body=None, headers=None):
+    """Send one HTTP/1.1 request and return (status, headers, decoded JSON body)"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = json.dumps(body).encode("utf-8") if body is not None else b""
+    lines = [f"{method} {path} HTTP/1.1", "Host: localhost", "Connection: close",
+             f"Content-Length: {len(data)}"]
+    lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + data)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    response_headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        response_headers[name.strip().lower()] = value.strip()
+    return int(status_line.split()[1]), response_headers, json.loads(payload) if payload else None
+
+
+def run_with_server(scenario, **kwargs):
+    """Start a TaskServer on a free port, run scenario(server), then stop it"""
+    async def main():
+        server = TaskServer(port=0, **kwargs)
+        await server.start()
+        try:
+            return await scenario(server)
+        finally:
+            await server.stop()
+    return asyncio.run(main())
+
+
+def test_create_get_patch_delete(store):
+    async def scenario(server):
+        status, headers, created = await request(server.port, "POST", "/tasks",
+                                                 {"title": "Write docs", "tags": ["docs"]})
+        assert status == 201
+        assert headers["location"] == f"/tasks/{created['id']}"
+        task_id = created["id"]
+
+        status, headers, fetched = await request(server.port, "GET", f"/tasks/{task_id}")
+        assert status == 200 and fetched["title"] == "Write docs"
+        etag = headers["etag"]
+
+        status, _, _ = await request(server.port, "GET", f"/tasks/{task_id}", headers={"If-None-Match": etag})
+        assert status == 304
+
+        status, _, patched = await request(server.port, "PATCH", f"/tasks/{task_id}",
+                                           {"status": "Done"}, {"If-Match": etag})
+        assert status == 200
+        assert patched["status"] == "Done" and patched["completion_date"]
+
+        status, _, _ = await request(server.port, "PATCH", f"/tasks/{task_id}",
+                                     {"priority": "High"}, {"If-Match": etag})
+        assert status == 412  # The ETag went stale with the status change
+
+        status, _, _ = await request(server.port, "DELETE", f"/tasks/{task_id}")
+        assert status == 204
+        status, _, _ = await request(server.port, "GET", f"/tasks/{task_id}")
+        assert status == 404
+
+    run_with_server(scenario)
+    assert read_tasks() == []
+
+
+def test_rejects_invalid_task(store):
+    async def scenario(server):
+        status, _, body = await request(server.port, "POST", "/tasks", {"title": ""})
+        assert status == 400 and "title" in body["error"]
+        status, _, _ = await request(server.port, "POST", "/tasks", {"title": "x", "blocked_by": [99]})
+        assert status == 400
+        status, _, body = await request(server.port, "POST", "/tasks",
+                                        {"title": "x", "recurrence": {"freq": ["daily"], "start": "2026-01-01"}})
+        assert status == 400 and "freq" in body["error"]
+
+    run_with_server(scenario)
+
+
+def test_picks_up_changes_from_other_processes(store):
+    save_tasks([Task("From the app", id=1)])
+
+    async def scenario(server):
+        _, _, listed = await request(server.port, "GET", "/tasks")
+        assert [t["title"] for t in listed] == ["From the app"]
+        save_tasks([Task("From the app", id=1), Task("Also from the app", id=2)])
+        _, _, listed = await request(server.port, "GET", "/tasks")
+        assert [t["title"] for t in listed] == ["From the app", "Also from the app"]
+
+    run_with_server(scenario)
+
+
+def test_concurrent_reads_never_lose_acknowledged_writes(store, capsys):
+    # A large store makes each save slow enough for GETs to land while it is being written
+    save_tasks(task_manager.assign_task_ids([Task(f"existing {i}", tags=["bulk"]) for i in range(20000)]))
+    posts = 40
+
+    async def scenario(server):
+        stop = asyncio.Event()
+
+        async def reader():
+            while not stop.is_set():
+                status, _, _ = await request(server.port, "GET", "/tasks?tag=none")
+                assert status == 200
+
+        readers = [asyncio.create_task(reader()) for _ in range(4)]
+        results = await asyncio.gather(*(request(server.port, "POST", "/tasks", {"title": f"new {i}"})
+                                         for i in range(posts)))
+        stop.set()
+        await asyncio.gather(*readers)
+        assert [status for status, _, _ in results] == [201] * posts
+        created_ids = {body["id"] for _, _, body in results}
+        assert len(created_ids) == posts
+        assert created_ids <= {task.id for task in server.tasks}
+        return created_ids
+
+    created_ids = run_with_server(scenario, commit_delay=0)
+    on_disk = read_tasks()
+    assert created_ids <= {task.id for task in on_disk}
+    assert len(on_disk) == 20000 + posts
+    assert "corrupted" not in capsys.readouterr().out
+
+
+def test_unreadable_file_keeps_serving_the_cache(store):
+    save_tasks([Task("Kept", id=1)])
+    torn = '[{"title": '
+
+    async def scenario(server):
+        with open(task_manager.TASKS_FILE, "w") as f:
+            f.write(torn)  # Another writer left a torn file behind
+        status, _, listed = await request(server.port, "GET", "/tasks")
+        assert status == 200 and [t["title"] for t in listed] == ["Kept"]
+        # The server must not "recover" the file from the backup behind the other writer's back
+        assert (store / task_manager.TASKS_FILE).read_text() == torn
+
+    run_with_server(scenario)
+
+
+def test_completing_a_recurring_task_serves_its_next_occurrence(store):
+    save_tasks([Task("Water plants", id=1, deadline="2026-01-05",
+                     recurrence={"freq": "weekly", "interval": 1, "start": "2026-01-05"})])
+
+    async def scenario(server):
+        status, _, done = await request(server.port, "POST", "/tasks/1/done", {})
+        assert status == 200 and done["status"] == "Done"
+        _, _, listed = await request(server.port, "GET", "/tasks")
+        spawned = next(t for t in listed if t["status"] != "Done")
+        assert spawned["series_id"] == 1
+        status, _, fetched = await request(server.port, "GET", f"/tasks/{spawned['id']}")
+        assert status == 200 and fetched["occurrence"] == spawned["occurrence"]
+
+    run_with_server(scenario)
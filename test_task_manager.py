@@ -0,0 +1,46 @@
+"""Tests for task storage and id assignment (task_manager.py)"""
+import json
+
+import pytest
+
+import task_manager
+from task_manager import Task, add_task, delete_task, load_tasks, save_tasks
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Run against a scratch tasks.json in a temporary directory"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_deleted_ids_are_never_reused(store):
+    tasks = []
+    for title in ("first", "second"):
+        add_task(tasks, Task(title), save=False)
+    first_id, second_id = tasks[0].id, tasks[1].id
+    delete_task(tasks, 1, save=False)
+    add_task(tasks, Task("third"), save=False)
+    assert first_id < second_id < tasks[1].id
+
+
+def test_high_water_mark_survives_save_and_load(store, monkeypatch):
+    tasks = task_manager.assign_task_ids([Task("kept"), Task("deleted")])
+    deleted_id = tasks[1].id
+    save_tasks(tasks[:1])
+    with open(task_manager.TASKS_FILE) as f:
+        next_id = json.load(f)["next_id"]
+    assert next_id > deleted_id
+
+    monkeypatch.setattr(task_manager, "_next_id", 1)  # A fresh process only knows the file
+    loaded = load_tasks()
+    add_task(loaded, Task("new"), save=False)
+    assert loaded[-1].id == next_id
+
+
+def test_loads_legacy_list_files(store):
+    with open(task_manager.TASKS_FILE, "w") as f:
+        json.dump([{"id": 5, "title": "old"}, {"title": "no id yet"}], f)
+    tasks = load_tasks()
+    assert [t.title for t in tasks] == ["old", "no id yet"]
+    assert tasks[1].id > 5
@@ -0,0 +1,115 @@
+"""Tests for start/stop time tracking (timelog.py)"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from task_manager import Task
+from timelog import RECORD, UNTAGGED, TimeLog, format_duration, split_days
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Run against a scratch time_log.bin in a temporary directory"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def at(day, hour, minute=0):
+    return datetime.combine(day, datetime.min.time()).replace(hour=hour, minute=minute).timestamp()
+
+
+DAY = date(2026, 3, 2)
+
+
+def test_format_duration():
+    assert format_duration(59) == "0m"
+    assert format_duration(45 * 60) == "45m"
+    assert format_duration(2 * 3600 + 5 * 60) == "2h 05m"
+
+
+def test_split_days_at_local_midnight():
+    parts = list(split_days(int(at(DAY, 23)), int(at(DAY + timedelta(days=1), 1))))
+    assert parts == [(DAY.isoformat(), 3600), ((DAY + timedelta(days=1)).isoformat(), 3600)]
+
+
+def test_totals_by_task_tag_and_day(store):
+    log = TimeLog()
+    log.rebuild([Task("Docs", id=1, tags=["docs"]), Task("Untagged", id=2)])
+    assert log.start(1, at(DAY, 9))
+    assert not log.start(1, at(DAY, 10))  # Already running
+    assert log.stop(1, at(DAY, 10, 30)) == 5400
+    log.start(2, at(DAY, 11))
+    log.stop(2, at(DAY, 11, 15))
+    by_task, by_tag, by_day = log.totals()
+    assert by_task == {1: 5400, 2: 900}
+    assert by_tag == {"docs": 5400, UNTAGGED: 900}
+    assert by_day == {DAY.isoformat(): 6300}
+    assert log.totals(DAY + timedelta(days=1))[0] == {}
+
+
+def test_running_timer_counts_until_now(store):
+    log = TimeLog()
+    log.start(1, at(DAY, 9))
+    assert log.task_seconds(1, now=at(DAY, 9, 10)) == 600
+    assert log.totals(now=at(DAY, 9, 10))[0] == {1: 600}
+    assert log.intervals(1)[-1][1] is None
+
+
+def test_tag_changes_move_tracked_time(store):
+    log = TimeLog()
+    task = Task("Docs", id=1, tags=["docs"])
+    log.rebuild([task])
+    log.start(1, at(DAY, 9))
+    log.stop(1, at(DAY, 10))
+    log.on_change("edit", Task("Docs", id=1, tags=["writing"]), task)
+    assert log.totals()[1] == {"writing": 3600}
+
+
+def test_completing_a_task_stops_its_timer(store):
+    log = TimeLog()
+    log.start(1, at(DAY, 9))
+    log.on_change("status", Task("Done", id=1, status="Done"))
+    assert not log.is_running(1)
+
+
+def test_log_survives_a_restart_with_a_running_timer(store):
+    log = TimeLog()
+    log.start(1, at(DAY, 9))
+    log.stop(1, at(DAY, 10))
+    log.start(1, at(DAY, 11))
+    log.flush()
+    with open("time_log.bin", "ab") as f:
+        f.write(RECORD.pack(2, 0, 0)[:7])  # Torn record from a crash
+    reloaded = TimeLog().load()
+    assert reloaded.totals(now=at(DAY, 12))[0] == {1: 7200}
+    assert reloaded.running() == {1: int(at(DAY, 11))}
+
+
+def test_deleted_task_time_is_dropped_and_stays_dropped(store):
+    log = TimeLog()
+    task = Task("Gone", id=1, tags=["docs"])
+    log.rebuild([task, Task("Kept", id=2)])
+    log.start(1, at(DAY, 9))
+    log.stop(1, at(DAY, 10))
+    log.start(2, at(DAY, 10))
+    log.stop(2, at(DAY, 10, 30))
+    log.start(1, at(DAY, 11))  # Still running when the task is deleted
+    log.on_change("delete", task)
+    assert log.task_seconds(1) == 0 and not log.is_running(1)
+    assert log.intervals(1) == []
+    assert log.totals() == ({2: 1800}, {UNTAGGED: 1800}, {DAY.isoformat(): 1800})
+    assert log.totals(DAY, DAY)[0] == {2: 1800}
+    log.flush()
+
+    reloaded = TimeLog().load()
+    reloaded.rebuild([Task("Kept", id=2)])
+    assert reloaded.task_seconds(1) == 0 and reloaded.running() == {}
+    assert reloaded.totals() == ({2: 1800}, {UNTAGGED: 1800}, {DAY.isoformat(): 1800})
+
+
+def test_deleting_an_untracked_task_logs_nothing(store):
+    log = TimeLog()
+    log.on_change("delete", Task("Never tracked", id=3))
+    log.flush()
+    assert TimeLog().load().totals() == ({}, {}, {})
+    assert len(log) == 0
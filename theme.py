@@ -19,6 +19,7 @@ LIGHT_COLORS = {
     'accent3': '#f59e0b',  # Amber
     'accent_red': '#ef4444',
     'accent_orange': '#f97316',  # Orange for In Progress
+    'accent_purple': '#8b5cf6',  # Purple for time tracking
     'overdue': '#fef2f2',
     'done': '#f0fdf4',
     'in_progress': '#fff7ed',  # Light orange background
@@ -43,6 +44,7 @@ DARK_COLORS = {
     'accent3': '#ffc947',  # Warm yellow
     'accent_red': '#ff6b6b',
     'accent_orange': '#fb923c',  # Orange for In Progress
+    'accent_purple': '#a78bfa',  # Purple for time tracking
     'overdue': '#4a1a1a',
     'done': '#1a4a2a',
     'in_progress': '#4a2a1a',  # Dark orange background
@@ -0,0 +1,280 @@
+# timelog.py - Start/stop time tracking with an append-only interval log
+#
+# Tracked time is stored outside tasks.json, in time_log.bin, as 20-byte
+# records (task id, start, end) in epoch seconds. Starting a timer appends an
+# open record (end 0) so a running timer survives a restart; stopping it
+# appends the closed record with the same start, which supersedes the open one
+# on load. Deleting a task appends a tombstone (end -1) that drops its time
+# from every total, on load too. Totals by task, tag and day are kept up to
+# date as intervals close and tags change, so reports never rescan the log.
+import os
+import struct
+import threading
+import time
+from array import array
+from datetime import datetime, time as dtime, timedelta
+
+TIMELOG_FILE = "time_log.bin"
+RECORD = struct.Struct("<iqq")  # task id, start, end (0 while the timer runs, -1 once the task is deleted)
+UNTAGGED = "(untagged)"
+
+
+def format_duration(seconds):
+    """Text like "2h 05m" (or "45m") for a number of seconds"""
+    minutes = int(seconds) // 60
+    if minutes < 60:
+        return f"{minutes}m"
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+_day_cache = {}  # hour number -> (local day start, next midnight, YYYY-MM-DD) of a time in it
+
+
+def _local_day(ts):
+    """(day start, next midnight, YYYY-MM-DD) of the local day containing epoch second ts"""
+    cached = _day_cache.get(ts // 3600)
+    if cached is not None and cached[0] <= ts < cached[1]:
+        return cached
+    day = datetime.fromtimestamp(ts).date()
+    cached = (int(datetime.combine(day, dtime.min).timestamp()),
+              int(datetime.combine(day + timedelta(days=1), dtime.min).timestamp()), day.isoformat())
+    _day_cache[ts // 3600] = cached
+    return cached
+
+
+def split_days(start, end):
+    """Yield (YYYY-MM-DD, seconds) for the local days an interval spans"""
+    while start < end:
+        _, midnight, day = _local_day(start)
+        stop = min(end, midnight)
+        yield day, stop - start
+        start = stop
+
+
+class TimeLog:
+    """Tracked intervals per task, with running timers and precomputed totals"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._ids = array("i")
+        self._starts = array("q")
+        self._ends = array("q")
+        self._running = {}    # task id -> start of its running timer
+        self._by_task = {}    # task id -> seconds in closed intervals
+        self._by_day = {}     # YYYY-MM-DD -> {task id: seconds}
+        self._by_tag = {}     # tag -> seconds, for the current tags of live tasks
+        self._tags = {}       # task id -> its tags as last seen
+        self._deleted = set()  # ids of deleted tasks whose intervals are still in the arrays
+        self._pending = bytearray()  # Records not yet appended to the file
+
+    def __len__(self):
+        return len(self._ids)
+
+    # --------------------------
+    # Recording
+    # --------------------------
+
+    def _add_interval(self, task_id, start, end):
+        self._ids.append(task_id)
+        self._starts.append(start)
+        self._ends.append(end)
+        seconds = end - start
+        self._by_task[task_id] = self._by_task.get(task_id, 0) + seconds
+        for day, part in split_days(start, end):
+            per_task = self._by_day.setdefault(day, {})
+            per_task[task_id] = per_task.get(task_id, 0) + part
+        for tag in self._tags.get(task_id, ()):
+            self._by_tag[tag] = self._by_tag.get(tag, 0) + seconds
+
+    def start(self, task_id, when=None):
+        """Start a task's timer, returning False if it is already running"""
+        with self._lock:
+            if task_id in self._running:
+                return False
+            start = int(time.time()) if when is None else int(when)
+            self._running[task_id] = start
+            self._pending += RECORD.pack(task_id, start, 0)
+            return True
+
+    def stop(self, task_id, when=None):
+        """Stop a task's timer, returning the seconds tracked (None if it wasn't running)"""
+        with self._lock:
+            start = self._running.pop(task_id, None)
+            if start is None:
+                return None
+            end = max(start, int(time.time()) if when is None else int(when))
+            self._add_interval(task_id, start, end)
+            self._pending += RECORD.pack(task_id, start, end)
+            return end - start
+
+    def _forget(self, task_id):
+        """Drop a deleted task's time from every total (lock held); True if it had any"""
+        had_time = self._running.pop(task_id, None) is not None or task_id in self._by_task
+        seconds = self._by_task.pop(task_id, 0)
+        for tag in self._tags.pop(task_id, ()):
+            if seconds:
+                self._by_tag[tag] -= seconds
+                if not self._by_tag[tag]:
+                    del self._by_tag[tag]
+        if seconds:
+            for day in [day for day, per_task in self._by_day.items() if task_id in per_task]:
+                del self._by_day[day][task_id]
+                if not self._by_day[day]:
+                    del self._by_day[day]
+        if had_time:
+            self._deleted.add(task_id)
+        return had_time
+
+    def forget(self, task_id):
+        """Drop everything tracked on a deleted task, logging a tombstone so it stays dropped"""
+        with self._lock:
+            if self._forget(task_id):
+                self._pending += RECORD.pack(task_id, 0, -1)
+
+    def toggle(self, task_id):
+        """Start the timer if it is stopped, stop it if it is running; True if now running"""
+        if self.stop(task_id) is None:
+            self.start(task_id)
+            return True
+        return False
+
+    def is_running(self, task_id):
+        return task_id in self._running
+
+    def running(self):
+        """{task id: start epoch} for the timers currently running"""
+        with self._lock:
+            return dict(self._running)
+
+    def rebuild(self, tasks):
+        """Take the tags of a whole task list (after load or refresh) and recount time by tag"""
+        with self._lock:
+            self._tags = {task.id: tuple(task.tags) for task in tasks if task.id is not None}
+            self._by_tag = {}
+            for task_id, seconds in self._by_task.items():
+                for tag in self._tags.get(task_id, ()):
+                    self._by_tag[tag] = self._by_tag.get(tag, 0) + seconds
+
+    def on_change(self, action, task, previous=None):
+        """Change listener for task_manager.add_change_listener"""
+        if task.id is None:
+            return
+        if action == "delete":
+            self.stop(task.id)
+            self.forget(task.id)
+            return
+        if task.status == "Done":
+            self.stop(task.id)  # Nobody keeps working on a finished task
+        new_tags = tuple(task.tags)
+        with self._lock:
+            old_tags = self._tags.get(task.id, ())
+            if old_tags == new_tags:
+                return
+            seconds = self._by_task.get(task.id, 0)
+            if seconds:
+                for tag in old_tags:
+                    self._by_tag[tag] -= seconds
+                    if not self._by_tag[tag]:
+                        del self._by_tag[tag]
+                for tag in new_tags:
+                    self._by_tag[tag] = self._by_tag.get(tag, 0) + seconds
+            self._tags[task.id] = new_tags
+
+    # --------------------------
+    # Storage
+    # --------------------------
+
+    def load(self):
+        """Read the log file (missing file = nothing tracked); a torn last record is ignored"""
+        try:
+            with open(self.path or TIMELOG_FILE, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return self
+        usable = len(data) - len(data) % RECORD.size
+        with self._lock:
+            for task_id, start, end in RECORD.iter_unpack(memoryview(data)[:usable]):
+                if end < 0:
+                    self._forget(task_id)
+                    continue
+                if not end:
+                    self._running[task_id] = start
+                    continue
+                if self._running.get(task_id) == start:
+                    del self._running[task_id]
+                self._add_interval(task_id, start, end)
+        return self
+
+    def flush(self):
+        """Append records logged since the last flush to the log file"""
+        with self._lock:
+            pending, self._pending = self._pending, bytearray()
+        if pending:
+            with open(self.path or TIMELOG_FILE, "ab") as f:
+                f.write(pending)
+                f.flush()
+                os.fsync(f.fileno())
+
+    # --------------------------
+    # Queries
+    # --------------------------
+
+    def task_seconds(self, task_id, now=None):
+        """Seconds tracked on a task, including its running timer"""
+        with self._lock:
+            seconds = self._by_task.get(task_id, 0)
+            if task_id in self._running:
+                seconds += max(0, int(time.time() if now is None else now) - self._running[task_id])
+            return seconds
+
+    def totals(self, start_date=None, end_date=None, now=None):
+        """({task id: s}, {tag: s}, {YYYY-MM-DD: s}) for days in a range, running timers included"""
+        now = int(time.time() if now is None else now)
+        lo = start_date.isoformat() if start_date else ""
+        hi = end_date.isoformat() if end_date else "9999-12-31"
+        by_task = {}
+        by_day = {}
+        ranged = bool(start_date or end_date)
+        with self._lock:
+            if ranged:
+                days = [(day, per_task) for day, per_task in self._by_day.items() if lo <= day <= hi]
+                for day, per_task in days:
+                    for task_id, seconds in per_task.items():
+                        by_task[task_id] = by_task.get(task_id, 0) + seconds
+            else:
+                by_task.update(self._by_task)
+                days = self._by_day.items()
+            for day, per_task in days:
+                by_day[day] = sum(per_task.values())
+            live = {}  # task id -> seconds of its running timer within the range
+            for task_id, start in self._running.items():
+                for day, seconds in split_days(start, max(start, now)):
+                    if lo <= day <= hi:
+                        live[task_id] = live.get(task_id, 0) + seconds
+                        by_day[day] = by_day.get(day, 0) + seconds
+            for task_id, seconds in live.items():
+                by_task[task_id] = by_task.get(task_id, 0) + seconds
+            by_tag = {}
+            for task_id, seconds in (by_task.items() if ranged else live.items()):
+                for tag in self._tags.get(task_id, ()):
+                    by_tag[tag] = by_tag.get(tag, 0) + seconds
+            if not ranged:
+                for tag, seconds in self._by_tag.items():
+                    by_tag[tag] = by_tag.get(tag, 0) + seconds
+            untagged = sum(seconds for task_id, seconds in by_task.items()
+                           if task_id in self._tags and not self._tags[task_id])
+        if untagged:
+            by_tag[UNTAGGED] = untagged
+        return by_task, by_tag, by_day
+
+    def intervals(self, task_id):
+        """[(start datetime, end datetime)] tracked on one task, oldest first (end None while running)"""
+        with self._lock:
+            if task_id in self._deleted:
+                return []
+            found = [(datetime.fromtimestamp(self._starts[i]), datetime.fromtimestamp(self._ends[i]))
+                     for i in range(len(self._ids)) if self._ids[i] == task_id]
+            if task_id in self._running:
+                found.append((datetime.fromtimestamp(self._running[task_id]), None))
+        return sorted(found, key=lambda interval: interval[0])
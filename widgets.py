@@ -21,3 +21,30 @@ def create_modern_button(parent, text, command, bg_color, fg_color="white", colo
     btn.bind('<Enter>', on_enter)
     btn.bind('<Leave>', on_leave)
     return btn
+
+
+def show_toast(root, title, lines, colors, duration_ms=8000):
+    """Show a small non-modal notification in the bottom-right corner of the window"""
+    toast = tk.Toplevel(root)
+    toast.overrideredirect(True)
+    toast.attributes('-topmost', True)
+    frame = tk.Frame(toast, bg=colors['card_bg'], highlightthickness=1,
+                     highlightbackground=colors['accent2'], padx=14, pady=10)
+    frame.pack(fill=tk.BOTH, expand=True)
+    tk.Label(frame, text=title, bg=colors['card_bg'], fg=colors['accent2'],
+             font=('Segoe UI', 10, 'bold'), anchor='w').pack(fill=tk.X)
+    for line in lines:
+        tk.Label(frame, text=line, bg=colors['card_bg'], fg=colors['fg'],
+                 font=('Segoe UI', 10), anchor='w', justify=tk.LEFT,
+                 wraplength=320).pack(fill=tk.X, pady=(4, 0))
+    
+    toast.update_idletasks()
+    x = root.winfo_rootx() + root.winfo_width() - toast.winfo_reqwidth() - 20
+    y = root.winfo_rooty() + root.winfo_height() - toast.winfo_reqheight() - 40
+    toast.geometry(f'+{max(x, 0)}+{max(y, 0)}')
+    
+    toast.bind('<Button-1>', lambda e: toast.destroy())
+    for child in frame.winfo_children():
+        child.bind('<Button-1>', lambda e: toast.destroy())
+    toast.after(duration_ms, lambda: toast.winfo_exists() and toast.destroy())
+    return toast